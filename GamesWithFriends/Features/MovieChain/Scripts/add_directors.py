@@ -8,25 +8,35 @@ This script processes IMDb TSV files to add:
 - directors_fts full-text search index
 
 Usage:
-    python3 add_directors.py
+    python3 add_directors.py [--report PATH] [--profile DIR] [--analyze-size]
 """
 
+import argparse
 import sqlite3
 import csv
 import gzip
 import os
 import sys
 from pathlib import Path
+from typing import Optional
+
+# Shared build tooling lives in the repository's top-level scripts/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / 'scripts'))
+from analyze_database_size import analyze_database_size, print_size_report
+from build_stats import BuildReport
+from finalize_database import finalize_database
 
 
 class DirectorDatabaseBuilder:
     """Builds director tables in the MovieChain SQLite database."""
     
-    def __init__(self, db_path: str, title_principals_path: str, name_basics_path: str):
+    def __init__(self, db_path: str, title_principals_path: str, name_basics_path: str,
+                 report: Optional[BuildReport] = None):
         self.db_path = db_path
         self.title_principals_path = title_principals_path
         self.name_basics_path = name_basics_path
         self.conn = None
+        self.report = report or BuildReport('add_directors')
         
     def connect(self):
         """Connect to the database."""
@@ -85,7 +95,7 @@ class DirectorDatabaseBuilder:
         print(f"Found {len(movie_ids):,} movies in database.")
         return movie_ids
         
-    def extract_director_relationships(self, existing_movies):
+    def extract_director_relationships(self, existing_movies, stage=None):
         """
         Extract director-movie relationships from title.principals.tsv.
         Returns dict mapping nconst -> set of tconst values.
@@ -126,9 +136,12 @@ class DirectorDatabaseBuilder:
         
         print(f"Completed processing {rows_processed:,} rows.")
         print(f"Found {len(director_movies):,} unique directors for {directors_found:,} movie-director links.")
+        if stage is not None:
+            stage.rows_in = rows_processed
+            stage.rows_out = directors_found
         return director_movies
         
-    def extract_director_names(self, director_nconsts):
+    def extract_director_names(self, director_nconsts, stage=None):
         """
         Extract director names from name.basics.tsv.
         Returns dict mapping nconst -> name.
@@ -170,6 +183,9 @@ class DirectorDatabaseBuilder:
         
         print(f"Completed processing {rows_processed:,} rows.")
         print(f"Found {len(director_names):,} director names out of {len(needed_nconsts):,} needed.")
+        if stage is not None:
+            stage.rows_in = rows_processed
+            stage.rows_out = names_found
         return director_names
         
     def insert_directors(self, director_names):
@@ -266,11 +282,19 @@ class DirectorDatabaseBuilder:
         self.conn.commit()
         print("Indexes created.")
         
-    def vacuum_database(self):
-        """Optimize the database."""
-        print("Vacuuming database (this may take a while)...")
-        self.conn.execute("VACUUM")
-        print("Vacuum complete.")
+    def finalize_database(self):
+        """Replace the database with a compacted, analyzed, read-optimized copy."""
+        print("Finalizing database (this may take a while)...")
+        self.disconnect()
+        self.conn = None
+        
+        final_path = self.db_path + '.final'
+        finalize_database(Path(self.db_path), Path(final_path), build_report=self.report)
+        os.replace(final_path, self.db_path)
+        
+        # Reopen without WAL so the finalized header is left untouched
+        self.conn = sqlite3.connect(self.db_path)
+        print("Finalize complete.")
         
     def print_stats(self):
         """Print summary statistics."""
@@ -335,13 +359,17 @@ class DirectorDatabaseBuilder:
             self.create_tables()
             
             # Step 3: Get existing movies
-            existing_movies = self.get_existing_movie_ids()
+            with self.report.stage('load:movie_ids') as stage:
+                existing_movies = self.get_existing_movie_ids()
+                stage.rows_out = len(existing_movies)
             
             # Step 4: Extract director-movie relationships
-            director_movies = self.extract_director_relationships(existing_movies)
+            with self.report.stage('parse:principals') as stage:
+                director_movies = self.extract_director_relationships(existing_movies, stage)
             
             # Step 5: Extract director names
-            director_names = self.extract_director_names(director_movies.keys())
+            with self.report.stage('parse:names') as stage:
+                director_names = self.extract_director_names(director_movies.keys(), stage)
             
             # Step 6: Filter to only directors with names
             director_movies = {
@@ -351,19 +379,26 @@ class DirectorDatabaseBuilder:
             }
             
             # Step 7: Insert directors
-            self.insert_directors(director_names)
+            with self.report.stage('insert:directors') as stage:
+                self.insert_directors(director_names)
+                stage.rows_in = stage.rows_out = len(director_names)
             
             # Step 8: Insert relationships
-            self.insert_movie_directors(director_movies)
+            with self.report.stage('insert:movie_directors') as stage:
+                self.insert_movie_directors(director_movies)
+                stage.rows_in = stage.rows_out = sum(len(m) for m in director_movies.values())
             
             # Step 9: Create FTS index
-            self.create_fts_index()
+            with self.report.stage('fts') as stage:
+                self.create_fts_index()
+                stage.rows_in = len(director_names)
             
             # Step 10: Create indexes
-            self.create_indexes()
+            with self.report.stage('indexes'):
+                self.create_indexes()
             
-            # Step 11: Vacuum database
-            self.vacuum_database()
+            # Step 11: Finalize database (FTS optimize, ANALYZE, VACUUM INTO)
+            self.finalize_database()
             
             # Step 12: Print stats
             self.print_stats()
@@ -372,7 +407,10 @@ class DirectorDatabaseBuilder:
             self.disconnect()
             
             # Step 14: Compress database
-            self.compress_database()
+            with self.report.stage('compress'):
+                self.compress_database()
+            
+            self.report.print_summary()
             
             print("\n✅ Director data added successfully!")
             
@@ -388,6 +426,15 @@ class DirectorDatabaseBuilder:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description='Add director data to the MovieChain database')
+    parser.add_argument('--report', type=str, default=None,
+                        help='Path for the JSON stage report (default: next to the database)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='Dump per-stage cProfile stats into DIR')
+    parser.add_argument('--analyze-size', action='store_true',
+                        help='Print a per-table/index size breakdown of the finished database')
+    args = parser.parse_args()
+    
     # Determine paths
     script_dir = Path(__file__).parent
     project_root = script_dir.parent.parent.parent.parent  # Go up to project root
@@ -425,13 +472,18 @@ def main():
     print("="*60 + "\n")
     
     # Build the database
+    report = BuildReport('add_directors', profile_dir=Path(args.profile) if args.profile else None)
     builder = DirectorDatabaseBuilder(
         db_path=str(db_path),
         title_principals_path=str(title_principals_path),
-        name_basics_path=str(name_basics_path)
+        name_basics_path=str(name_basics_path),
+        report=report
     )
     
     builder.build()
+    if args.analyze_size:
+        print_size_report(analyze_database_size(db_path))
+    report.write_json(Path(args.report) if args.report else project_root / "add_directors_report.json")
 
 
 if __name__ == "__main__":
@@ -11,112 +11,18 @@
 # - Country canon list = UN members + a few widely-used short names + 2 observers.
 # -------------------------------------------------------------
 
-import re
+import os
 import sys
-import unicodedata
 
-def _norm(s: str) -> str:
-    """Lowercase, strip accents, drop punctuation & extra spaces for robust matching."""
-    if s is None:
-        return ""
-    s = s.lower().strip()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = re.sub(r"[^a-z0-9\s]", " ", s)   # remove punctuation/symbols
-    s = re.sub(r"\s+", " ", s).strip()
-    # drop leading 'the ' for inputs like 'the gambia', 'the bahamas'
-    if s.startswith("the "):
-        s = s[4:]
-    return s
+# Country lists, lookup tables and the normalizer are shared with
+# ../country_letter_game.py. Appended, so the repo root never shadows the
+# stdlib or installed modules.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from country_data import ALT, CANON, COUNTRIES, LETTER_INDEX
+from guess_matcher import normalize
 
-# Canonical common-English country names (193 UN members + 2 observers)
-COUNTRIES = [
-    "Afghanistan","Albania","Algeria","Andorra","Angola","Antigua and Barbuda","Argentina","Armenia",
-    "Australia","Austria","Azerbaijan","Bahamas","Bahrain","Bangladesh","Barbados","Belarus","Belgium",
-    "Belize","Benin","Bhutan","Bolivia","Bosnia and Herzegovina","Botswana","Brazil","Brunei","Bulgaria",
-    "Burkina Faso","Burundi","Cabo Verde","Cambodia","Cameroon","Canada","Central African Republic","Chad",
-    "Chile","China","Colombia","Comoros","Congo","Costa Rica","Côte d'Ivoire","Croatia","Cuba","Cyprus",
-    "Czechia","Democratic Republic of the Congo","Denmark","Djibouti","Dominica","Dominican Republic",
-    "Ecuador","Egypt","El Salvador","Equatorial Guinea","Eritrea","Estonia","Eswatini","Ethiopia","Fiji",
-    "Finland","France","Gabon","Gambia","Georgia","Germany","Ghana","Greece","Grenada","Guatemala","Guinea",
-    "Guinea-Bissau","Guyana","Haiti","Honduras","Hungary","Iceland","India","Indonesia","Iran","Iraq",
-    "Ireland","Israel","Italy","Jamaica","Japan","Jordan","Kazakhstan","Kenya","Kiribati","North Korea",
-    "South Korea","Kuwait","Kyrgyzstan","Laos","Latvia","Lebanon","Lesotho","Liberia","Libya",
-    "Liechtenstein","Lithuania","Luxembourg","Madagascar","Malawi","Malaysia","Maldives","Mali","Malta",
-    "Marshall Islands","Mauritania","Mauritius","Mexico","Micronesia","Moldova","Monaco","Mongolia",
-    "Montenegro","Morocco","Mozambique","Myanmar","Namibia","Nauru","Nepal","Netherlands","New Zealand",
-    "Nicaragua","Niger","Nigeria","North Macedonia","Norway","Oman","Pakistan","Palau","Palestine","Panama",
-    "Papua New Guinea","Paraguay","Peru","Philippines","Poland","Portugal","Qatar","Romania","Russia",
-    "Rwanda","Saint Kitts and Nevis","Saint Lucia","Saint Vincent and the Grenadines","Samoa","San Marino",
-    "São Tomé and Príncipe","Saudi Arabia","Senegal","Serbia","Seychelles","Sierra Leone","Singapore",
-    "Slovakia","Slovenia","Solomon Islands","Somalia","South Africa","South Sudan","Spain","Sri Lanka",
-    "Sudan","Suriname","Sweden","Switzerland","Syria","Tajikistan","Tanzania","Thailand","Timor-Leste",
-    "Togo","Tonga","Trinidad and Tobago","Tunisia","Turkey","Turkmenistan","Tuvalu","Uganda","Ukraine",
-    "United Arab Emirates","United Kingdom","United States","Uruguay","Uzbekistan","Vanuatu","Vatican City",
-    "Venezuela","Vietnam","Yemen","Zambia","Zimbabwe"
-]
-
-# Accept common alternate names -> canonical display name
-ALT = {
-    "ivory coast": "Côte d'Ivoire",
-    "cote d ivoire": "Côte d'Ivoire",
-    "cote d'ivoire": "Côte d'Ivoire",
-    "cape verde": "Cabo Verde",
-    "east timor": "Timor-Leste",
-    "lao pdr": "Laos",
-    "lao people s democratic republic": "Laos",
-    "burma": "Myanmar",
-    "swaziland": "Eswatini",
-    "czech republic": "Czechia",
-    "vatican": "Vatican City",
-    "holy see": "Vatican City",
-    "north korea": "North Korea",
-    "democratic people s republic of korea": "North Korea",
-    "south korea": "South Korea",
-    "republic of korea": "South Korea",
-    "the bahamas": "Bahamas",
-    "the gambia": "Gambia",
-    "republic of the congo": "Congo",
-    "democratic republic of the congo": "Democratic Republic of the Congo",
-    "bolivia plurinational state of": "Bolivia",
-    "moldova republic of": "Moldova",
-    "russian federation": "Russia",
-    "syrian arab republic": "Syria",
-    "united states of america": "United States",
-    "u s a": "United States",
-    "u s": "United States",
-    "uk": "United Kingdom",
-    "u k": "United Kingdom",
-    "united kingdom of great britain and northern ireland": "United Kingdom",
-    "myanmar burma": "Myanmar",
-    "brunei darussalam": "Brunei",
-    "iran islamic republic of": "Iran",
-    "kyrgyz republic": "Kyrgyzstan",
-    "lao": "Laos",
-    "micronesia federated states of": "Micronesia",
-    "palestine state of": "Palestine",
-    "tanzania united republic of": "Tanzania",
-    "venezuela bolivarian republic of": "Venezuela",
-    "viet nam": "Vietnam",
-    "timor leste": "Timor-Leste",
-    "sao tome and principe": "São Tomé and Príncipe",
-    "cabo verde": "Cabo Verde",  # allow without diacritics via _norm
-    "eswatini kingdom of": "Eswatini",
-}
-
-CANON = { _norm(name): name for name in COUNTRIES }
-# Merge ALT into the acceptance map, pointing to their canonical display
-for alt, canon in ALT.items():
-    CANON[_norm(alt)] = canon
-
-# Build letter index from canonical (display) names
-from collections import defaultdict
-LETTER_INDEX = defaultdict(list)
-for c in COUNTRIES:
-    display = c
-    first_char = display[0].upper()
-    if first_char.isalpha():
-        LETTER_INDEX[first_char].append(display)
+# Lowercase, strip accents, drop punctuation & extra spaces (and leading 'the ')
+_norm = normalize
 
 def choose_letter() -> str:
     while True:
@@ -134,14 +40,7 @@ def resolve_guess(raw: str) -> str | None:
     if not key:
         return None
     # Direct normalized hit
-    if key in CANON:
-        return CANON[key]
-    # Try some light heuristics for "the X" or extra spaces
-    if key.startswith("the "):
-        key2 = key[4:]
-        if key2 in CANON:
-            return CANON[key2]
-    return None
+    return CANON.get(key)
 
 def play_round():
     letter = choose_letter()
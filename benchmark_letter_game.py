@@ -0,0 +1,342 @@
+"""Benchmark the country letter game's hot paths in both copies of the game.
+
+Each copy (country_letter_game.py and GamesWithFriends/country_letter_game.py)
+is loaded as its own module and timed on:
+
+    norm        _norm over clean, accented, aliased, junk and one-letter typo inputs
+    resolve     resolve_guess over the same input sets
+    hints       _get_hint_level_reveal, _progressive_hint and _show_progressive_hint
+    record      _record_score against temporary sqlite and log score stores
+    rounds      scripted full rounds through play_round with input() fed from a list
+    import      fresh-interpreter import time (median wall clock and -X importtime)
+
+Functions a copy doesn't have are reported as null. Each timing is the best
+of --repeat runs, so noise from other processes only ever makes it slower.
+Import times are taken with bytecode caching on after an untimed warm-up
+run (IMPORT_METHOD). Results record the method, and import times are only
+compared against a baseline taken the same way.
+
+Usage:
+    python3 benchmark_letter_game.py [--repeat N] [--output FILE] [--baseline FILE] [--json]
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Iterable
+
+ROOT = Path(__file__).resolve().parent
+COPIES = {
+    "country_letter_game.py": ROOT / "country_letter_game.py",
+    "GamesWithFriends/country_letter_game.py": ROOT / "GamesWithFriends" / "country_letter_game.py",
+}
+# Lower is better for these; everything else reported is a rate
+LATENCY_SUFFIXES = ("_us", "_ms")
+ROUND_LETTER = "S"
+IMPORT_RUNS = 7
+# Bumped whenever bench_import changes what it measures
+IMPORT_METHOD = "warm-bytecode"
+
+
+class _Sink:
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def load_copy(name: str, path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(f"_bench_{name.replace('/', '_').removesuffix('.py')}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_rate(function: Callable[[], int], repeat: int, min_seconds: float = 0.2) -> float:
+    """Best operations/sec over repeat timed runs; function runs one batch and returns its size."""
+    best = 0.0
+    for _ in range(repeat):
+        operations = 0
+        started = time.perf_counter()
+        while True:
+            operations += function()
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                break
+        best = max(best, operations / elapsed)
+    return best
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def input_sets(module: ModuleType, rng: random.Random) -> dict[str, list[str]]:
+    """Guesses by kind, built from the copy's own COUNTRIES and ALT."""
+    countries = list(module.COUNTRIES)
+    accented = [name for name in countries if _strip_accents(name) != name]
+    junk_letters = "qwxzjvkbh"
+    typos = []
+    for name in countries:
+        if len(name) >= 6:
+            cut = rng.randrange(1, len(name))
+            typos.append(name[:cut] + name[cut + 1:])
+    return {
+        "clean": countries,
+        "accented": accented
+        + [_strip_accents(name) for name in accented]
+        + [name.upper() for name in accented],
+        "aliased": [alias.title() for alias in module.ALT],
+        "junk": ["".join(rng.choice(junk_letters) for _ in range(rng.randint(4, 14))) for _ in range(200)],
+        "typo": typos,
+    }
+
+
+def bench_lookups(module: ModuleType, inputs: dict[str, list[str]], repeat: int) -> dict:
+    results = {}
+    for function_name in ("_norm", "resolve_guess"):
+        function = getattr(module, function_name, None)
+        rates = {}
+        for kind, guesses in inputs.items():
+            if function is None:
+                rates[f"{kind}_per_sec"] = None
+                continue
+
+            def batch(function=function, guesses=guesses) -> int:
+                for guess in guesses:
+                    function(guess)
+                return len(guesses)
+
+            rates[f"{kind}_per_sec"] = best_rate(batch, repeat)
+        results[function_name.lstrip("_")] = rates
+    return results
+
+
+def bench_hints(module: ModuleType, repeat: int) -> dict:
+    reveal = getattr(module, "_get_hint_level_reveal", None)
+    progressive = getattr(module, "_progressive_hint", None)
+    show = getattr(module, "_show_progressive_hint", None)
+    targets = module.LETTER_INDEX[ROUND_LETTER]
+    results = {"reveal_per_sec": None, "progressive_per_sec": None, "show_per_sec": None}
+
+    if reveal is not None:
+        levels = [(name, level) for name in targets for level in range(len(name) + 1)]
+
+        def reveal_batch() -> int:
+            for name, level in levels:
+                reveal(name, level)
+            return len(levels)
+
+        results["reveal_per_sec"] = best_rate(reveal_batch, repeat)
+
+    # Ask for hints until every target is given up, as a player leaning on hints would
+    def hint_batch(hint: Callable, prints: bool) -> int:
+        remaining, current, levels, calls = set(targets), None, {}, 0
+        while remaining:
+            if prints:
+                current, levels, given_up = hint(remaining, current, levels)
+            else:
+                _, _, current, given_up = hint(remaining, current, levels)
+            calls += 1
+            if given_up:
+                remaining.discard(given_up)
+                levels.pop(given_up, None)
+        return calls
+
+    if progressive is not None:
+        results["progressive_per_sec"] = best_rate(lambda: hint_batch(progressive, False), repeat)
+    if show is not None:
+        with contextlib.redirect_stdout(_Sink()):
+            results["show_per_sec"] = best_rate(lambda: hint_batch(show, True), repeat)
+    return results
+
+
+def bench_record(module: ModuleType, repeat: int) -> dict:
+    record = getattr(module, "_record_score", None)
+    results = {"sqlite_us": None, "log_us": None}
+    if record is None:
+        return results
+    from score_store import SCORE_FILES, open_score_store
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(_Sink()):
+        for kind in sorted(SCORE_FILES):
+            store = open_score_store(kind, Path(directory) / f"scores.{kind}", Path(directory) / "none.json")
+            try:
+
+                def batch() -> int:
+                    for _ in range(50):
+                        total = rng.randint(5, 30)
+                        record(rng.choice(module.LETTER_CHOICES), rng.randint(0, total), total, store)
+                    return 50
+
+                results[f"{kind}_us"] = 1e6 / best_rate(batch, repeat)
+            finally:
+                store.close()
+    return results
+
+
+def round_script(module: ModuleType) -> list[str]:
+    """Inputs for one round on ROUND_LETTER that touch every kind of guess, then quit."""
+    targets = list(module.LETTER_INDEX[ROUND_LETTER])
+    script = [ROUND_LETTER]
+    for number, name in enumerate(targets[:-2]):
+        script.append(name.lower() if number % 2 else name)
+        if number % 4 == 0:
+            script.append(name)  # repeat
+    script += ["france", "qqqzzx", "hint", "status", "help", "", "done"]
+    return script
+
+
+def bench_rounds(module: ModuleType, repeat: int) -> dict:
+    script = round_script(module)
+
+    def batch() -> int:
+        feed = iter(script)
+        saved = builtins.input
+        builtins.input = lambda prompt="": next(feed)
+        try:
+            module.play_round()
+        finally:
+            builtins.input = saved
+        return 1
+
+    with contextlib.redirect_stdout(_Sink()):
+        rate = best_rate(batch, repeat)
+    return {"rounds_per_sec": rate, "inputs_per_round": len(script) - 1}
+
+
+def bench_import(path: Path, runs: int = IMPORT_RUNS) -> dict:
+    """
+    Median import time of the copy in fresh interpreters, from its own directory.
+    Bytecode caching is left on, and an untimed first run writes the caches,
+    so this is the import a player sees rather than a compile.
+    """
+    code = "import time; t = time.perf_counter(); import country_letter_game; print(time.perf_counter() - t)"
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    wall, cumulative = [], []
+    for run in range(runs + 1):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=path.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        if not run:
+            continue
+        wall.append(float(completed.stdout) * 1000)
+        # -X importtime lines: "import time: self [us] | cumulative | name"
+        for line in completed.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == "country_letter_game":
+                cumulative.append(int(fields[1]) / 1000)
+    return {
+        "wall_ms": statistics.median(wall),
+        "importtime_ms": statistics.median(cumulative) if cumulative else None,
+    }
+
+
+def run_benchmarks(repeat: int, copies: Iterable[str] = COPIES) -> dict:
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "import_method": IMPORT_METHOD,
+        "copies": {},
+    }
+    for name in copies:
+        path = COPIES[name]
+        module = load_copy(name, path)
+        inputs = input_sets(module, random.Random(0))
+        copy_results = bench_lookups(module, inputs, repeat)
+        copy_results["hints"] = bench_hints(module, repeat)
+        copy_results["record"] = bench_record(module, repeat)
+        copy_results["rounds"] = bench_rounds(module, repeat)
+        copy_results["import"] = bench_import(path)
+        results["copies"][name] = copy_results
+    return results
+
+
+def _flatten(results: dict, prefix: str = "") -> dict[str, float | None]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def _format(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:,.0f}" if value >= 100 else f"{value:,.2f}"
+
+
+def print_results(results: dict, baseline: dict | None = None) -> None:
+    """One table per copy; with a baseline, each metric's change (+ is better)."""
+    same_import_method = baseline is not None and baseline.get("import_method") == results["import_method"]
+    if baseline is not None and not same_import_method:
+        method = baseline.get("import_method", "cold compile")
+        print(f"The baseline timed imports differently ({method}); import times aren't compared.")
+    for name, copy_results in results["copies"].items():
+        print(f"\n{name}")
+        old = _flatten(baseline["copies"].get(name, {})) if baseline else {}
+        for metric, value in _flatten(copy_results).items():
+            line = f"  {metric:<32} {_format(value):>14}"
+            previous = old.get(metric) if same_import_method or not metric.startswith("import.") else None
+            if value and previous:
+                change = value / previous - 1
+                if metric.endswith(LATENCY_SUFFIXES):
+                    change = previous / value - 1
+                line += f"  {change:+7.1%}"
+            print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the country letter game in both copies.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per metric; the best is kept.")
+    parser.add_argument("--copy", choices=sorted(COPIES), action="append", help="Only benchmark this copy.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", type=Path, help="Earlier --output file to compare against.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1.")
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"ERROR: Couldn't read the baseline {args.baseline}: {exc}")
+            return 1
+
+    results = run_benchmarks(args.repeat, args.copy or COPIES)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
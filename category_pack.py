@@ -0,0 +1,510 @@
+"""Category packs: large answer lists for the letter game, memory-mapped from disk.
+
+A pack holds canonical names, aliases and per-letter groupings in one
+binary file. Opening a pack maps the file and reads a small header;
+nothing is decoded until it's asked for, and no per-entry Python objects
+are created. Names and normalized keys live in concatenated UTF-8 string
+tables indexed by uint32 offset arrays:
+
+    header         magic, version, counts and JSON metadata (title, noun)
+    name_offsets   names + 1 entries; names sorted by letter, then name
+    letter_table   (letter, first name, end) for each letter
+    key_offsets    keys + 1 entries; normalized names and aliases, grouped by name
+    key_targets    the name each key resolves to, ascending
+    key_order      key numbers in key byte order, for binary search
+    name_blob, key_blob
+
+Exact guesses are found by binary search over key_order. Typos are matched
+within the round's letter only, by a GuessMatcher over that letter's names
+and aliases, built the first time an exact lookup misses. Letters with more
+than FULL_INDEX_LIMIT names get the smaller one-delete index.
+
+Source files have one entry per line: the canonical name, then any
+aliases, separated by tabs.
+
+Usage:
+    python3 category_pack.py build OUT.pack SOURCE.txt [--title T] [--noun N]
+    python3 category_pack.py build OUT.pack --countries
+    python3 category_pack.py measure PACK [--json]
+    python3 category_pack.py bench [--sizes 10000,100000,500000] [--json]
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from guess_matcher import MAX_DISTANCE, GuessMatcher, normalize
+
+MAGIC = b"CLGPACK\0"
+VERSION = 1
+# magic, version, metadata bytes, names, keys, letters
+HEADER = struct.Struct("<8sIIIII")
+LITTLE_ENDIAN = sys.byteorder == "little"
+# Letters with more names than this index one delete per key, not two (see GuessMatcher)
+FULL_INDEX_LIMIT = 5000
+
+
+def letter_of(name: str) -> str:
+    """The letter a name is grouped under: the first letter of its normalized form, or ""."""
+    first = normalize(name)[:1].upper()
+    return first if first.isalpha() else ""
+
+
+def _uint32(values: Iterable[int]) -> bytes:
+    data = array("I", values)
+    if not LITTLE_ENDIAN:
+        data.byteswap()
+    return data.tobytes()
+
+
+def read_source(path: Path) -> Iterator[tuple[str, list[str]]]:
+    """(name, aliases) per non-blank line of a tab-separated source file."""
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            name, *aliases = line.rstrip("\n").split("\t")
+            if name.strip():
+                yield name, [alias for alias in aliases if alias.strip()]
+
+
+def build_pack(
+    entries: Iterable[tuple[str, Iterable[str]]],
+    path: Path,
+    title: str = "",
+    noun: str = "answers",
+) -> dict:
+    """
+    Write a pack from (name, aliases) pairs. The first of duplicate names wins;
+    names that don't start with a letter are skipped. Like the country tables,
+    aliases override names that normalize to the same key.
+    Returns counts of what was written.
+    """
+    aliases_of: dict[str, list[str]] = {}
+    for name, aliases in entries:
+        name = " ".join(name.split())
+        aliases_of.setdefault(name, []).extend(aliases)
+    grouped = sorted((letter_of(name), name) for name in aliases_of)
+    skipped = sum(1 for letter, _ in grouped if not letter)
+    grouped = [pair for pair in grouped if pair[0]]
+    names = [name for _, name in grouped]
+
+    key_target: dict[str, int] = {}
+    for number, name in enumerate(names):
+        key_target.setdefault(normalize(name), number)
+    for number, name in enumerate(names):
+        for alias in aliases_of[name]:
+            key_target[normalize(alias)] = number
+    key_target.pop("", None)
+    keys = sorted(key_target, key=lambda key: (key_target[key], key))
+    encoded_keys = [key.encode("utf-8") for key in keys]
+    key_order = sorted(range(len(keys)), key=encoded_keys.__getitem__)
+
+    letters = []
+    for number, (letter, _) in enumerate(grouped):
+        if not letters or letters[-1][0] != ord(letter):
+            letters.append([ord(letter), number, number])
+        letters[-1][2] = number + 1
+
+    encoded_names = [name.encode("utf-8") for name in names]
+    name_offsets = [0]
+    for data in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(data))
+    key_offsets = [0]
+    for data in encoded_keys:
+        key_offsets.append(key_offsets[-1] + len(data))
+
+    meta = json.dumps({"title": title, "noun": noun}).encode("utf-8")
+    head = HEADER.pack(MAGIC, VERSION, len(meta), len(names), len(keys), len(letters)) + meta
+    head += b"\0" * (-len(head) % 4)
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "wb") as pack:
+        pack.write(head)
+        pack.write(_uint32(name_offsets))
+        pack.write(_uint32(value for letter in letters for value in letter))
+        pack.write(_uint32(key_offsets))
+        pack.write(_uint32(key_target[key] for key in keys))
+        pack.write(_uint32(key_order))
+        pack.write(b"".join(encoded_names))
+        pack.write(b"".join(encoded_keys))
+    os.replace(temp, path)
+    return {"names": len(names), "keys": len(keys), "letters": len(letters), "skipped": skipped}
+
+
+class PackGroup(Sequence):
+    """The names under one letter, decoded on access."""
+
+    __slots__ = ("_pack", "_start", "_end")
+
+    def __init__(self, pack: "CategoryPack", start: int, end: int):
+        self._pack = pack
+        self._start = start
+        self._end = end
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._pack.name(self._start + i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._pack.name(self._start + index)
+
+    def __iter__(self) -> Iterator[str]:
+        name = self._pack.name
+        for number in range(self._start, self._end):
+            yield name(number)
+
+
+class PackIndex(Mapping):
+    """letter -> PackGroup, a drop-in for the game's LETTER_INDEX."""
+
+    __slots__ = ("_pack",)
+
+    def __init__(self, pack: "CategoryPack"):
+        self._pack = pack
+
+    def __getitem__(self, letter: str) -> PackGroup:
+        start, end = self._pack._groups[letter]
+        return PackGroup(self._pack, start, end)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pack._groups)
+
+    def __len__(self) -> int:
+        return len(self._pack._groups)
+
+
+class CategoryPack:
+    letter_of = staticmethod(letter_of)
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as pack:
+            try:
+                self._mmap = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise ValueError(f"{self.path} is not a category pack.")
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"{self.path} is not a category pack.")
+        magic, version, meta_len, names, keys, letters = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a category pack.")
+        if version != VERSION:
+            raise ValueError(f"{self.path} is pack version {version}; this game reads version {VERSION}.")
+        meta = json.loads(self._mmap[HEADER.size : HEADER.size + meta_len])
+        self.title: str = meta.get("title") or self.path.stem
+        self.noun: str = meta.get("noun") or "answers"
+
+        self._position = HEADER.size + meta_len + (-(HEADER.size + meta_len) % 4)
+        self._name_offsets = self._array(names + 1)
+        letter_table = self._array(letters * 3)
+        self._key_offsets = self._array(keys + 1)
+        self._key_targets = self._array(keys)
+        self._key_order = self._array(keys)
+        self._name_base = self._position
+        self._key_base = self._name_base + self._name_offsets[names]
+        if self._key_base + self._key_offsets[keys] > len(self._mmap):
+            raise ValueError(f"{self.path} is truncated.")
+
+        self._groups: dict[str, tuple[int, int]] = {
+            chr(letter_table[i]): (letter_table[i + 1], letter_table[i + 2])
+            for i in range(0, len(letter_table), 3)
+        }
+        self.letter_index = PackIndex(self)
+        self.letters = tuple(self._groups)
+        self._matcher: tuple[str, GuessMatcher] | None = None
+
+    def _array(self, count: int):
+        start = self._position
+        self._position += 4 * count
+        if self._position > len(self._mmap):
+            raise ValueError(f"{self.path} is truncated.")
+        if LITTLE_ENDIAN:
+            return memoryview(self._mmap)[start : self._position].cast("I")
+        values = array("I", self._mmap[start : self._position])
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return len(self._name_offsets) - 1
+
+    def name(self, number: int) -> str:
+        offsets, base = self._name_offsets, self._name_base
+        return self._mmap[base + offsets[number] : base + offsets[number + 1]].decode("utf-8")
+
+    def _key(self, number: int) -> bytes:
+        offsets, base = self._key_offsets, self._key_base
+        return self._mmap[base + offsets[number] : base + offsets[number + 1]]
+
+    def lookup(self, key: str) -> int | None:
+        """Number of the name a normalized key resolves to exactly."""
+        target = key.encode("utf-8")
+        order = self._key_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            probe = self._key(order[middle])
+            if probe < target:
+                low = middle + 1
+            elif probe > target:
+                high = middle
+            else:
+                return self._key_targets[order[middle]]
+        return None
+
+    def matcher(self, letter: str) -> GuessMatcher:
+        """Typo-tolerant matcher over one letter's names and aliases; the last one built is kept."""
+        if self._matcher is not None and self._matcher[0] == letter:
+            return self._matcher[1]
+        start, end = self._groups[letter]
+        names = self.letter_index[letter]
+        first = bisect.bisect_left(self._key_targets, start)
+        last = bisect.bisect_left(self._key_targets, end)
+        aliases = {
+            self._key(number).decode("utf-8"): names[self._key_targets[number] - start]
+            for number in range(first, last)
+        }
+        depth = MAX_DISTANCE if len(names) <= FULL_INDEX_LIMIT else 1
+        matcher = GuessMatcher(names, aliases, index_distance=depth)
+        self._matcher = (letter, matcher)
+        return matcher
+
+    def resolve(self, raw: str | None, letter: str | None = None) -> str | None:
+        """
+        Canonical name for a guess. Exact matches are found in any letter;
+        typos only among letter's names, when a letter is given.
+        """
+        key = normalize(raw)
+        if not key:
+            return None
+        number = self.lookup(key)
+        if number is not None:
+            return self.name(number)
+        if letter not in self._groups:
+            return None
+        return self.matcher(letter).resolve(raw)
+
+    def close(self) -> None:
+        self._matcher = None
+        for name in ("_name_offsets", "_key_offsets", "_key_targets", "_key_order"):
+            values = getattr(self, name)
+            if isinstance(values, memoryview):
+                values.release()
+        self._mmap.close()
+
+
+def _country_entries() -> list[tuple[str, list[str]]]:
+    from country_data import ALT, COUNTRIES
+
+    return [(country, [alt for alt, name in ALT.items() if name == country]) for country in COUNTRIES]
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, not current
+
+
+def measure(path: Path, lookups: int = 5000) -> dict:
+    """Load time, lookup costs and RSS for one pack, in this process."""
+    rng = random.Random(0)
+    base_rss = _rss_kb()
+    started = time.perf_counter()
+    pack = CategoryPack(path)
+    open_ms = (time.perf_counter() - started) * 1000
+    open_rss = _rss_kb()
+
+    sample = [pack.name(rng.randrange(len(pack))) for _ in range(lookups)]
+    started = time.perf_counter()
+    for name in sample:
+        pack.resolve(name)
+    exact_us = (time.perf_counter() - started) / lookups * 1e6
+    lookup_rss = _rss_kb()
+
+    letter = max(pack.letters, key=lambda letter: len(pack.letter_index[letter]))
+    group = pack.letter_index[letter]
+    started = time.perf_counter()
+    pack.matcher(letter)
+    matcher_ms = (time.perf_counter() - started) * 1000
+    typos = [name[:2] + name[3:] for name in (group[rng.randrange(len(group))] for _ in range(500))]
+    started = time.perf_counter()
+    for typo in typos:
+        pack.resolve(typo, letter)
+    typo_us = (time.perf_counter() - started) / len(typos) * 1e6
+    results = {
+        "pack": str(path),
+        "names": len(pack),
+        "file_mb": path.stat().st_size / 1e6,
+        "open_ms": open_ms,
+        "open_rss_mb": (open_rss - base_rss) / 1024,
+        "exact_us": exact_us,
+        "lookup_rss_mb": (lookup_rss - base_rss) / 1024,
+        "largest_letter": letter,
+        "largest_letter_names": len(group),
+        "letter_matcher_ms": matcher_ms,
+        "typo_us": typo_us,
+        "letter_rss_mb": (_rss_kb() - base_rss) / 1024,
+    }
+    pack.close()
+    return results
+
+
+def measure_lists(path: Path) -> dict:
+    """
+    The pack's names held the way country_letter_game holds COUNTRIES: a list
+    of str, a normalized-name dict and per-letter tuples (aliases left out).
+    """
+    base_rss = _rss_kb()
+    started = time.perf_counter()
+    pack = CategoryPack(path)
+    names = [pack.name(number) for number in range(len(pack))]
+    pack.close()
+    canon = {normalize(name): name for name in names}
+    grouped: dict[str, list[str]] = {}
+    for name in names:
+        grouped.setdefault(letter_of(name), []).append(name)
+    index = {letter: tuple(group) for letter, group in grouped.items()}
+    load_ms = (time.perf_counter() - started) * 1000
+    rss = _rss_kb() - base_rss
+    return {"names": len(names), "keys": len(canon), "letters": len(index), "load_ms": load_ms, "rss_mb": rss / 1024}
+
+
+def synthetic_entries(count: int, seed: int = 0) -> Iterator[tuple[str, list[str]]]:
+    """Made-up place-like names of one to three words; one in ten has an alias."""
+    rng = random.Random(seed)
+    onsets = "b br c ch d dr f g gr h j k l m n p pr qu r s st sh t tr v w y z".split()
+    vowels = "a e i o u ai ea ou ia".split()
+    codas = ["", "", "n", "r", "s", "l", "nd", "rt", "m"]
+
+    def word() -> str:
+        return "".join(
+            rng.choice(onsets) + rng.choice(vowels) + rng.choice(codas) for _ in range(rng.randint(2, 4))
+        ).capitalize()
+
+    for _ in range(count):
+        name = " ".join(word() for _ in range(rng.choice((1, 1, 1, 2, 2, 3))))
+        yield name, [f"{name} {word()}"] if rng.random() < 0.1 else []
+
+
+def bench(sizes: list[int]) -> list[dict]:
+    """Build synthetic packs and measure each in a fresh interpreter."""
+    import subprocess
+    import tempfile
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = Path(directory) / f"synthetic-{size}.pack"
+            started = time.perf_counter()
+            counts = build_pack(synthetic_entries(size), path, f"{size:,} synthetic names", "places")
+            build_s = time.perf_counter() - started
+            row = {}
+            for command in ("measure", "measure-lists"):
+                output = subprocess.run(
+                    [sys.executable, __file__, command, str(path), "--json"],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                row[command] = json.loads(output)
+            rows.append({"size": size, "build_s": build_s, **counts, **row["measure"], "lists": row["measure-lists"]})
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and inspect letter game category packs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Write a pack from a tab-separated source file.")
+    build.add_argument("output", type=Path)
+    build.add_argument("source", type=Path, nargs="?")
+    build.add_argument("--countries", action="store_true", help="Build from the built-in country list.")
+    build.add_argument("--title", default="")
+    build.add_argument("--noun", default="answers", help="What the answers are called, e.g. 'cities'.")
+    for name, description in (
+        ("measure", "Load time, lookup cost and RSS for one pack."),
+        ("measure-lists", "RSS of the same names held as Python lists and dicts."),
+    ):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("pack", type=Path)
+        command.add_argument("--json", action="store_true")
+    bench_parser = commands.add_parser("bench", help="Measure synthetic packs of several sizes.")
+    bench_parser.add_argument("--sizes", default="10000,100000,500000")
+    bench_parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if args.countries == (args.source is not None):
+            parser.error("Give either a source file or --countries.")
+        if args.countries:
+            entries = _country_entries()
+            title, noun = args.title or "Countries", "countries"
+        else:
+            try:
+                entries = list(read_source(args.source))
+            except (OSError, UnicodeDecodeError) as exc:
+                print(f"ERROR: Couldn't read {args.source}: {exc}")
+                return 1
+            title, noun = args.title or args.source.stem, args.noun
+        counts = build_pack(entries, args.output, title, noun)
+        print(
+            f"Wrote {args.output}: {counts['names']:,} names, {counts['keys']:,} keys, "
+            f"{counts['letters']} letters ({counts['skipped']:,} skipped: no leading letter)"
+        )
+        return 0
+
+    if args.command in ("measure", "measure-lists"):
+        try:
+            results = measure(args.pack) if args.command == "measure" else measure_lists(args.pack)
+        except (OSError, ValueError) as exc:
+            print(f"ERROR: {exc}")
+            return 1
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            for key, value in results.items():
+                print(f"{key:>22}: {value:,.2f}" if isinstance(value, float) else f"{key:>22}: {value}")
+        return 0
+
+    try:
+        sizes = [int(value) for value in args.sizes.split(",")]
+    except ValueError as exc:
+        parser.error(str(exc))
+    rows = bench(sizes)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print("RSS in MB added by the pack: right after opening, after 5,000 random exact")
+    print("lookups (touched pages of the mapped file), and with the largest letter's typo")
+    print("matcher built. 'lists' holds the same names as lists of str and dicts instead.\n")
+    print(
+        f"{'names':>8} {'file MB':>8} {'open ms':>8} {'exact us':>9} {'letter':>7} {'matcher ms':>11} "
+        f"{'typo us':>8} {'RSS open':>9} {'lookups':>8} {'matcher':>8} {'lists':>6}"
+    )
+    for row in rows:
+        print(
+            f"{row['names']:>8,} {row['file_mb']:>8.1f} {row['open_ms']:>8.2f} {row['exact_us']:>9.1f} "
+            f"{row['largest_letter_names']:>7,} {row['letter_matcher_ms']:>11.0f} {row['typo_us']:>8.0f} "
+            f"{row['open_rss_mb']:>9.1f} {row['lookup_rss_mb']:>8.1f} {row['letter_rss_mb']:>8.1f} "
+            f"{row['lists']['rss_mb']:>6.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
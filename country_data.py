@@ -0,0 +1,210 @@
+"""Country lists and the lookup tables built from them, shared by both game copies.
+
+COUNTRIES and ALT are the source lists. The tables derived from them are
+CANON (normalized name or alias -> country), LETTER_INDEX (letter -> sorted
+countries) and the guess matcher's exact and typo indexes. They are built
+once and saved to a marshal snapshot in __pycache__, so importing the game
+just loads them. The snapshot records a checksum of this file (the lists
+and the code that builds the tables) and guess_matcher.py, and is rebuilt
+whenever that checksum no longer matches.
+
+Usage:
+    python3 country_data.py [--check]
+"""
+
+import marshal
+import os
+import sys
+import zlib
+from collections import defaultdict
+
+SNAPSHOT_VERSION = 1
+# os.path rather than pathlib: this module is on every game's import path
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_FILE = os.path.join(_HERE, "__pycache__", f"country_index.{sys.implementation.cache_tag}.marshal")
+# The tables depend on the lists and build_tables() here and on the matcher
+SOURCES = (os.path.abspath(__file__), os.path.join(_HERE, "guess_matcher.py"))
+
+# Canonical common-English country names (193 UN members + 2 observers)
+COUNTRIES = [
+    "Afghanistan","Albania","Algeria","Andorra","Angola","Antigua and Barbuda","Argentina","Armenia",
+    "Australia","Austria","Azerbaijan","Bahamas","Bahrain","Bangladesh","Barbados","Belarus","Belgium",
+    "Belize","Benin","Bhutan","Bolivia","Bosnia and Herzegovina","Botswana","Brazil","Brunei","Bulgaria",
+    "Burkina Faso","Burundi","Cabo Verde","Cambodia","Cameroon","Canada","Central African Republic","Chad",
+    "Chile","China","Colombia","Comoros","Congo","Costa Rica","Côte d'Ivoire","Croatia","Cuba","Cyprus",
+    "Czechia","Democratic Republic of the Congo","Denmark","Djibouti","Dominica","Dominican Republic",
+    "Ecuador","Egypt","El Salvador","Equatorial Guinea","Eritrea","Estonia","Eswatini","Ethiopia","Fiji",
+    "Finland","France","Gabon","Gambia","Georgia","Germany","Ghana","Greece","Grenada","Guatemala","Guinea",
+    "Guinea-Bissau","Guyana","Haiti","Honduras","Hungary","Iceland","India","Indonesia","Iran","Iraq",
+    "Ireland","Israel","Italy","Jamaica","Japan","Jordan","Kazakhstan","Kenya","Kiribati","North Korea",
+    "South Korea","Kuwait","Kyrgyzstan","Laos","Latvia","Lebanon","Lesotho","Liberia","Libya",
+    "Liechtenstein","Lithuania","Luxembourg","Madagascar","Malawi","Malaysia","Maldives","Mali","Malta",
+    "Marshall Islands","Mauritania","Mauritius","Mexico","Micronesia","Moldova","Monaco","Mongolia",
+    "Montenegro","Morocco","Mozambique","Myanmar","Namibia","Nauru","Nepal","Netherlands","New Zealand",
+    "Nicaragua","Niger","Nigeria","North Macedonia","Norway","Oman","Pakistan","Palau","Palestine","Panama",
+    "Papua New Guinea","Paraguay","Peru","Philippines","Poland","Portugal","Qatar","Romania","Russia",
+    "Rwanda","Saint Kitts and Nevis","Saint Lucia","Saint Vincent and the Grenadines","Samoa","San Marino",
+    "São Tomé and Príncipe","Saudi Arabia","Senegal","Serbia","Seychelles","Sierra Leone","Singapore",
+    "Slovakia","Slovenia","Solomon Islands","Somalia","South Africa","South Sudan","Spain","Sri Lanka",
+    "Sudan","Suriname","Sweden","Switzerland","Syria","Tajikistan","Tanzania","Thailand","Timor-Leste",
+    "Togo","Tonga","Trinidad and Tobago","Tunisia","Turkey","Turkmenistan","Tuvalu","Uganda","Ukraine",
+    "United Arab Emirates","United Kingdom","United States","Uruguay","Uzbekistan","Vanuatu","Vatican City",
+    "Venezuela","Vietnam","Yemen","Zambia","Zimbabwe"
+]
+
+# Accept common alternate names -> canonical display name
+ALT = {
+    "ivory coast": "Côte d'Ivoire",
+    "cote d ivoire": "Côte d'Ivoire",
+    "cote d'ivoire": "Côte d'Ivoire",
+    "cape verde": "Cabo Verde",
+    "east timor": "Timor-Leste",
+    "lao pdr": "Laos",
+    "lao people s democratic republic": "Laos",
+    "burma": "Myanmar",
+    "swaziland": "Eswatini",
+    "czech republic": "Czechia",
+    "vatican": "Vatican City",
+    "holy see": "Vatican City",
+    "north korea": "North Korea",
+    "democratic people s republic of korea": "North Korea",
+    "south korea": "South Korea",
+    "republic of korea": "South Korea",
+    "the bahamas": "Bahamas",
+    "the gambia": "Gambia",
+    "republic of the congo": "Congo",
+    "democratic republic of the congo": "Democratic Republic of the Congo",
+    "bolivia plurinational state of": "Bolivia",
+    "moldova republic of": "Moldova",
+    "russian federation": "Russia",
+    "syrian arab republic": "Syria",
+    "united states of america": "United States",
+    "u s a": "United States",
+    "u s": "United States",
+    "uk": "United Kingdom",
+    "u k": "United Kingdom",
+    "united kingdom of great britain and northern ireland": "United Kingdom",
+    "myanmar burma": "Myanmar",
+    "brunei darussalam": "Brunei",
+    "iran islamic republic of": "Iran",
+    "kyrgyz republic": "Kyrgyzstan",
+    "lao": "Laos",
+    "micronesia federated states of": "Micronesia",
+    "palestine state of": "Palestine",
+    "tanzania united republic of": "Tanzania",
+    "venezuela bolivarian republic of": "Venezuela",
+    "viet nam": "Vietnam",
+    "timor leste": "Timor-Leste",
+    "sao tome and principe": "São Tomé and Príncipe",
+    "cabo verde": "Cabo Verde",  # allow without diacritics via _norm
+    "eswatini kingdom of": "Eswatini",
+}
+
+
+def source_checksum() -> int:
+    """Checksum of everything the tables are derived from."""
+    checksum = SNAPSHOT_VERSION
+    for path in SOURCES:
+        with open(path, "rb") as source:
+            checksum = zlib.crc32(source.read(), checksum)
+    return checksum
+
+
+def build_tables() -> dict:
+    from guess_matcher import GuessMatcher, normalize
+
+    canon = {normalize(name): name for name in COUNTRIES}
+    # Merge ALT into the acceptance map, pointing to their canonical display
+    for alt, name in ALT.items():
+        canon[normalize(alt)] = name
+    letters: dict[str, list[str]] = {}
+    for name in COUNTRIES:
+        first_char = name[0].upper()
+        if first_char.isalpha():
+            letters.setdefault(first_char, []).append(name)
+    names, exact, variants = GuessMatcher(COUNTRIES, ALT).tables()
+    return {
+        "checksum": source_checksum(),
+        "canon": canon,
+        "letter_index": {letter: tuple(sorted(group)) for letter, group in letters.items()},
+        "matcher": (names, exact, variants),
+    }
+
+
+def read_snapshot(path: str = SNAPSHOT_FILE) -> dict | None:
+    """The saved tables, or None if they're missing, unreadable or stale."""
+    try:
+        # Read it whole: marshal.load on a file object reads in tiny pieces, ten times slower
+        with open(path, "rb") as snapshot:
+            tables = marshal.loads(snapshot.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(tables, dict) or tables.get("checksum") != source_checksum():
+        return None
+    return tables
+
+
+def write_snapshot(tables: dict, path: str = SNAPSHOT_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as snapshot:
+        marshal.dump(tables, snapshot)
+    os.replace(temp, path)
+
+
+def load_tables() -> dict:
+    """The snapshot if it's current; otherwise rebuild and try to save a fresh one."""
+    tables = read_snapshot()
+    if tables is None:
+        tables = build_tables()
+        if not sys.dont_write_bytecode:
+            try:
+                write_snapshot(tables)
+            except OSError:
+                pass  # read-only checkout: rebuild on every import
+    return tables
+
+
+_TABLES = load_tables()
+CANON: dict[str, str] = _TABLES["canon"]
+LETTER_INDEX: defaultdict[str, tuple[str, ...]] = defaultdict(list, _TABLES["letter_index"])
+LETTER_CHOICES = tuple(sorted(LETTER_INDEX))
+
+
+def country_matcher():
+    """A GuessMatcher over COUNTRIES and ALT, from the snapshot's tables."""
+    from guess_matcher import GuessMatcher
+
+    return GuessMatcher.from_tables(*_TABLES["matcher"])
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Rebuild or check the country table snapshot.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the snapshot is missing or stale.")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        if read_snapshot() is None:
+            print(f"{SNAPSHOT_FILE} is missing or stale.")
+            return 1
+        print(f"{SNAPSHOT_FILE} is up to date.")
+        return 0
+    started = time.perf_counter()
+    tables = build_tables()
+    built = time.perf_counter() - started
+    write_snapshot(tables)
+    started = time.perf_counter()
+    read_snapshot()
+    loaded = time.perf_counter() - started
+    print(
+        f"Wrote {SNAPSHOT_FILE} ({os.path.getsize(SNAPSHOT_FILE):,} bytes): "
+        f"built in {built * 1000:.1f} ms, loads in {loaded * 1000:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
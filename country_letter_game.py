@@ -1,121 +1,26 @@
 
-import argparse
-import json
+import functools
 import random
-import re
-import unicodedata
-from pathlib import Path
-
-SCORE_FILE = Path.home() / ".country_letter_game_scores.json"
-
-def _norm(s: str) -> str:
-    """Lowercase, strip accents, drop punctuation & extra spaces for robust matching."""
-    if s is None:
-        return ""
-    s = s.lower().strip()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = re.sub(r"[^a-z0-9\s]", " ", s)   # remove punctuation/symbols
-    s = re.sub(r"\s+", " ", s).strip()
-    # drop leading 'the ' for inputs like 'the gambia', 'the bahamas'
-    if s.startswith("the "):
-        s = s[4:]
-    return s
-
-# Canonical common-English country names (193 UN members + 2 observers)
-COUNTRIES = [
-    "Afghanistan","Albania","Algeria","Andorra","Angola","Antigua and Barbuda","Argentina","Armenia",
-    "Australia","Austria","Azerbaijan","Bahamas","Bahrain","Bangladesh","Barbados","Belarus","Belgium",
-    "Belize","Benin","Bhutan","Bolivia","Bosnia and Herzegovina","Botswana","Brazil","Brunei","Bulgaria",
-    "Burkina Faso","Burundi","Cabo Verde","Cambodia","Cameroon","Canada","Central African Republic","Chad",
-    "Chile","China","Colombia","Comoros","Congo","Costa Rica","Côte d'Ivoire","Croatia","Cuba","Cyprus",
-    "Czechia","Democratic Republic of the Congo","Denmark","Djibouti","Dominica","Dominican Republic",
-    "Ecuador","Egypt","El Salvador","Equatorial Guinea","Eritrea","Estonia","Eswatini","Ethiopia","Fiji",
-    "Finland","France","Gabon","Gambia","Georgia","Germany","Ghana","Greece","Grenada","Guatemala","Guinea",
-    "Guinea-Bissau","Guyana","Haiti","Honduras","Hungary","Iceland","India","Indonesia","Iran","Iraq",
-    "Ireland","Israel","Italy","Jamaica","Japan","Jordan","Kazakhstan","Kenya","Kiribati","North Korea",
-    "South Korea","Kuwait","Kyrgyzstan","Laos","Latvia","Lebanon","Lesotho","Liberia","Libya",
-    "Liechtenstein","Lithuania","Luxembourg","Madagascar","Malawi","Malaysia","Maldives","Mali","Malta",
-    "Marshall Islands","Mauritania","Mauritius","Mexico","Micronesia","Moldova","Monaco","Mongolia",
-    "Montenegro","Morocco","Mozambique","Myanmar","Namibia","Nauru","Nepal","Netherlands","New Zealand",
-    "Nicaragua","Niger","Nigeria","North Macedonia","Norway","Oman","Pakistan","Palau","Palestine","Panama",
-    "Papua New Guinea","Paraguay","Peru","Philippines","Poland","Portugal","Qatar","Romania","Russia",
-    "Rwanda","Saint Kitts and Nevis","Saint Lucia","Saint Vincent and the Grenadines","Samoa","San Marino",
-    "São Tomé and Príncipe","Saudi Arabia","Senegal","Serbia","Seychelles","Sierra Leone","Singapore",
-    "Slovakia","Slovenia","Solomon Islands","Somalia","South Africa","South Sudan","Spain","Sri Lanka",
-    "Sudan","Suriname","Sweden","Switzerland","Syria","Tajikistan","Tanzania","Thailand","Timor-Leste",
-    "Togo","Tonga","Trinidad and Tobago","Tunisia","Turkey","Turkmenistan","Tuvalu","Uganda","Ukraine",
-    "United Arab Emirates","United Kingdom","United States","Uruguay","Uzbekistan","Vanuatu","Vatican City",
-    "Venezuela","Vietnam","Yemen","Zambia","Zimbabwe"
-]
-
-# Accept common alternate names -> canonical display name
-ALT = {
-    "ivory coast": "Côte d'Ivoire",
-    "cote d ivoire": "Côte d'Ivoire",
-    "cote d'ivoire": "Côte d'Ivoire",
-    "cape verde": "Cabo Verde",
-    "east timor": "Timor-Leste",
-    "lao pdr": "Laos",
-    "lao people s democratic republic": "Laos",
-    "burma": "Myanmar",
-    "swaziland": "Eswatini",
-    "czech republic": "Czechia",
-    "vatican": "Vatican City",
-    "holy see": "Vatican City",
-    "north korea": "North Korea",
-    "democratic people s republic of korea": "North Korea",
-    "south korea": "South Korea",
-    "republic of korea": "South Korea",
-    "the bahamas": "Bahamas",
-    "the gambia": "Gambia",
-    "republic of the congo": "Congo",
-    "democratic republic of the congo": "Democratic Republic of the Congo",
-    "bolivia plurinational state of": "Bolivia",
-    "moldova republic of": "Moldova",
-    "russian federation": "Russia",
-    "syrian arab republic": "Syria",
-    "united states of america": "United States",
-    "u s a": "United States",
-    "u s": "United States",
-    "uk": "United Kingdom",
-    "u k": "United Kingdom",
-    "united kingdom of great britain and northern ireland": "United Kingdom",
-    "myanmar burma": "Myanmar",
-    "brunei darussalam": "Brunei",
-    "iran islamic republic of": "Iran",
-    "kyrgyz republic": "Kyrgyzstan",
-    "lao": "Laos",
-    "micronesia federated states of": "Micronesia",
-    "palestine state of": "Palestine",
-    "tanzania united republic of": "Tanzania",
-    "venezuela bolivarian republic of": "Venezuela",
-    "viet nam": "Vietnam",
-    "timor leste": "Timor-Leste",
-    "sao tome and principe": "São Tomé and Príncipe",
-    "cabo verde": "Cabo Verde",  # allow without diacritics via _norm
-    "eswatini kingdom of": "Eswatini",
-}
-
-CANON = { _norm(name): name for name in COUNTRIES }
-# Merge ALT into the acceptance map, pointing to their canonical display
-for alt, canon in ALT.items():
-    CANON[_norm(alt)] = canon
-
-# Build letter index from canonical (display) names
-from collections import defaultdict
-
-LETTER_INDEX = defaultdict(list)
-for c in COUNTRIES:
-    display = c
-    first_char = display[0].upper()
-    if first_char.isalpha():
-        LETTER_INDEX[first_char].append(display)
-
-for letter, names in list(LETTER_INDEX.items()):
-    LETTER_INDEX[letter] = tuple(sorted(names))
-
-LETTER_CHOICES = tuple(sorted(LETTER_INDEX.keys()))
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, Collection, Mapping, NamedTuple, Sequence
+
+from country_data import ALT, CANON, COUNTRIES, LETTER_CHOICES, LETTER_INDEX, country_matcher
+from guess_matcher import normalize
+
+if TYPE_CHECKING:
+    # Packs, score stores and history are only imported when main() or a caller uses them,
+    # so importing the game for GameSession or the country tables stays fast
+    from category_pack import CategoryPack
+    from round_history import RoundHistory
+    from score_store import ScoreStore
+
+HINT_PENALTY = 5
+QUIT_COMMANDS = frozenset({"done", "quit", "exit"})
+
+_norm = normalize
+
+MATCHER = country_matcher()
 
 
 def _safe_input(prompt: str) -> str | None:
@@ -125,24 +30,37 @@ def _safe_input(prompt: str) -> str | None:
     except EOFError:
         return None
 
-def choose_letter() -> str:
+def _letter_index(pack: "CategoryPack | None" = None) -> Mapping[str, Sequence[str]]:
+    """Answers by letter: the built-in countries, or a category pack's."""
+    return LETTER_INDEX if pack is None else pack.letter_index
+
+
+def _letter_choices(pack: "CategoryPack | None" = None) -> tuple[str, ...]:
+    return LETTER_CHOICES if pack is None else pack.letters
+
+
+def _noun(pack: "CategoryPack | None" = None) -> str:
+    return "countries" if pack is None else pack.noun
+
+
+def choose_letter(pack: "CategoryPack | None" = None) -> str:
     while True:
         user = _safe_input("Pick a letter (A-Z): ")
         if user is None:
             raise EOFError
         user = user.strip().upper()
         if len(user) == 1 and user.isalpha():
-            if user in LETTER_INDEX:
+            if user in _letter_index(pack):
                 return user
             else:
-                print(f"No countries start with '{user}'. Try another letter.")
+                print(f"No {_noun(pack)} start with '{user}'. Try another letter.")
         else:
             print("Please enter a single letter A-Z.")
 
 
-def _print_help(letter: str, remaining_count: int):
+def _print_help(letter: str, remaining_count: int, noun: str = "countries"):
     print(
-        f"Commands: guess country names, 'hint' reveals part of a remaining country, "
+        f"Commands: guess {noun}, 'hint' reveals part of a remaining answer, "
         f"'status' shows progress, 'done' quits. Letter = {letter}, "
         f"{remaining_count} remaining."
     )
@@ -192,6 +110,40 @@ def _get_hint_level_reveal(country: str, hint_level: int) -> tuple[str, bool]:
     return obscured, False
 
 
+def _progressive_hint(
+    remaining: Collection[str],
+    current_hinted: str | None,
+    hint_levels: dict[str, int],
+    choice: Callable[[Sequence[str]], str] = random.choice,
+) -> tuple[str | None, str | None, str | None, str | None]:
+    """
+    Give a progressive hint without printing it. Continue with the current country if it's
+    still remaining, otherwise pick a new one with choice; hint_levels is updated in place.
+    Returns (hinted_country, revealed, new_current_hinted, given_up_country).
+    hinted_country is None when nothing is left to hint; given_up_country is the country
+    name if this hint fully revealed it (should be marked as give up), None otherwise.
+    """
+    if not remaining:
+        return None, None, None, None
+
+    if current_hinted and current_hinted in remaining:
+        country = current_hinted
+    else:
+        country = choice(tuple(remaining))
+    hint_level = hint_levels.get(country, 0)
+    revealed, is_fully_revealed = _get_hint_level_reveal(country, hint_level)
+    hint_levels[country] = hint_level + 1
+    if is_fully_revealed:
+        return country, revealed, None, country
+    return country, revealed, country, None
+
+
+def _format_hint(country: str, revealed: str, hint_level: int) -> str:
+    """The hint line for the hint_level-th (0-based) hint on country."""
+    level_display = f" [Hint level {hint_level + 1}]" if hint_level > 0 else ""
+    return f"  💡 Hint: {revealed} ({len(country)} letters){level_display}"
+
+
 def _show_progressive_hint(
     remaining: set[str],
     current_hinted: str | None,
@@ -204,95 +156,179 @@ def _show_progressive_hint(
     given_up_country is the country name if it was fully revealed (should be marked as give up),
     None otherwise.
     """
-    if not remaining:
+    country, revealed, current_hinted, given_up = _progressive_hint(
+        remaining, current_hinted, hint_levels
+    )
+    if country is None:
         print("  💡 Nothing left to hint!")
         return None, hint_levels, None
-    
-    # If we have a current hinted country and it's still remaining
-    if current_hinted and current_hinted in remaining:
-        hint_level = hint_levels.get(current_hinted, 0)
-        revealed, is_fully_revealed = _get_hint_level_reveal(current_hinted, hint_level)
-        
-        if is_fully_revealed:
-            # This country is fully revealed, show it and mark as give up
-            level_display = f" [Hint level {hint_level + 1}]" if hint_level > 0 else ""
-            print(f"  💡 Hint: {revealed} ({len(current_hinted)} letters){level_display}")
-            hint_levels[current_hinted] = hint_level + 1
-            # Return the country name to mark it as given up
-            return None, hint_levels, current_hinted
-        else:
-            # Continue with this country - show hint at current level, then increment
-            level_display = f" [Hint level {hint_level + 1}]" if hint_level > 0 else ""
-            print(f"  💡 Hint: {revealed} ({len(current_hinted)} letters){level_display}")
-            hint_levels[current_hinted] = hint_level + 1
-            return current_hinted, hint_levels, None
-    
-    # Pick a new random country
-    current_hinted = random.choice(tuple(remaining))
-    hint_level = hint_levels.get(current_hinted, 0)
-    revealed, is_fully_revealed = _get_hint_level_reveal(current_hinted, hint_level)
-    
-    # Check if this new country is already fully revealed (shouldn't happen, but handle it)
-    if is_fully_revealed:
-        level_display = f" [Hint level {hint_level + 1}]" if hint_level > 0 else ""
-        print(f"  💡 Hint: {revealed} ({len(current_hinted)} letters){level_display}")
-        hint_levels[current_hinted] = hint_level + 1
-        return None, hint_levels, current_hinted
-    
-    level_display = f" [Hint level {hint_level + 1}]" if hint_level > 0 else ""
-    print(f"  💡 Hint: {revealed} ({len(current_hinted)} letters){level_display}")
-    hint_levels[current_hinted] = hint_level + 1
-    return current_hinted, hint_levels, None
+    print(_format_hint(country, revealed, hint_levels[country] - 1))
+    return current_hinted, hint_levels, given_up
 
 
 def resolve_guess(raw: str) -> str | None:
-    key = _norm(raw)
-    if not key:
-        return None
-    # Direct normalized hit
-    if key in CANON:
-        return CANON[key]
-    # Try some light heuristics for "the X" or extra spaces
-    if key.startswith("the "):
-        key2 = key[4:]
-        if key2 in CANON:
-            return CANON[key2]
-    return None
+    """Canonical country for a guess, allowing small typos unless two countries fit."""
+    return MATCHER.resolve(raw)
+
+
+class Event(NamedTuple):
+    """
+    What one GameSession.step did.
+    kind is one of: "ignored" (blank input), "done", "help", "status", "hint", "give_up"
+    (a hint that fully revealed country), "no_hint", "unknown", "wrong_letter",
+    "correct", "repeat" (already guessed). country, revealed and hint_level are set
+    where they apply.
+    """
+
+    kind: str
+    country: str | None = None
+    revealed: str | None = None
+    hint_level: int = 0
+
 
+def _first_letter(name: str) -> str:
+    return name[0].upper()
 
-def _resolve_letter_arg(letter_arg: str | None, random_letter: bool) -> str | None:
+
+class GameSession:
+    """
+    The state of one round, driven by step(command) with no input or output.
+    Commands are what a player types: a guess, 'hint', 'status', 'help' or 'done'.
+    Scoring matches play_round: percent found minus hint_penalty points per hint.
+    letter_of gives the letter an answer is grouped under, for "wrong_letter".
+    """
+
+    __slots__ = (
+        "letter",
+        "targets",
+        "remaining",
+        "guessed",
+        "give_ups",
+        "hint_count",
+        "current_hinted",
+        "hint_levels",
+        "finished",
+        "hint_penalty",
+        "_resolve",
+        "_choice",
+        "_letter_of",
+    )
+
+    def __init__(
+        self,
+        letter: str,
+        targets: Sequence[str] | None = None,
+        resolve: Callable[[str], str | None] = resolve_guess,
+        choice: Callable[[Sequence[str]], str] = random.choice,
+        hint_penalty: int = HINT_PENALTY,
+        letter_of: Callable[[str], str] = _first_letter,
+    ):
+        self.letter = letter
+        self.targets = LETTER_INDEX[letter] if targets is None else tuple(targets)
+        # A dict as an ordered set, so which country gets hinted depends only on choice
+        self.remaining = dict.fromkeys(self.targets)
+        self.guessed: list[str] = []
+        self.give_ups: list[str] = []
+        self.hint_count = 0
+        self.current_hinted: str | None = None
+        self.hint_levels: dict[str, int] = {}
+        self.finished = not self.targets
+        self.hint_penalty = hint_penalty
+        self._resolve = resolve
+        self._choice = choice
+        self._letter_of = letter_of
+
+    @property
+    def base_score(self) -> float:
+        return (len(self.guessed) / len(self.targets) * 100) if self.targets else 0
+
+    @property
+    def penalty(self) -> int:
+        return self.hint_count * self.hint_penalty
+
+    @property
+    def score(self) -> int:
+        return max(0, round(self.base_score - self.penalty))
+
+    def step(self, command: str) -> Event:
+        if self.finished:
+            return Event("done")
+        guess = command.strip()
+        if not guess:
+            return Event("ignored")
+        lowered = guess.lower()
+        if lowered in QUIT_COMMANDS:
+            self.finished = True
+            return Event("done")
+        if lowered == "help":
+            return Event("help")
+        if lowered == "hint":
+            return self._hint()
+        if lowered == "status":
+            return Event("status")
+
+        match = self._resolve(guess)
+        if match is None:
+            return Event("unknown")
+        if self._letter_of(match) != self.letter:
+            return Event("wrong_letter", match)
+        if match not in self.remaining:
+            return Event("repeat", match)
+        self._remove(match)
+        self.guessed.append(match)
+        return Event("correct", match)
+
+    def _hint(self) -> Event:
+        country, revealed, self.current_hinted, given_up = _progressive_hint(
+            self.remaining, self.current_hinted, self.hint_levels, self._choice
+        )
+        if country is None:
+            return Event("no_hint")
+        self.hint_count += 1
+        hint_level = self.hint_levels[country] - 1
+        if given_up:
+            self._remove(given_up)
+            self.give_ups.append(given_up)
+            return Event("give_up", country, revealed, hint_level)
+        return Event("hint", country, revealed, hint_level)
+
+    def _remove(self, country: str) -> None:
+        del self.remaining[country]
+        # Clear hint tracking for this country if it was being hinted
+        if self.current_hinted == country:
+            self.current_hinted = None
+        self.hint_levels.pop(country, None)
+        if not self.remaining:
+            self.finished = True
+
+
+def _resolve_letter_arg(
+    letter_arg: str | None, random_letter: bool, pack: "CategoryPack | None" = None
+) -> str | None:
     """Return a validated letter choice derived from CLI flags."""
     if letter_arg and random_letter:
         raise ValueError("Choose either --letter or --random-letter, not both.")
     if random_letter:
-        return random.choice(LETTER_CHOICES)
+        return random.choice(_letter_choices(pack))
     if letter_arg:
         candidate = letter_arg.strip().upper()
         if len(candidate) != 1 or not candidate.isalpha():
             raise ValueError("--letter expects a single character A-Z.")
-        if candidate not in LETTER_INDEX:
-            raise ValueError(f"No countries start with '{candidate}'.")
+        if candidate not in _letter_index(pack):
+            raise ValueError(f"No {_noun(pack)} start with '{candidate}'.")
         return candidate
     return None
 
 
-def _load_scores(path: Path = SCORE_FILE) -> dict:
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        if isinstance(data, dict):
-            return data
-    except FileNotFoundError:
-        pass
-    except (OSError, json.JSONDecodeError):
-        pass
-    return {}
-
-
-def _save_scores(scores: dict, path: Path = SCORE_FILE) -> None:
-    try:
-        path.write_text(json.dumps(scores, indent=2, sort_keys=True), encoding="utf-8")
-    except OSError:
-        pass
+def _new_session(letter: str, pack: "CategoryPack | None" = None) -> GameSession:
+    if pack is None:
+        return GameSession(letter)
+    return GameSession(
+        letter,
+        pack.letter_index[letter],
+        functools.partial(pack.resolve, letter=letter),
+        letter_of=pack.letter_of,
+    )
 
 
 def _announce_score(
@@ -327,114 +363,97 @@ def _announce_score(
         print("Perfect streak reset.")
 
 
-def _record_score(letter: str, found: int, total: int, scores: dict):
-    ratio = found / total if total else 0.0
-    letter_best = scores.get(letter)
-    improved = False
-    if (
-        not letter_best
-        or ratio > letter_best.get("ratio", -1.0)
-        or (
-            ratio == letter_best.get("ratio", 0.0)
-            and found > letter_best.get("found", -1)
-        )
-    ):
-        scores[letter] = {"ratio": ratio, "found": found, "total": total}
-        improved = True
-
-    prev_streak = scores.get("_perfect_streak", 0)
-    streak = prev_streak
-    if total and found == total:
-        streak += 1
-    else:
-        streak = 0
-    scores["_perfect_streak"] = streak
+def _record_score(letter: str, found: int, total: int, scores: "ScoreStore"):
+    from score_store import STORE_ERRORS
 
-    _save_scores(scores)
-    _announce_score(letter, found, total, scores, improved, prev_streak)
+    try:
+        outcome = scores.record_round(letter, found, total)
+    except STORE_ERRORS as exc:
+        print(f"Couldn't save your score: {exc}", file=sys.stderr)
+        return
+    _announce_score(letter, found, total, outcome.scores, outcome.improved, outcome.prev_streak)
 
 
-def play_round(letter: str | None = None, scores: dict | None = None) -> tuple[int, int]:
+def _record_history(session: "GameSession", duration: float, history: "RoundHistory", player: str):
+    letter = session.letter
+    try:
+        history.record(
+            player, letter, len(session.guessed), len(session.targets),
+            session.hint_count, len(session.give_ups), session.score, duration,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Couldn't save this round to your history: {exc}", file=sys.stderr)
+        return
+    ranking = history.rank(player, letter)
+    if ranking is None:
+        return
+    rank, players = ranking
+    rounds = history.letter_summary(letter)["rounds"]
+    if rounds > 1:
+        beat = history.score_percentile(letter, session.score)
+        print(f"Rank on {letter}: #{rank} of {players}. This round beat {beat:.0f}% of {rounds:,} rounds on {letter}.")
+    else:
+        print(f"Rank on {letter}: #{rank} of {players}.")
+
+
+def _print_event(session: "GameSession", event: Event, noun: str = "countries") -> None:
+    """Terminal output for one step of a round."""
+    kind = event.kind
+    if kind == "help":
+        _print_help(session.letter, len(session.remaining), noun)
+    elif kind in ("hint", "give_up"):
+        print(_format_hint(event.country, event.revealed, event.hint_level))
+        if kind == "give_up":
+            print(f"  ⚠️  {event.country} marked as Give Up (fully revealed via hints)")
+    elif kind == "no_hint":
+        print("  💡 Nothing left to hint!")
+    elif kind == "status":
+        guessed, total = session.guessed, len(session.targets)
+        print(f"  📊 Status:")
+        print(f"     {noun.capitalize()} guessed: {', '.join(sorted(guessed)) if guessed else '(none)'}")
+        if session.give_ups:
+            print(f"     Give ups: {', '.join(sorted(session.give_ups))}")
+        print(f"     Remaining: {len(session.remaining)}")
+        print(f"     Score: {session.score}% ({len(guessed)}/{total} found, {session.hint_count} hints used: -{session.penalty} points)")
+    elif kind == "unknown":
+        print("  ✗ Not recognized. Try again.")
+    elif kind == "wrong_letter":
+        print(f"  ✗ '{event.country}' doesn't start with {session.letter}. Keep going!")
+    elif kind == "correct":
+        print(f"  ✓ Correct! {len(session.guessed)}/{len(session.targets)} found.")
+    elif kind == "repeat":
+        print("  • Already got that one!")
+
+
+def play_round(
+    letter: str | None = None,
+    scores: "ScoreStore | None" = None,
+    history: "RoundHistory | None" = None,
+    player: str | None = None,
+    pack: "CategoryPack | None" = None,
+) -> tuple[int, int]:
     if letter is None:
-        letter = choose_letter()
-    targets = LETTER_INDEX[letter]
-    remaining = set(targets)
-    guessed = []
-    give_ups = []
-    hint_count = 0
-    current_hinted_country: str | None = None
-    hint_levels: dict[str, int] = {}
-
-    print(f"\nYou picked '{letter}'. There are {len(targets)} countries starting with {letter}.")
+        letter = choose_letter(pack)
+    session = _new_session(letter, pack)
+    targets = session.targets
+    noun = _noun(pack)
+
+    print(f"\nYou picked '{letter}'. There are {len(targets)} {noun} starting with {letter}.")
     print("Start guessing! (Type 'done' when you want to stop.)\n")
 
-    while remaining:
+    started = time.monotonic()
+    while not session.finished:
         guess = _safe_input("Your guess: ")
         if guess is None:
             break
-        guess = guess.strip()
-        if not guess:
-            continue
-        lowered = guess.lower()
-        if lowered in {"done", "quit", "exit"}:
-            break
-        if lowered == "help":
-            _print_help(letter, len(remaining))
-            continue
-        if lowered == "hint":
-            if remaining:
-                hint_count += 1
-                current_hinted_country, hint_levels, given_up = _show_progressive_hint(
-                    remaining, current_hinted_country, hint_levels
-                )
-                # If a country was fully revealed, mark it as a give up
-                if given_up:
-                    remaining.remove(given_up)
-                    give_ups.append(given_up)
-                    # Clear hint tracking for this country
-                    if current_hinted_country == given_up:
-                        current_hinted_country = None
-                    if given_up in hint_levels:
-                        del hint_levels[given_up]
-                    print(f"  ⚠️  {given_up} marked as Give Up (fully revealed via hints)")
-            continue
-        if lowered == "status":
-            base_score = (len(guessed) / len(targets) * 100) if targets else 0
-            penalty = hint_count * 5
-            final_score = max(0, round(base_score - penalty))
-            print(f"  📊 Status:")
-            print(f"     Countries guessed: {', '.join(sorted(guessed)) if guessed else '(none)'}")
-            if give_ups:
-                print(f"     Give ups: {', '.join(sorted(give_ups))}")
-            print(f"     Remaining: {len(remaining)}")
-            print(f"     Score: {final_score}% ({len(guessed)}/{len(targets)} found, {hint_count} hints used: -{penalty} points)")
-            continue
-
-        match = resolve_guess(guess)
-        if match is None:
-            print("  ✗ Not recognized. Try again.")
-            continue
-
-        if match[0].upper() != letter:
-            print(f"  ✗ '{match}' doesn't start with {letter}. Keep going!")
-            continue
-
-        if match in remaining:
-            remaining.remove(match)
-            guessed.append(match)
-            # Clear hint tracking for this country if it was being hinted
-            if current_hinted_country == match:
-                current_hinted_country = None
-            if match in hint_levels:
-                del hint_levels[match]
-            print(f"  ✓ Correct! {len(guessed)}/{len(targets)} found.")
-        else:
-            print("  • Already got that one!")
-
-    missed = sorted(remaining)
-    base_score = (len(guessed) / len(targets) * 100) if targets else 0
-    penalty = hint_count * 5
-    final_score = max(0, round(base_score - penalty))
+        _print_event(session, session.step(guess), noun)
+    duration = time.monotonic() - started
+
+    guessed, give_ups, hint_count = session.guessed, session.give_ups, session.hint_count
+    missed = sorted(session.remaining)
+    base_score = session.base_score
+    penalty = session.penalty
+    final_score = session.score
     
     print("\nRESULTS")
     print("-------")
@@ -456,11 +475,24 @@ def play_round(letter: str | None = None, scores: dict | None = None) -> tuple[i
 
     if scores is not None:
         _record_score(letter, len(guessed), len(targets), scores)
+    if history is not None:
+        if player is None:
+            from round_history import default_player
+
+            player = default_player()
+        _record_history(session, duration, history, player)
 
     return len(guessed), len(targets)
 
 
 def main(argv: list[str] | None = None) -> int:
+    import argparse
+    from pathlib import Path
+
+    from category_pack import CategoryPack
+    from round_history import RoundHistory, default_player, player_name
+    from score_store import SCORE_FILES, STORE_ERRORS, open_score_store
+
     parser = argparse.ArgumentParser(description="Country letter guessing game.")
     parser.add_argument(
         "--letter",
@@ -469,7 +501,12 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument(
         "--random-letter",
         action="store_true",
-        help="Pick a random starting letter that has at least one country.",
+        help="Pick a random starting letter that has at least one answer.",
+    )
+    parser.add_argument(
+        "--pack",
+        type=Path,
+        help="Play a category pack (see category_pack.py) instead of countries.",
     )
     parser.add_argument(
         "--rounds",
@@ -477,28 +514,73 @@ def main(argv: list[str] | None = None) -> int:
         default=1,
         help="Number of rounds to play automatically (>=1).",
     )
+    parser.add_argument(
+        "--score-store",
+        choices=sorted(SCORE_FILES),
+        default="sqlite",
+        help="Where personal bests are kept (default: sqlite).",
+    )
+    parser.add_argument(
+        "--player",
+        default=default_player(),
+        help="Name to record rounds under in the history and leaderboards.",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Don't record rounds to the history file.",
+    )
     args = parser.parse_args(argv)
 
-    scores = _load_scores()
-
     if args.rounds < 1:
         parser.error("--rounds must be >= 1.")
+    try:
+        args.player = player_name(args.player)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    pack = None
+    if args.pack:
+        try:
+            pack = CategoryPack(args.pack)
+        except (OSError, ValueError) as exc:
+            parser.error(f"Couldn't open the pack: {exc}")
+        print(f"Playing {pack.title}: {len(pack):,} {pack.noun}. Scores and history are kept for countries only.")
 
     try:
-        initial_letter = _resolve_letter_arg(args.letter, args.random_letter)
+        initial_letter = _resolve_letter_arg(args.letter, args.random_letter, pack)
     except ValueError as exc:
         parser.error(str(exc))
 
+    scores = None
+    if pack is None:
+        try:
+            scores = open_score_store(args.score_store)
+        except STORE_ERRORS as exc:
+            print(f"Couldn't open the score store, scores won't be saved: {exc}", file=sys.stderr)
+    history = None
+    if pack is None and not args.no_history:
+        try:
+            history = RoundHistory()
+        except OSError as exc:
+            print(f"Couldn't open the round history, rounds won't be recorded: {exc}", file=sys.stderr)
+
     for round_index in range(args.rounds):
         if args.random_letter:
-            letter = random.choice(LETTER_CHOICES)
+            letter = random.choice(_letter_choices(pack))
         elif round_index == 0:
             letter = initial_letter
         else:
             letter = None
 
-        play_round(letter, scores)
+        play_round(letter, scores, history, args.player, pack)
 
+    if scores is not None:
+        scores.close()
+    if history is not None:
+        history.close()
+    if pack is not None:
+        pack.close()
     return 0
 
 
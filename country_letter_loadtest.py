@@ -0,0 +1,295 @@
+"""Load-test the multiplayer country letter server.
+
+Opens --rooms rooms of --players connections each from one asyncio process.
+Once every room is full, each room's first player starts a round, and every player then
+races through the letter's countries in its own random order. Players
+guess one at a time and wait for each result, mixing in a share of
+misspelled and junk guesses, which they follow with the right spelling.
+
+Reports messages/sec (both directions, measured from the first round
+starting to the last one ending) and GUESS round-trip latency percentiles.
+It also checks that every country was claimed exactly once per round.
+
+Usage:
+    python3 country_letter_loadtest.py [--rooms N] [--players N] [--spawn] [--port PORT] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from country_letter_game import LETTER_CHOICES, LETTER_INDEX
+from country_letter_server import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    MAX_ROUND_SECONDS,
+    MIN_ROUND_SECONDS,
+    raise_file_limit,
+    valid_round_seconds,
+)
+
+JUNK_RATE = 0.1
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadStats:
+    __slots__ = (
+        "sent",
+        "received",
+        "latencies",
+        "rounds",
+        "claims",
+        "missed",
+        "errors",
+        "first_start",
+        "last_end",
+        "full_rooms",
+        "all_full",
+    )
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.latencies: list[float] = []
+        self.rounds = 0
+        self.claims = 0
+        self.missed = 0
+        self.errors: list[str] = []
+        self.first_start: float | None = None
+        self.last_end = 0.0
+        self.full_rooms = 0
+        # Rounds start once every room is full, so connecting doesn't skew the timings
+        self.all_full = asyncio.Event()
+
+
+async def run_player(
+    host: str,
+    port: int,
+    room: str,
+    name: str,
+    players: int,
+    seconds: float,
+    think: float,
+    rooms: int,
+    stats: LoadStats,
+    rng: random.Random,
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Future | None = None
+    full = asyncio.Event()
+    started = loop.create_future()
+    over = loop.create_future()
+
+    def send(line: str) -> None:
+        stats.sent += 1
+        writer.write((line + "\n").encode("utf-8"))
+
+    async def read_events() -> None:
+        nonlocal pending
+        in_room = 0
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            stats.received += 1
+            event = json.loads(line)
+            kind = event["type"]
+            if kind == "result":
+                if pending is not None and not pending.done():
+                    pending.set_result(event)
+            elif kind == "joined":
+                in_room = len(event["players"])
+            elif kind == "player_joined":
+                in_room += 1
+            elif kind == "round_started" and not started.done():
+                started.set_result(event["letter"])
+            elif kind == "round_over" and not over.done():
+                over.set_result(event)
+            elif kind == "error":
+                stats.errors.append(event["message"])
+            if in_room >= players:
+                full.set()
+
+    reader_task = asyncio.create_task(read_events())
+    try:
+        send(f"JOIN {room} {name}")
+        await full.wait()
+        if name == "p0":
+            stats.full_rooms += 1
+            if stats.full_rooms == rooms:
+                stats.all_full.set()
+            await stats.all_full.wait()
+            send(f"START {rng.choice(LETTER_CHOICES)} {seconds}")
+        letter = await started
+        now = time.perf_counter()
+        if stats.first_start is None or now < stats.first_start:
+            stats.first_start = now
+
+        countries = list(LETTER_INDEX[letter])
+        rng.shuffle(countries)
+        for country in countries:
+            if over.done():
+                break
+            roll = rng.random()
+            if roll < JUNK_RATE:
+                guesses = ["".join(rng.choice("qwxzjv") for _ in range(8)), country]
+            elif roll < 2 * JUNK_RATE and len(country) > 8:
+                cut = rng.randrange(1, len(country))
+                guesses = [country[:cut] + country[cut + 1:], country]
+            else:
+                guesses = [country]
+            for guess in guesses:
+                if think:
+                    await asyncio.sleep(rng.expovariate(1 / think))
+                if over.done():
+                    break
+                pending = loop.create_future()
+                sent_at = time.perf_counter()
+                send(f"GUESS {guess}")
+                done, _ = await asyncio.wait({pending, over}, return_when=asyncio.FIRST_COMPLETED)
+                if pending not in done:
+                    break
+                stats.latencies.append((time.perf_counter() - sent_at) * 1000)
+                result = pending.result()["result"]
+                if result == "claimed":
+                    stats.claims += 1
+                if result != "unknown":
+                    break
+
+        result = await over
+        stats.last_end = max(stats.last_end, time.perf_counter())
+        if name == "p0":
+            stats.rounds += 1
+            claimed = sum(result["scores"].values())
+            stats.missed += len(result["missed"])
+            if claimed + len(result["missed"]) != len(LETTER_INDEX[letter]):
+                stats.errors.append(f"{room}: {claimed} claims + {len(result['missed'])} missed")
+        send("LEAVE")
+        await writer.drain()
+    finally:
+        reader_task.cancel()
+        writer.close()
+
+
+async def run_load(
+    host: str, port: int, rooms: int, players: int, seconds: float, think: float, seed: int
+) -> LoadStats:
+    stats = LoadStats()
+    rng = random.Random(seed)
+    await asyncio.gather(
+        *(
+            run_player(
+                host, port, f"room{room}", f"p{player}", players, seconds, think, rooms, stats,
+                random.Random(rng.random()),
+            )
+            for room in range(rooms)
+            for player in range(players)
+        )
+    )
+    return stats
+
+
+async def wait_for_server(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+        else:
+            writer.close()
+            return
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the country letter server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--players", type=int, default=4, help="Connections per room.")
+    parser.add_argument("--seconds", type=float, default=60, help="Round length.")
+    parser.add_argument(
+        "--think-ms", type=float, default=0, help="Mean pause between guesses (exponential)."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="Start a server subprocess for the run.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    if not valid_round_seconds(args.seconds):
+        parser.error(f"--seconds must be between {MIN_ROUND_SECONDS} and {MAX_ROUND_SECONDS}.")
+    raise_file_limit()
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, str(Path(__file__).with_name("country_letter_server.py")),
+             "--host", args.host, "--port", str(args.port)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        stats = asyncio.run(
+            run_load(args.host, args.port, args.rooms, args.players, args.seconds,
+                     args.think_ms / 1000, args.seed)
+        )
+    except OSError as exc:
+        print(f"Could not reach the server at {args.host}:{args.port}: {exc}")
+        return 1
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    elapsed = stats.last_end - (stats.first_start or stats.last_end)
+    messages = stats.sent + stats.received
+    results = {
+        "rooms": args.rooms,
+        "connections": args.rooms * args.players,
+        "rounds": stats.rounds,
+        "guesses": len(stats.latencies),
+        "claims": stats.claims,
+        "missed": stats.missed,
+        "messages": messages,
+        "seconds": elapsed,
+        "messages_per_sec": messages / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(stats.latencies, 50),
+        "p99_ms": percentile(stats.latencies, 99),
+        "max_ms": max(stats.latencies, default=0.0),
+        "errors": stats.errors[:10],
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"{results['connections']:,} connections in {args.rooms:,} rooms, "
+            f"{results['rounds']:,} rounds, {results['guesses']:,} guesses "
+            f"({results['claims']:,} claims, {results['missed']:,} missed) in {elapsed:.2f}s"
+        )
+        print(
+            f"  {results['messages_per_sec']:,.0f} messages/sec, guess latency "
+            f"p50 {results['p50_ms']:.2f} ms, p99 {results['p99_ms']:.2f} ms, "
+            f"max {results['max_ms']:.2f} ms"
+        )
+        for error in results["errors"]:
+            print(f"  error: {error}")
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,316 @@
+"""Asyncio multiplayer server for the country letter game.
+
+Players in a room race on the same letter: the first player to name a
+country claims it and scores a point. All rooms live in one process and
+share the game's read-only COUNTRIES / LETTER_INDEX tables and guess
+matcher. Resolved guesses are also cached across rooms, since everyone
+types the same names.
+
+Clients speak a line protocol over TCP: commands in, one JSON event per
+line out.
+
+    JOIN <room> <name>           join a room, creating it if needed
+    START [letter] [seconds]     start a round in your room (random letter by default, 5-600 seconds)
+    GUESS <country>              try to claim a country
+    SCORES                       scores for the current or last round
+    LEAVE                        leave the room (so does disconnecting)
+
+Events have a "type": joined, player_joined, player_left, round_started,
+result (reply to GUESS: claimed / taken / wrong_letter / unknown / no_round),
+claimed (broadcast), round_over, scores, error.
+
+Usage:
+    python3 country_letter_server.py [--host HOST] [--port PORT] [--round-seconds N]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+import random
+import signal
+
+from country_letter_game import LETTER_CHOICES, LETTER_INDEX, resolve_guess
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+ROUND_SECONDS = 60
+# Round lengths START accepts; the deadline goes straight into the shared event loop
+MIN_ROUND_SECONDS = 5
+MAX_ROUND_SECONDS = 600
+MAX_LINE = 1024
+# Bytes queued for one client before it's treated as too slow and dropped
+MAX_BUFFER = 256 * 1024
+
+cached_resolve = functools.lru_cache(maxsize=65536)(resolve_guess)
+
+
+def encode(event: dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def raise_file_limit() -> None:
+    """Allow as many open sockets as the hard limit permits."""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class Player:
+    __slots__ = ("name", "writer", "room")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.name: str | None = None
+        self.writer = writer
+        self.room: "Room | None" = None
+
+    def send(self, data: bytes) -> None:
+        writer = self.writer
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            writer.close()
+            return
+        writer.write(data)
+
+
+class Room:
+    __slots__ = ("name", "players", "letter", "remaining", "claims", "scores", "timer")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.players: dict[str, Player] = {}
+        self.letter: str | None = None
+        self.remaining: set[str] = set()
+        self.claims: dict[str, str] = {}
+        self.scores: dict[str, int] = {}
+        self.timer: asyncio.TimerHandle | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.timer is not None
+
+    def broadcast(self, event: dict) -> int:
+        """Send event to everyone in the room; returns the number of recipients."""
+        data = encode(event)
+        for player in self.players.values():
+            player.send(data)
+        return len(self.players)
+
+
+class GameServer:
+    def __init__(self, round_seconds: int = ROUND_SECONDS):
+        self.round_seconds = round_seconds
+        self.rooms: dict[str, Room] = {}
+        self.connections = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.rounds = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        player = Player(writer)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                self.messages_in += 1
+                if not self.dispatch(player, line.decode("utf-8", "replace").strip()):
+                    break
+                if writer.transport.get_write_buffer_size() > MAX_BUFFER // 2:
+                    await writer.drain()
+        finally:
+            self.leave(player)
+            self.connections -= 1
+            writer.close()
+
+    def reply(self, player: Player, event: dict) -> None:
+        self.messages_out += 1
+        player.send(encode(event))
+
+    def dispatch(self, player: Player, line: str) -> bool:
+        """Run one command; returns False when the connection should close."""
+        command, _, rest = line.partition(" ")
+        command = command.upper()
+        rest = rest.strip()
+        if command == "GUESS":
+            self.guess(player, rest)
+        elif command == "JOIN":
+            room_name, _, name = rest.partition(" ")
+            self.join(player, room_name, name.strip())
+        elif command == "START":
+            self.start(player, rest.split())
+        elif command == "SCORES":
+            if player.room is None:
+                self.reply(player, {"type": "error", "message": "Not in a room."})
+            else:
+                self.reply(player, {"type": "scores", "scores": player.room.scores})
+        elif command == "LEAVE":
+            self.leave(player)
+            return False
+        elif command:
+            self.reply(player, {"type": "error", "message": f"Unknown command '{command}'."})
+        return True
+
+    def join(self, player: Player, room_name: str, name: str) -> None:
+        if not room_name or not name:
+            self.reply(player, {"type": "error", "message": "Usage: JOIN <room> <name>"})
+            return
+        self.leave(player)
+        room = self.rooms.get(room_name)
+        if room is None:
+            room = self.rooms[room_name] = Room(room_name)
+        if name in room.players:
+            self.reply(player, {"type": "error", "message": f"'{name}' is already in {room_name}."})
+            if not room.players:
+                del self.rooms[room_name]
+            return
+        self.messages_out += room.broadcast({"type": "player_joined", "player": name})
+        player.name, player.room = name, room
+        room.players[name] = player
+        room.scores.setdefault(name, 0)
+        self.reply(
+            player,
+            {
+                "type": "joined",
+                "room": room_name,
+                "players": sorted(room.players),
+                "letter": room.letter if room.running else None,
+            },
+        )
+
+    def leave(self, player: Player) -> None:
+        room = player.room
+        if room is None:
+            return
+        del room.players[player.name]
+        player.room = None
+        if room.players:
+            self.messages_out += room.broadcast({"type": "player_left", "player": player.name})
+        else:
+            if room.timer is not None:
+                room.timer.cancel()
+            del self.rooms[room.name]
+
+    def start(self, player: Player, args: list[str]) -> None:
+        room = player.room
+        if room is None:
+            self.reply(player, {"type": "error", "message": "Not in a room."})
+            return
+        if room.running:
+            self.reply(player, {"type": "error", "message": "A round is already running."})
+            return
+        letter = args[0].upper() if args else random.choice(LETTER_CHOICES)
+        if letter not in LETTER_INDEX:
+            self.reply(player, {"type": "error", "message": f"No countries start with '{letter}'."})
+            return
+        try:
+            seconds = float(args[1]) if len(args) > 1 else self.round_seconds
+        except ValueError:
+            seconds = math.nan
+        if not valid_round_seconds(seconds):
+            message = f"START [letter] [seconds], with {MIN_ROUND_SECONDS}-{MAX_ROUND_SECONDS} seconds"
+            self.reply(player, {"type": "error", "message": message})
+            return
+
+        room.letter = letter
+        room.remaining = set(LETTER_INDEX[letter])
+        room.claims = {}
+        room.scores = dict.fromkeys(room.players, 0)
+        room.timer = asyncio.get_running_loop().call_later(seconds, self.end_round, room)
+        self.rounds += 1
+        self.messages_out += room.broadcast(
+            {"type": "round_started", "letter": letter, "total": len(room.remaining), "seconds": seconds}
+        )
+
+    def guess(self, player: Player, text: str) -> None:
+        room = player.room
+        if room is None or not room.running:
+            self.reply(player, {"type": "result", "result": "no_round"})
+            return
+        match = cached_resolve(text)
+        if match is None:
+            self.reply(player, {"type": "result", "result": "unknown"})
+        elif match[0].upper() != room.letter:
+            self.reply(player, {"type": "result", "result": "wrong_letter", "country": match})
+        elif match not in room.remaining:
+            self.reply(
+                player,
+                {"type": "result", "result": "taken", "country": match, "by": room.claims.get(match)},
+            )
+        else:
+            room.remaining.discard(match)
+            room.claims[match] = player.name
+            room.scores[player.name] = room.scores.get(player.name, 0) + 1
+            self.reply(player, {"type": "result", "result": "claimed", "country": match})
+            self.messages_out += room.broadcast(
+                {
+                    "type": "claimed",
+                    "player": player.name,
+                    "country": match,
+                    "remaining": len(room.remaining),
+                }
+            )
+            if not room.remaining:
+                room.timer.cancel()
+                self.end_round(room)
+
+    def end_round(self, room: Room) -> None:
+        room.timer = None
+        self.messages_out += room.broadcast(
+            {"type": "round_over", "letter": room.letter, "scores": room.scores, "missed": sorted(room.remaining)}
+        )
+
+
+def valid_round_seconds(seconds: float) -> bool:
+    return math.isfinite(seconds) and MIN_ROUND_SECONDS <= seconds <= MAX_ROUND_SECONDS
+
+
+async def serve(host: str, port: int, round_seconds: int) -> None:
+    game = GameServer(round_seconds)
+    server = await asyncio.start_server(game.handle, host, port, limit=MAX_LINE, backlog=4096)
+    print(f"Serving the country letter game on {host}:{port}")
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        print(
+            f"\n{game.rounds:,} rounds, {game.messages_in:,} messages in, "
+            f"{game.messages_out:,} out, {len(game.rooms):,} open rooms"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Multiplayer country letter game server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--round-seconds", type=int, default=ROUND_SECONDS, help="Default round length."
+    )
+    args = parser.parse_args(argv)
+
+    if not valid_round_seconds(args.round_seconds):
+        parser.error(f"--round-seconds must be between {MIN_ROUND_SECONDS} and {MAX_ROUND_SECONDS}.")
+    raise_file_limit()
+    try:
+        asyncio.run(serve(args.host, args.port, args.round_seconds))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+"""Typo-tolerant lookup of guesses against a list of names and aliases.
+
+Normalization is a single str.translate pass through a per-character fold
+table (lowercase, accents stripped, punctuation to spaces), followed by a
+whitespace collapse. It gives the same keys as the NFKD + regex version.
+
+Misspellings are matched with a SymSpell-style index. Every key is stored
+under the strings you get by deleting up to MAX_DISTANCE characters from
+its first PREFIX_LENGTH characters. A guess that misses the exact table
+looks up its own deletes, and only those candidates are checked with a
+bounded edit distance. Lookups therefore cost about the same whether the
+list has 200 names or 100k: exact hits take a few microseconds, typos tens
+to a hundred or so.
+
+A typo is only accepted when one canonical name is strictly closest, so
+"Nigera" (Niger / Nigeria) or "Irak" (Iran / Iraq) stays unrecognized
+rather than picking one of two neighbours.
+"""
+
+import unicodedata
+# collections.abc rather than typing: typing alone was most of this module's import time
+from collections.abc import Iterable, Mapping
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def _fold_char(ch: str) -> str:
+    """What one character becomes after lowercasing, NFKD and dropping non-alphanumerics."""
+    folded = "".join(
+        c for c in unicodedata.normalize("NFKD", ch.lower()) if not unicodedata.combining(c)
+    )
+    return "".join(c if c in "abcdefghijklmnopqrstuvwxyz0123456789" else " " for c in folded)
+
+
+class _FoldTable(dict):
+    """Translate table that folds each character the first time it's seen."""
+
+    def __missing__(self, code: int) -> str:
+        value = self[code] = _fold_char(chr(code))
+        return value
+
+
+# Filled lazily: building it up front for Latin-1/Extended took most of this module's import time
+_FOLD = _FoldTable()
+
+
+def normalize(s: str | None) -> str:
+    """Lowercase, strip accents, drop punctuation & extra spaces for robust matching."""
+    if s is None:
+        return ""
+    s = " ".join(s.translate(_FOLD).split())
+    # drop leading 'the ' for inputs like 'the gambia', 'the bahamas' (and 'the the gambia')
+    while s.startswith("the "):
+        s = s[4:]
+    return s
+
+
+def distance_limit(length: int) -> int:
+    """Edits tolerated in a key of this length: none below 4, one below 8, else two."""
+    if length < 4:
+        return 0
+    if length < 8:
+        return 1
+    return MAX_DISTANCE
+
+
+def _deletes(key: str, depth: int) -> set[str]:
+    """key's PREFIX_LENGTH prefix with every combination of up to depth characters removed."""
+    found = {key[:PREFIX_LENGTH]}
+    frontier = found
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance between a and b, or limit + 1 once it exceeds limit.
+
+    Only the diagonal band |i - j| <= limit of the DP table is filled.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2: list[int] = []
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        first, last = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        best = current[0]
+        ai = a[i - 1]
+        for j in range(first, last + 1):
+            value = previous[j - 1] + (ai != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if j > 1 and i > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value if value < over else over
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class GuessMatcher:
+    """Resolve free-typed guesses to canonical names, tolerating small typos."""
+
+    __slots__ = ("names", "exact", "_variants")
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        aliases: Mapping[str, str] | None = None,
+        index_distance: int = MAX_DISTANCE,
+    ):
+        """
+        Index names and aliases (alias -> name).
+
+        index_distance caps the deletes stored per key. At 1 the index is about
+        a third of the size and builds several times faster, but two-edit typos
+        are only found when one of the edits is an extra letter in the guess.
+        """
+        self.names: list[str] = list(names)
+        index = {name: number for number, name in enumerate(self.names)}
+        self.exact: dict[str, int] = {normalize(name): number for number, name in enumerate(self.names)}
+        for alias, name in (aliases or {}).items():
+            self.exact[normalize(alias)] = index[name]
+        self.exact.pop("", None)
+
+        # delete -> key, or a list of keys when several share it
+        self._variants: dict[str, str | list[str]] = {}
+        for key in self.exact:
+            depth = min(index_distance, distance_limit(len(key)))
+            if not depth:
+                continue
+            for variant in _deletes(key, depth):
+                existing = self._variants.get(variant)
+                if existing is None:
+                    self._variants[variant] = key
+                elif isinstance(existing, list):
+                    existing.append(key)
+                else:
+                    self._variants[variant] = [existing, key]
+
+    @classmethod
+    def from_tables(
+        cls, names: list[str], exact: dict[str, int], variants: dict[str, str | list[str]]
+    ) -> "GuessMatcher":
+        """A matcher over tables saved from another one's tables(), without re-indexing."""
+        matcher = cls.__new__(cls)
+        matcher.names, matcher.exact, matcher._variants = names, exact, variants
+        return matcher
+
+    def tables(self) -> tuple[list[str], dict[str, int], dict[str, str | list[str]]]:
+        """(names, exact, variants): plain lists, dicts and strs, so they can be marshalled."""
+        return self.names, self.exact, self._variants
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def resolve(self, raw: str | None) -> str | None:
+        """Canonical name for raw, or None if unknown or ambiguous."""
+        key = normalize(raw)
+        if not key:
+            return None
+        number = self.exact.get(key)
+        if number is not None:
+            return self.names[number]
+        number = self._closest(key)
+        return None if number is None else self.names[number]
+
+    def _closest(self, key: str) -> int | None:
+        """Number of the one name strictly closest to key within its distance limit."""
+        limit = distance_limit(len(key))
+        if not limit:
+            return None
+        best, best_distance, tied = None, limit + 1, False
+        seen = set()
+        for variant in _deletes(key, limit):
+            found = self._variants.get(variant)
+            if found is None:
+                continue
+            for candidate in (found,) if isinstance(found, str) else found:
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                allowed = min(limit, distance_limit(len(candidate)))
+                distance = edit_distance(key, candidate, allowed)
+                if distance > allowed:
+                    continue
+                number = self.exact[candidate]
+                if distance < best_distance:
+                    best, best_distance, tied = number, distance, False
+                elif distance == best_distance and number != best:
+                    tied = True
+        return None if tied else best
@@ -0,0 +1,494 @@
+"""Round history and running statistics for the country letter game.
+
+Every finished round is appended to a binary history file as one
+fixed-size RECORD (22 bytes): when, who, letter, found, total, hints,
+give-ups, score and duration. Player names are written once to a side file
+and referenced by number.
+
+Statistics are updated as each round is recorded, never by rescanning the
+history:
+
+    per letter            round count and mean score / found / hints
+    per player and letter rounds, mean score and best score
+    score percentiles     an exact 0..100 histogram per letter
+    duration percentiles  a log-bucketed sketch per letter (1% relative error)
+    leaderboards          the top_n players by best score per letter, plus a
+                          histogram of every player's best for rank queries
+
+Scores are whole percentages, so a rank or percentile query looks at no
+more than 101 buckets however many rounds or players there are. The
+statistics are saved to a snapshot that notes how many rounds it covers;
+opening the history loads it and replays only newer records. Several
+processes can record at once: appends happen under an flock, and each
+process first catches up on the records the others wrote.
+
+Usage:
+    python3 round_history.py [--player NAME] [--letter L]
+"""
+
+import argparse
+import json
+import math
+import os
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+try:
+    import fcntl
+except ImportError:  # no cross-process locking, which is fine for a single game
+    fcntl = None
+
+HISTORY_FILE = Path.home() / ".country_letter_game_history.bin"
+# time, player, duration_ms, found, total, hints, give_ups, letter, score
+RECORD = struct.Struct("<IIIHHHHBB")
+MAX_SCORE = 100
+TOP_N = 10
+SNAPSHOT_EVERY = 100000
+SKETCH_ACCURACY = 0.01
+READ_CHUNK = RECORD.size * 65536
+
+
+class Round(NamedTuple):
+    timestamp: int
+    player: str
+    letter: str
+    found: int
+    total: int
+    hints: int
+    give_ups: int
+    score: int
+    duration: float  # seconds
+
+
+class DurationSketch:
+    """
+    Streaming quantile sketch: values go into logarithmic buckets, so each
+    estimate is within `accuracy` relative error of a real value.
+    """
+
+    __slots__ = ("_log_gamma", "buckets", "count")
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY, buckets: dict[int, int] | None = None):
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.buckets = buckets or {}
+        self.count = sum(self.buckets.values())
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma) if value > 1 else 0
+
+    def add(self, value: float) -> None:
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def fraction_above(self, value: float) -> float:
+        """Share of recorded values larger than value."""
+        if not self.count:
+            return 0.0
+        index = self._index(value)
+        return sum(count for bucket, count in self.buckets.items() if bucket > index) / self.count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * (self.count - 1)
+        seen = 0
+        gamma = math.exp(self._log_gamma)
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > target:
+                return 2 * gamma ** bucket / (gamma + 1)
+        return 2 * gamma ** max(self.buckets) / (gamma + 1)
+
+
+class LetterStats:
+    __slots__ = (
+        "rounds",
+        "score_sum",
+        "found_sum",
+        "hints_sum",
+        "scores",
+        "durations",
+        "bests",
+        "players",
+        "top",
+    )
+
+    def __init__(self):
+        self.rounds = 0
+        self.score_sum = 0
+        self.found_sum = 0.0  # sum of found / total
+        self.hints_sum = 0
+        self.scores = [0] * (MAX_SCORE + 1)  # rounds per score
+        self.durations = DurationSketch()  # milliseconds
+        self.bests = [0] * (MAX_SCORE + 1)  # players per best score
+        self.players = 0
+        self.top: list[list[int]] = []  # [best, seq, player id], best first, earliest first on ties
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["durations"] = self.durations.buckets
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LetterStats":
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, data[name])
+        stats.durations = DurationSketch(buckets={int(k): v for k, v in data["durations"].items()})
+        return stats
+
+
+class RoundHistory:
+    def __init__(self, path: Path = HISTORY_FILE, top_n: int = TOP_N, snapshot_every: int = SNAPSHOT_EVERY):
+        self.path = path
+        self.top_n = top_n
+        self.snapshot_every = snapshot_every
+        self._players_path = path.with_name(path.name + ".players")
+        self._snapshot_path = path.with_name(path.name + ".stats.json")
+        self._lock_fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._reset()
+        with self._locked():
+            self._load_snapshot()
+            self._catch_up()
+
+    def _reset(self) -> None:
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        self.letters: dict[str, LetterStats] = {}
+        # Per player id: {letter: [rounds, score_sum, best]}
+        self.player_letters: list[dict[str, list[int]]] = []
+        self.count = 0
+        self._names_offset = 0
+        self._snapshot_count = 0
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _load_snapshot(self) -> None:
+        try:
+            data = json.loads(self._snapshot_path.read_text(encoding="utf-8"))
+            if (
+                data["top_n"] != self.top_n
+                or data["rounds"] * RECORD.size > self.path.stat().st_size
+                or data["names_offset"] > self._players_path.stat().st_size
+            ):
+                return
+            self.names = data["names"]
+            self.ids = {name: player_id for player_id, name in enumerate(self.names)}
+            self.letters = {letter: LetterStats.from_dict(stats) for letter, stats in data["letters"].items()}
+            self.player_letters = data["player_letters"]
+            self.count = self._snapshot_count = data["rounds"]
+            self._names_offset = data["names_offset"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+
+    def _save_snapshot(self) -> None:
+        data = {
+            "top_n": self.top_n,
+            "rounds": self.count,
+            "names_offset": self._names_offset,
+            "names": self.names,
+            "letters": {letter: stats.to_dict() for letter, stats in self.letters.items()},
+            "player_letters": self.player_letters,
+        }
+        temp = self._snapshot_path.with_name(self._snapshot_path.name + ".tmp")
+        temp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp, self._snapshot_path)
+        self._snapshot_count = self.count
+
+    def _catch_up(self) -> None:
+        """Apply names and rounds other processes added since we last read."""
+        try:
+            if os.stat(self._players_path).st_size == self._names_offset:
+                data = b""
+            else:
+                with open(self._players_path, "rb") as players:
+                    players.seek(self._names_offset)
+                    data = players.read()
+        except FileNotFoundError:
+            data = b""
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            self.ids[line] = len(self.names)
+            self.names.append(line)
+            self.player_letters.append({})
+        self._names_offset += len(complete)
+
+        end = os.fstat(self._fd).st_size
+        end -= end % RECORD.size  # skip a record still being written
+        offset = self.count * RECORD.size
+        if end < offset:
+            # The history was truncated or replaced under us; start over from it
+            self._reset()
+            self._catch_up()
+            return
+        if end == offset:
+            return
+        with open(self.path, "rb") as history:
+            history.seek(offset)
+            while offset < end:
+                data = history.read(min(READ_CHUNK, end - offset))
+                for fields in RECORD.iter_unpack(data):
+                    self._apply(*fields)
+                offset += len(data)
+
+    def _apply(
+        self,
+        timestamp: int,
+        player_id: int,
+        duration_ms: int,
+        found: int,
+        total: int,
+        hints: int,
+        give_ups: int,
+        letter_code: int,
+        score: int,
+    ) -> None:
+        seq = self.count
+        self.count += 1
+        letter = chr(letter_code)
+        stats = self.letters.get(letter)
+        if stats is None:
+            stats = self.letters[letter] = LetterStats()
+        stats.rounds += 1
+        stats.score_sum += score
+        stats.found_sum += found / total if total else 0.0
+        stats.hints_sum += hints
+        stats.scores[score] += 1
+        stats.durations.add(duration_ms)
+
+        mine = self.player_letters[player_id]
+        entry = mine.get(letter)
+        if entry is None:
+            mine[letter] = [1, score, score]
+            stats.players += 1
+            stats.bests[score] += 1
+        else:
+            entry[0] += 1
+            entry[1] += score
+            if score <= entry[2]:
+                return
+            stats.bests[entry[2]] -= 1
+            stats.bests[score] += 1
+            entry[2] = score
+        self._update_top(stats, player_id, score, seq)
+
+    def _update_top(self, stats: LetterStats, player_id: int, best: int, seq: int) -> None:
+        top = stats.top
+        for i, entry in enumerate(top):
+            if entry[2] == player_id:
+                del top[i]
+                break
+        # Ties go to whoever reached the score first
+        if len(top) >= self.top_n and best <= top[-1][0]:
+            return
+        top.append([best, seq, player_id])
+        top.sort(key=lambda entry: (-entry[0], entry[1]))
+        del top[self.top_n:]
+
+    def record(
+        self,
+        player: str,
+        letter: str,
+        found: int,
+        total: int,
+        hints: int,
+        give_ups: int,
+        score: int,
+        duration: float,
+    ) -> None:
+        """Append one round and fold it into the statistics."""
+        if len(letter) != 1 or not letter.isascii():
+            raise ValueError(f"Can't record a round for letter '{letter}'.")
+        player = player_name(player)
+        fields = (
+            int(time.time()),
+            0,
+            min(max(0, round(duration * 1000)), 0xFFFFFFFF),
+            min(found, 0xFFFF),
+            min(total, 0xFFFF),
+            min(hints, 0xFFFF),
+            min(give_ups, 0xFFFF),
+            ord(letter),
+            min(max(0, score), MAX_SCORE),
+        )
+        with self._locked():
+            self._catch_up()
+            player_id = self.ids.get(player)
+            if player_id is None:
+                line = (player + "\n").encode("utf-8")
+                with open(self._players_path, "ab") as players:
+                    players.write(line)
+                self._names_offset += len(line)
+                player_id = self.ids[player] = len(self.names)
+                self.names.append(player)
+                self.player_letters.append({})
+            fields = (fields[0], player_id) + fields[2:]
+            os.write(self._fd, RECORD.pack(*fields))
+            self._apply(*fields)
+            if self.count - self._snapshot_count >= self.snapshot_every:
+                self._save_snapshot()
+
+    def _player_id(self, player: str) -> int | None:
+        return self.ids.get(" ".join(player.split()))
+
+    def refresh(self) -> None:
+        """Pick up rounds recorded by other processes."""
+        with self._locked():
+            self._catch_up()
+
+    def rank(self, player: str, letter: str) -> tuple[int, int] | None:
+        """(rank, players) by best score on letter; players tied on a score share a rank."""
+        player_id = self._player_id(player)
+        stats = self.letters.get(letter)
+        if player_id is None or stats is None or letter not in self.player_letters[player_id]:
+            return None
+        best = self.player_letters[player_id][letter][2]
+        return 1 + sum(stats.bests[best + 1:]), stats.players
+
+    def score_percentile(self, letter: str, score: int) -> float:
+        """Percent of recorded rounds on letter that scored below score."""
+        stats = self.letters.get(letter)
+        if stats is None or not stats.rounds:
+            return 0.0
+        return sum(stats.scores[: max(0, min(score, MAX_SCORE + 1))]) / stats.rounds * 100
+
+    def duration_percentile(self, letter: str, duration: float) -> float:
+        """Percent of recorded rounds on letter that took longer than duration seconds."""
+        stats = self.letters.get(letter)
+        return stats.durations.fraction_above(duration * 1000) * 100 if stats else 0.0
+
+    def leaderboard(self, letter: str) -> list[tuple[str, int]]:
+        stats = self.letters.get(letter)
+        return [(self.names[player_id], best) for best, _, player_id in stats.top] if stats else []
+
+    def letter_summary(self, letter: str) -> dict | None:
+        stats = self.letters.get(letter)
+        if stats is None or not stats.rounds:
+            return None
+        return {
+            "rounds": stats.rounds,
+            "players": stats.players,
+            "mean_score": stats.score_sum / stats.rounds,
+            "mean_found_pct": stats.found_sum / stats.rounds * 100,
+            "mean_hints": stats.hints_sum / stats.rounds,
+            "median_seconds": stats.durations.quantile(0.5) / 1000,
+        }
+
+    def player_summary(self, player: str) -> dict[str, dict]:
+        """{letter: {"rounds", "mean_score", "best"}} for one player."""
+        player_id = self._player_id(player)
+        if player_id is None:
+            return {}
+        return {
+            letter: {"rounds": rounds, "mean_score": score_sum / rounds, "best": best}
+            for letter, (rounds, score_sum, best) in sorted(self.player_letters[player_id].items())
+        }
+
+    def iter_rounds(self, player: str | None = None) -> Iterator[Round]:
+        """Every recorded round in order, optionally for one player (reads the whole file)."""
+        self.refresh()
+        player_id = self._player_id(player) if player is not None else None
+        if player is not None and player_id is None:
+            return
+        with open(self.path, "rb") as history:
+            while data := history.read(READ_CHUNK):
+                for timestamp, pid, duration_ms, found, total, hints, give_ups, letter, score in (
+                    RECORD.iter_unpack(data[: len(data) - len(data) % RECORD.size])
+                ):
+                    if player_id is None or pid == player_id:
+                        yield Round(
+                            timestamp, self.names[pid], chr(letter), found, total, hints,
+                            give_ups, score, duration_ms / 1000,
+                        )
+
+    def close(self) -> None:
+        if self.count > self._snapshot_count:
+            try:
+                with self._locked():
+                    self._save_snapshot()
+            except OSError:
+                pass  # the history itself is safe; the next open replays it
+        os.close(self._fd)
+        os.close(self._lock_fd)
+
+
+def player_name(raw: str) -> str:
+    """The name a player's rounds are recorded under: whitespace collapsed, never empty."""
+    name = " ".join(raw.split())
+    if not name:
+        raise ValueError("A player name can't be blank.")
+    return name
+
+
+def default_player() -> str:
+    return player_name(os.environ.get("USER") or os.environ.get("USERNAME") or "player")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Show country letter game history and rankings.")
+    parser.add_argument("--player", default=default_player(), help="Whose stats to show.")
+    parser.add_argument("--letter", help="Show the summary and leaderboard for one letter.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+    try:
+        args.player = player_name(args.player)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    history = RoundHistory()
+    try:
+        if args.letter:
+            letter = args.letter.strip().upper()
+            results = {
+                "letter": letter,
+                "summary": history.letter_summary(letter),
+                "leaderboard": history.leaderboard(letter),
+                "rank": history.rank(args.player, letter),
+            }
+        else:
+            results = {"player": args.player, "letters": history.player_summary(args.player)}
+    finally:
+        history.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    elif args.letter:
+        summary = results["summary"]
+        if summary is None:
+            print(f"No rounds recorded for {letter} yet.")
+            return 0
+        print(
+            f"{letter}: {summary['rounds']:,} rounds by {summary['players']:,} players, "
+            f"mean score {summary['mean_score']:.1f}%, found {summary['mean_found_pct']:.1f}%, "
+            f"{summary['mean_hints']:.1f} hints, median {summary['median_seconds']:.0f}s"
+        )
+        for place, (name, best) in enumerate(results["leaderboard"], 1):
+            print(f"  {place:>3}. {name:<20} {best:>3}%")
+        if results["rank"]:
+            rank, players = results["rank"]
+            print(f"{args.player} is #{rank} of {players:,} on {letter}.")
+    elif not results["letters"]:
+        print(f"No rounds recorded for {args.player} yet.")
+    else:
+        print(f"{'letter':<6} {'rounds':>7} {'mean':>6} {'best':>5}")
+        for letter, stats in results["letters"].items():
+            print(f"{letter:<6} {stats['rounds']:>7,} {stats['mean_score']:>5.1f}% {stats['best']:>4}%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,338 @@
+"""Score storage for the country letter game.
+
+The game keeps the best ratio per letter and a perfect-round streak. Both
+backends here make recording a round one atomic read-modify-write. The
+work per round is the same however many rounds came before, and several
+processes (two terminals, a server) can share one store without losing
+updates.
+
+    sqlite  SQLite in WAL mode. Each round is one BEGIN IMMEDIATE transaction
+            that reads the letter's best and the streak, then writes both.
+    log     Append-only JSON lines, one per round, under an exclusive flock.
+            Each process replays only the lines appended since it last
+            looked. Every COMPACT_EVERY rounds the log is rewritten as a
+            single snapshot line and atomically renamed into place.
+
+The old ~/.country_letter_game_scores.json file is merged into whichever
+store is opened first, then renamed to *.json.migrated.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, NamedTuple, Protocol
+
+STREAK_KEY = "_perfect_streak"
+LEGACY_SCORE_FILE = Path.home() / ".country_letter_game_scores.json"
+SCORE_FILES = {
+    "sqlite": Path.home() / ".country_letter_game_scores.sqlite",
+    "log": Path.home() / ".country_letter_game_scores.log",
+}
+COMPACT_EVERY = 1000
+# What opening or writing a store can raise when the disk or database misbehaves
+STORE_ERRORS = (OSError, sqlite3.Error)
+
+
+class RoundOutcome(NamedTuple):
+    """What recording a round changed. scores holds the letter's best and the streak."""
+
+    scores: dict
+    improved: bool
+    prev_streak: int
+
+
+class ScoreStore(Protocol):
+    def load(self) -> dict:
+        """All scores, as {letter: {"ratio", "found", "total"}, "_perfect_streak": n}."""
+        ...
+
+    def record_round(self, letter: str, found: int, total: int) -> RoundOutcome: ...
+
+    def import_scores(self, scores: dict) -> bool:
+        """
+        Merge scores into the store: a letter's best only changes if the imported
+        one is better, and the streak is only imported into an empty store.
+        Returns whether anything changed.
+        """
+        ...
+
+    def close(self) -> None: ...
+
+
+def beats(best: dict | None, ratio: float, found: int) -> bool:
+    """Whether a round with this ratio and found count is a new best for the letter."""
+    return (
+        not best
+        or ratio > best.get("ratio", -1.0)
+        or (ratio == best.get("ratio", 0.0) and found > best.get("found", -1))
+    )
+
+
+def merge_bests(scores: dict, imported: dict) -> dict:
+    """{letter: best} for each letter of imported whose best beats the one in scores."""
+    return {
+        letter: {"ratio": best.get("ratio", 0.0), "found": best.get("found", 0), "total": best.get("total", 0)}
+        for letter, best in imported.items()
+        if letter != STREAK_KEY
+        and isinstance(best, dict)
+        and beats(scores.get(letter), best.get("ratio", 0.0), best.get("found", 0))
+    }
+
+
+def apply_round(
+    best: dict | None, streak: int, found: int, total: int
+) -> tuple[dict | None, bool, int]:
+    """
+    The scoring rule shared by every backend.
+    Returns (new best for the letter or None if unchanged, improved, new streak).
+    """
+    ratio = found / total if total else 0.0
+    new_best = None
+    if beats(best, ratio, found):
+        new_best = {"ratio": ratio, "found": found, "total": total}
+    streak = streak + 1 if total and found == total else 0
+    return new_best, new_best is not None, streak
+
+
+class SQLiteScoreStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path), timeout=10, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS letter_best ("
+            "letter TEXT PRIMARY KEY, ratio REAL NOT NULL, found INTEGER NOT NULL, total INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so concurrent rounds serialize
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def load(self) -> dict:
+        scores: dict = {
+            letter: {"ratio": ratio, "found": found, "total": total}
+            for letter, ratio, found, total in self.conn.execute(
+                "SELECT letter, ratio, found, total FROM letter_best"
+            )
+        }
+        row = self.conn.execute("SELECT value FROM counters WHERE name = ?", (STREAK_KEY,)).fetchone()
+        if row:
+            scores[STREAK_KEY] = row[0]
+        return scores
+
+    def record_round(self, letter: str, found: int, total: int) -> RoundOutcome:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT ratio, found, total FROM letter_best WHERE letter = ?", (letter,)
+            ).fetchone()
+            best = dict(zip(("ratio", "found", "total"), row)) if row else None
+            row = conn.execute("SELECT value FROM counters WHERE name = ?", (STREAK_KEY,)).fetchone()
+            prev_streak = row[0] if row else 0
+
+            new_best, improved, streak = apply_round(best, prev_streak, found, total)
+            if new_best:
+                conn.execute(
+                    "INSERT OR REPLACE INTO letter_best VALUES (?, ?, ?, ?)",
+                    (letter, new_best["ratio"], new_best["found"], new_best["total"]),
+                )
+                best = new_best
+            conn.execute("INSERT OR REPLACE INTO counters VALUES (?, ?)", (STREAK_KEY, streak))
+        scores = {STREAK_KEY: streak}
+        if best:
+            scores[letter] = best
+        return RoundOutcome(scores, improved, prev_streak)
+
+    def import_scores(self, scores: dict) -> bool:
+        with self._transaction():
+            current = self.load()
+            bests = merge_bests(current, scores)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO letter_best VALUES (?, ?, ?, ?)",
+                ((letter, best["ratio"], best["found"], best["total"]) for letter, best in bests.items()),
+            )
+            if not current:
+                self.conn.execute(
+                    "INSERT INTO counters VALUES (?, ?)", (STREAK_KEY, int(scores.get(STREAK_KEY, 0)))
+                )
+        return bool(bests) or not current
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class LogScoreStore:
+    def __init__(self, path: Path, compact_every: int = COMPACT_EVERY):
+        try:
+            import fcntl
+        except ImportError:
+            raise OSError("The log score store needs POSIX file locks; use the sqlite store.")
+
+        self._fcntl = fcntl
+        self.path = path
+        self.compact_every = compact_every
+        # The lock file also holds the compaction generation
+        self._lock_fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        self.scores: dict = {}
+        self._offset = 0
+        self._generation = -1
+        self._rounds = 0  # round lines since the last snapshot
+        with self._locked():
+            self._catch_up()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # Lock a separate file: compaction replaces the log itself
+        self._fcntl.flock(self._lock_fd, self._fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            self._fcntl.flock(self._lock_fd, self._fcntl.LOCK_UN)
+
+    def _read_generation(self) -> int:
+        data = os.pread(self._lock_fd, 20, 0)
+        return int(data) if data.strip() else 0
+
+    def _apply(self, entry: dict) -> None:
+        if "snapshot" in entry:
+            self.scores = entry["snapshot"]
+            self._rounds = 0
+        elif "round" in entry:
+            letter, found, total = entry["round"]
+            new_best, _, streak = apply_round(
+                self.scores.get(letter), self.scores.get(STREAK_KEY, 0), found, total
+            )
+            if new_best:
+                self.scores[letter] = new_best
+            self.scores[STREAK_KEY] = streak
+            self._rounds += 1
+
+    def _catch_up(self) -> None:
+        """
+        Apply lines other processes appended since we last read (all of them after a compaction).
+        Always called under the lock.
+        """
+        generation = self._read_generation()
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if generation != self._generation or size < self._offset:
+            self.scores, self._offset, self._generation, self._rounds = {}, 0, generation, 0
+        if size == self._offset:
+            return
+        with open(self.path, "rb") as log:
+            log.seek(self._offset)
+            data = log.read()
+        # Appends happen under the lock, so a line without its newline is a crashed
+        # write. Cut it off, or the next append would land on the same line.
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, TypeError, KeyError):
+                continue
+        self._offset += len(complete)
+        if len(complete) < len(data):
+            os.truncate(self.path, self._offset)
+
+    def _append(self, entry: dict) -> None:
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.path, "ab") as log:
+            log.write(line)
+        self._offset += len(line)
+
+    def _compact(self) -> None:
+        temp = self.path.with_name(self.path.name + ".tmp")
+        line = (json.dumps({"snapshot": self.scores}, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(temp, "wb") as log:
+            log.write(line)
+            log.flush()
+            os.fsync(log.fileno())
+        os.replace(temp, self.path)
+        # Inode numbers get reused, so readers notice the rewrite by the generation
+        self._generation += 1
+        os.pwrite(self._lock_fd, b"%20d" % self._generation, 0)
+        self._offset = len(line)
+        self._rounds = 0
+
+    def load(self) -> dict:
+        with self._locked():
+            self._catch_up()
+            return json.loads(json.dumps(self.scores))
+
+    def record_round(self, letter: str, found: int, total: int) -> RoundOutcome:
+        with self._locked():
+            self._catch_up()
+            prev_streak = self.scores.get(STREAK_KEY, 0)
+            _, improved, _ = apply_round(self.scores.get(letter), prev_streak, found, total)
+            entry = {"round": [letter, found, total]}
+            self._append(entry)
+            self._apply(entry)
+            if self._rounds >= self.compact_every:
+                self._compact()
+            scores = {STREAK_KEY: self.scores[STREAK_KEY]}
+            if letter in self.scores:
+                scores[letter] = dict(self.scores[letter])
+        return RoundOutcome(scores, improved, prev_streak)
+
+    def import_scores(self, scores: dict) -> bool:
+        with self._locked():
+            self._catch_up()
+            bests = merge_bests(self.scores, scores)
+            empty = not self.scores
+            if not bests and not empty:
+                return False
+            merged = json.loads(json.dumps(self.scores))
+            merged.update(bests)
+            if empty:
+                merged[STREAK_KEY] = int(scores.get(STREAK_KEY, 0))
+            self._append({"snapshot": merged})
+            self._apply({"snapshot": merged})
+        return True
+
+    def close(self) -> None:
+        os.close(self._lock_fd)
+
+
+def read_legacy_scores(path: Path = LEGACY_SCORE_FILE) -> dict | None:
+    """Scores from the old JSON file, or None if it's missing or unreadable."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def open_score_store(
+    kind: str = "sqlite", path: Path | None = None, legacy_path: Path = LEGACY_SCORE_FILE
+) -> ScoreStore:
+    """Open (creating if needed) a score store, merging the old JSON scores into it once."""
+    path = path or SCORE_FILES[kind]
+    if kind == "sqlite":
+        store: ScoreStore = SQLiteScoreStore(path)
+    elif kind == "log":
+        store = LogScoreStore(path)
+    else:
+        raise ValueError(f"Unknown score store '{kind}'.")
+
+    legacy = read_legacy_scores(legacy_path)
+    if legacy is not None:
+        store.import_scores(legacy)
+        try:
+            legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+        except FileNotFoundError:
+            pass  # another process migrated it first
+    return store
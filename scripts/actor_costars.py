@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Build the actor_costars table: who has worked with whom, for popular actors.
+
+"Which actors has X worked with" and "do X and Y share a film" otherwise need
+a self-join of movie_actors. actor_costars stores one row per ordered pair
+(actor, co-actor) with the number of films they share and their most-voted
+shared film, keyed so either question is a primary-key read.
+
+Only actors with at least min_films films that have min_votes or more votes
+are included, on both sides of the pair, which keeps the table bounded.
+
+The aggregation splits eligible actors into contiguous ID ranges sized so
+that one range's pair counts fit in memory_limit / workers. Worker processes
+aggregate the ranges in parallel from a read-only connection, each into its
+own scratch database. The ranges are then appended in key order.
+
+Usage:
+    python3 actor_costars.py DB [--workers N] [--min-films N] [--min-votes N] [--memory SIZE]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from build_stats import BuildReport
+
+COSTAR_MIN_FILMS = 3
+COSTAR_MIN_VOTES = 1000
+
+# Rough in-memory cost of one (actor, co-actor) -> [count, film, votes] entry
+PAIR_BYTES = 240
+
+COSTARS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS actor_costars (
+        nconst TEXT NOT NULL,
+        co_nconst TEXT NOT NULL,
+        shared_films INTEGER NOT NULL,
+        best_tconst TEXT NOT NULL,
+        PRIMARY KEY (nconst, co_nconst)
+    ) WITHOUT ROWID
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the actor_costars table')
+    parser.add_argument('db', type=str, help='Build database to add actor_costars to')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--min-films', type=int, default=COSTAR_MIN_FILMS,
+                        help='Films with at least --min-votes an actor needs to be included')
+    parser.add_argument('--min-votes', type=int, default=COSTAR_MIN_VOTES)
+    parser.add_argument('--memory', type=str, default='512M',
+                        help='Memory budget for the pair counts across all workers')
+    return parser.parse_args()
+
+
+def find_eligible_actors(conn: sqlite3.Connection, scratch: Path, min_films: int,
+                         min_votes: int) -> List[Tuple[str, int]]:
+    """
+    Write the eligible actors to a scratch database and return (nconst, pair estimate).
+
+    The estimate is the actor's summed eligible cast size minus one over
+    their films, an upper bound on the pairs they produce.
+    """
+    conn.execute('ATTACH DATABASE ? AS scratch', (str(scratch),))
+    conn.execute('CREATE TABLE scratch.eligible (nconst TEXT PRIMARY KEY) WITHOUT ROWID')
+    conn.execute('''
+        INSERT INTO scratch.eligible
+        SELECT ma.nconst FROM movie_actors ma JOIN movies m ON m.tconst = ma.tconst
+        WHERE m.votes >= ?
+        GROUP BY ma.nconst HAVING COUNT(*) >= ?
+        ORDER BY ma.nconst
+    ''', (min_votes, min_films))
+    conn.commit()
+    estimates = conn.execute('''
+        WITH cast_sizes AS (
+            SELECT ma.tconst, COUNT(*) AS size
+            FROM movie_actors ma JOIN scratch.eligible e ON e.nconst = ma.nconst
+            GROUP BY ma.tconst
+        )
+        SELECT ma.nconst, SUM(c.size - 1)
+        FROM movie_actors ma
+        JOIN scratch.eligible e ON e.nconst = ma.nconst
+        JOIN cast_sizes c ON c.tconst = ma.tconst
+        GROUP BY ma.nconst
+        ORDER BY ma.nconst
+    ''').fetchall()
+    conn.execute('DETACH DATABASE scratch')
+    return estimates
+
+
+def split_ranges(estimates: List[Tuple[str, int]], max_pairs: int,
+                 min_ranges: int) -> List[Tuple[str, Optional[str]]]:
+    """
+    Cut the sorted actor list into [first, next_first) ranges of at most max_pairs.
+
+    Ranges are also capped at total / min_ranges so every worker gets work.
+    The last range's upper bound is None.
+    """
+    total = sum(pairs for _, pairs in estimates)
+    limit = max(1, min(max_pairs, -(-total // max(1, min_ranges))))
+    ranges = []
+    start = None
+    running = 0
+    for nconst, pairs in estimates:
+        if start is None:
+            start = nconst
+        elif running + pairs > limit:
+            ranges.append((start, nconst))
+            start, running = nconst, 0
+        running += pairs
+    if start is not None:
+        ranges.append((start, None))
+    return ranges
+
+
+def aggregate_range(db_path: str, scratch_path: str, output_path: str,
+                    first: str, end: Optional[str]) -> int:
+    """
+    Worker: count shared films for actors in [first, end) and write them sorted.
+
+    Returns the number of pairs written to output_path.
+    """
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    conn.execute('ATTACH DATABASE ? AS scratch', (f'file:{scratch_path}?mode=ro',))
+    in_range = 'x.nconst >= :first' + (' AND x.nconst < :end' if end is not None else '')
+    rows = conn.execute(f'''
+        SELECT ma.tconst, ma.nconst, COALESCE(m.votes, 0)
+        FROM movie_actors ma
+        JOIN scratch.eligible e ON e.nconst = ma.nconst
+        JOIN movies m ON m.tconst = ma.tconst
+        WHERE ma.tconst IN (
+            SELECT x.tconst FROM movie_actors x JOIN scratch.eligible ex ON ex.nconst = x.nconst
+            WHERE {in_range}
+        )
+        ORDER BY ma.tconst
+    ''', {'first': first, 'end': end})
+
+    pairs = {}
+
+    def add_cast(tconst, votes, cast):
+        for actor in cast:
+            if actor < first or (end is not None and actor >= end):
+                continue
+            for co_actor in cast:
+                if co_actor == actor:
+                    continue
+                entry = pairs.get((actor, co_actor))
+                if entry is None:
+                    pairs[(actor, co_actor)] = [1, tconst, votes]
+                else:
+                    entry[0] += 1
+                    if votes > entry[2] or (votes == entry[2] and tconst < entry[1]):
+                        entry[1], entry[2] = tconst, votes
+
+    current, current_votes, cast = None, 0, []
+    for tconst, nconst, votes in rows:
+        if tconst != current:
+            if cast:
+                add_cast(current, current_votes, cast)
+            current, current_votes, cast = tconst, votes, []
+        cast.append(nconst)
+    if cast:
+        add_cast(current, current_votes, cast)
+    conn.close()
+
+    out = sqlite3.connect(output_path)
+    out.execute(COSTARS_TABLE_SQL)
+    out.executemany('INSERT INTO actor_costars VALUES (?, ?, ?, ?)',
+                    ((actor, co_actor, entry[0], entry[1])
+                     for (actor, co_actor), entry in sorted(pairs.items())))
+    out.commit()
+    out.close()
+    return len(pairs)
+
+
+def build_actor_costars(db_path: Path, workers: int = 1, memory_limit: int = 512 * 1024 * 1024,
+                        min_films: int = COSTAR_MIN_FILMS, min_votes: int = COSTAR_MIN_VOTES,
+                        report: Optional[BuildReport] = None) -> int:
+    """Fill actor_costars in db_path; returns the number of pairs."""
+    report = report or BuildReport('build_actor_costars')
+    mb = 1024 * 1024
+    workers = max(1, workers)
+    temp_dir = Path(tempfile.mkdtemp(prefix='moviechain-costars-', dir=str(db_path.parent)))
+    scratch = temp_dir / 'eligible.sqlite'
+    print(f"Building actor_costars (actors with {min_films}+ films of {min_votes:,}+ votes)...")
+    try:
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(COSTARS_TABLE_SQL)
+        conn.execute('DELETE FROM actor_costars')
+        conn.commit()
+
+        with report.stage('costars:plan') as stage:
+            estimates = find_eligible_actors(conn, scratch, min_films, min_votes)
+            max_pairs = max(1, memory_limit // workers // PAIR_BYTES)
+            ranges = split_ranges(estimates, max_pairs, workers)
+            stage.rows_out = len(estimates)
+        print(f"  {len(estimates):,} eligible actors, {len(ranges)} ranges "
+              f"(<= {max_pairs:,} pairs each, {workers} workers)")
+
+        with report.stage('costars:aggregate') as stage:
+            outputs = [str(temp_dir / f'range-{number:04d}.sqlite') for number in range(len(ranges))]
+            jobs = [(str(db_path), str(scratch), output, first, end)
+                    for output, (first, end) in zip(outputs, ranges)]
+            if workers == 1:
+                counts = [aggregate_range(*job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    counts = list(pool.map(aggregate_range, *zip(*jobs)))
+            stage.rows_in = sum(pairs for _, pairs in estimates)
+            stage.rows_out = sum(counts)
+
+        with report.stage('costars:insert') as stage:
+            # Ranges are contiguous and sorted, so this appends in key order
+            for output in outputs:
+                conn.execute('ATTACH DATABASE ? AS part', (output,))
+                conn.execute('INSERT INTO actor_costars SELECT * FROM part.actor_costars')
+                conn.commit()
+                conn.execute('DETACH DATABASE part')
+            stage.rows_out = sum(counts)
+            pages = conn.execute(
+                "SELECT COUNT(*) FROM dbstat WHERE name = 'actor_costars'").fetchone()[0]
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        conn.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(f"  {sum(counts):,} co-star pairs, {pages * page_size / mb:.1f} MB")
+    return sum(counts)
+
+
+def main():
+    from build_movie_database import parse_size
+
+    args = parse_args()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    report = BuildReport('actor_costars')
+    build_actor_costars(db_path, args.workers, parse_size(args.memory),
+                        args.min_films, args.min_votes, report)
+    report.print_summary()
+
+
+if __name__ == '__main__':
+    main()
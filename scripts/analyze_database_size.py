@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Break down a MovieChain SQLite database by table, index and FTS shadow table.
+
+Uses the dbstat virtual table to report, per b-tree: page count, payload
+bytes, overflow pages, entry count, average entry size and how much of the
+gzip download it accounts for (its pages compressed on their own). Also
+reports bytes per column for regular tables and flags indexes whose columns
+are a leading prefix of another index on the same table, since those only
+cost space.
+
+Usage:
+    python3 analyze_database_size.py DB [--json PATH] [--no-gzip]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+FTS_SHADOW_SUFFIXES = ('_data', '_idx', '_content', '_docsize', '_config')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Break down database size by table and index')
+    parser.add_argument('db', type=str, help='Database to analyze')
+    parser.add_argument('--json', type=str, default=None,
+                        help='Also write the breakdown as JSON to this path')
+    parser.add_argument('--no-gzip', action='store_true',
+                        help='Skip the per-object gzip contribution (faster)')
+    return parser.parse_args()
+
+
+def object_kinds(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Map every schema object to 'table', 'index', 'virtual' or 'fts shadow'."""
+    rows = conn.execute('SELECT type, name, sql FROM sqlite_master').fetchall()
+    fts = [name for kind, name, sql in rows
+           if kind == 'table' and sql and 'USING fts5' in sql]
+    kinds = {'sqlite_schema': 'schema', 'sqlite_master': 'schema'}
+    for kind, name, sql in rows:
+        if kind == 'table' and any(name == f + suffix for f in fts for suffix in FTS_SHADOW_SUFFIXES):
+            kinds[name] = 'fts shadow'
+        elif kind == 'table' and sql and sql.startswith('CREATE VIRTUAL'):
+            kinds[name] = 'virtual'
+        else:
+            kinds[name] = kind
+    return kinds
+
+
+def find_redundant_indexes(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """
+    Return (index, covered_by) pairs for indexes that another index makes redundant.
+
+    An index is redundant when it is not UNIQUE or partial and its columns are
+    a leading prefix of another non-partial index on the same table, including
+    the automatic index behind a composite PRIMARY KEY.
+    """
+    redundant = []
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'")]
+    for table in tables:
+        indexes = []
+        for _, name, unique, _, partial in conn.execute(f"PRAGMA index_list('{table}')"):
+            columns = tuple(row[2] for row in conn.execute(f"PRAGMA index_info('{name}')"))
+            indexes.append((name, bool(unique), bool(partial), columns))
+        for name, unique, partial, columns in indexes:
+            if unique or partial or not columns:
+                continue
+            for other, _, other_partial, other_columns in indexes:
+                if other == name or other_partial:
+                    continue
+                if other_columns[:len(columns)] == columns and (
+                        len(other_columns) > len(columns) or other < name):
+                    redundant.append((name, other))
+                    break
+    return redundant
+
+
+def column_sizes(conn: sqlite3.Connection) -> Dict[str, Dict[str, int]]:
+    """Sum of LENGTH() per column of every regular table (approximate stored bytes)."""
+    kinds = object_kinds(conn)
+    sizes = {}
+    for table, kind in sorted(kinds.items()):
+        if kind != 'table' or table.startswith('sqlite_'):
+            continue
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info('{table}')")]
+        if not columns:
+            continue
+        sums = ', '.join(f'COALESCE(SUM(LENGTH("{c}")), 0)' for c in columns)
+        totals = conn.execute(f'SELECT {sums} FROM "{table}"').fetchone()
+        sizes[table] = dict(zip(columns, totals))
+    return sizes
+
+
+def analyze_database_size(db_path: Path, include_gzip: bool = True,
+                          gzip_level: int = 9) -> dict:
+    """Collect the per-object size breakdown for db_path."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        kinds = object_kinds(conn)
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+        objects = defaultdict(lambda: {'pages': 0, 'payload_bytes': 0, 'unused_bytes': 0,
+                                       'overflow_pages': 0, 'entries': 0, 'page_numbers': []})
+        for name, pageno, pagetype, ncell, payload, unused in conn.execute(
+                'SELECT name, pageno, pagetype, ncell, payload, unused FROM dbstat ORDER BY pageno'):
+            obj = objects[name]
+            obj['pages'] += 1
+            obj['payload_bytes'] += payload
+            obj['unused_bytes'] += unused
+            obj['page_numbers'].append(pageno)
+            if pagetype == 'overflow':
+                obj['overflow_pages'] += 1
+            elif pagetype == 'leaf' or (pagetype == 'internal' and kinds.get(name) == 'index'):
+                # Table b-trees keep rows on leaves only; index interior cells are entries too
+                obj['entries'] += ncell
+
+        redundant = find_redundant_indexes(conn)
+        columns = column_sizes(conn)
+    finally:
+        conn.close()
+
+    if include_gzip:
+        with open(db_path, 'rb') as f:
+            for obj in objects.values():
+                compressor = zlib.compressobj(gzip_level)
+                compressed = 0
+                for pageno in obj['page_numbers']:
+                    f.seek((pageno - 1) * page_size)
+                    compressed += len(compressor.compress(f.read(page_size)))
+                obj['gzip_bytes'] = compressed + len(compressor.flush())
+
+    breakdown = []
+    for name, obj in objects.items():
+        del obj['page_numbers']
+        obj['name'] = name
+        obj['kind'] = kinds.get(name, 'other')
+        obj['bytes'] = obj['pages'] * page_size
+        obj['avg_entry_bytes'] = obj['payload_bytes'] / obj['entries'] if obj['entries'] else 0.0
+        breakdown.append(obj)
+    breakdown.sort(key=lambda obj: obj['pages'], reverse=True)
+
+    return {
+        'database': str(db_path),
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_pages': freelist,
+        'file_bytes': page_count * page_size,
+        'objects': breakdown,
+        'columns': columns,
+        'redundant_indexes': [{'index': name, 'covered_by': other} for name, other in redundant],
+    }
+
+
+def print_size_report(result: dict):
+    mb = 1024 * 1024
+    total_pages = result['page_count'] or 1
+    has_gzip = any('gzip_bytes' in obj for obj in result['objects'])
+    total_gzip = sum(obj.get('gzip_bytes', 0) for obj in result['objects']) or 1
+
+    print(f"\nSize breakdown: {result['database']}")
+    print(f"  {result['file_bytes'] / mb:.1f} MB, {result['page_count']:,} pages of "
+          f"{result['page_size']:,} bytes, {result['freelist_pages']:,} free")
+    print(f"\n  {'object':<36} {'kind':<10} {'pages':>9} {'% file':>7} {'payload MB':>11} "
+          f"{'overflow':>9} {'entries':>11} {'avg B':>7}" + (f" {'gzip MB':>8} {'% gzip':>7}" if has_gzip else ''))
+    for obj in result['objects']:
+        line = (f"  {obj['name']:<36} {obj['kind']:<10} {obj['pages']:>9,} "
+                f"{obj['pages'] / total_pages * 100:>6.1f}% {obj['payload_bytes'] / mb:>11.2f} "
+                f"{obj['overflow_pages']:>9,} {obj['entries']:>11,} {obj['avg_entry_bytes']:>7.1f}")
+        if has_gzip:
+            line += (f" {obj.get('gzip_bytes', 0) / mb:>8.2f} "
+                     f"{obj.get('gzip_bytes', 0) / total_gzip * 100:>6.1f}%")
+        print(line)
+
+    print("\n  Column bytes (sum of LENGTH per value):")
+    for table, columns in result['columns'].items():
+        parts = ', '.join(f"{column} {size / mb:.1f} MB" for column, size in columns.items())
+        print(f"    {table}: {parts}")
+
+    if result['redundant_indexes']:
+        print("\n  Redundant indexes (columns are a prefix of another index):")
+        for item in result['redundant_indexes']:
+            print(f"    {item['index']} is covered by {item['covered_by']}")
+    else:
+        print("\n  No redundant indexes found.")
+
+
+def main():
+    args = parse_args()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    result = analyze_database_size(db_path, include_gzip=not args.no_gzip)
+    print_size_report(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding='utf-8')
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
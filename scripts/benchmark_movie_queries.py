@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MovieChain app queries against a built SQLite database.
+
+Times every query in moviechain_queries.APP_QUERIES over a workload sampled
+from the database. With --compare, the same workload is replayed against a
+second build. When the database stores cast billing order, the top-billed
+("main cast") queries are also compared with the full-cast queries they
+replace, when it has genre facets the filtered queries are compared with
+the LIKE scans over movies.genres they replace, when it has hint lists the
+hint reads are compared with ranking the cast or filmography live, and when
+it has actor_costars
+the co-star lookups are compared with the movie_actors self-joins (for
+workload actors the table covers) and its size is printed.
+
+Usage:
+    python3 benchmark_movie_queries.py DB [--compare OTHER_DB] [--samples N] [--repeat N]
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from moviechain_queries import (ALIAS_EQUIVALENTS, ALIAS_QUERIES, APP_QUERIES,
+                                COSTAR_EQUIVALENTS, COSTAR_QUERIES,
+                                FACET_EQUIVALENTS, FACET_QUERIES, HINT_EQUIVALENTS,
+                                HINT_QUERIES, LIKE_FILTER_QUERIES, LIVE_HINT_QUERIES,
+                                SELF_JOIN_QUERIES, TOP_BILLED_EQUIVALENTS,
+                                TOP_BILLED_QUERIES, print_latency_comparison,
+                                sample_workload, time_queries, typed_fts_query)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark MovieChain queries')
+    parser.add_argument('db', type=str, help='Database to benchmark')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='Second database to replay the same workload against')
+    parser.add_argument('--samples', type=int, default=200,
+                        help='Number of movie/actor pairs in the workload')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Times each query is run per workload entry')
+    return parser.parse_args()
+
+
+def has_billing(db_path: Path) -> bool:
+    """Whether movie_actors carries the billing column."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(movie_actors)')}
+    conn.close()
+    return 'billing' in columns
+
+
+def has_tables(db_path: Path, *names: str) -> bool:
+    """Whether the database has every one of the named tables."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    return set(names) <= tables
+
+
+def costar_coverage(db_path: Path, workload: List[Dict[str, str]]) -> Tuple[list, int]:
+    """Workload entries whose actor pair is in actor_costars, and the table's size in bytes."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    covered = [params for params in workload if conn.execute(
+        'SELECT 1 FROM actor_costars WHERE nconst = ? AND co_nconst = ?',
+        (params['actor'], params['co_actor'])).fetchone()]
+    pages = conn.execute("SELECT COUNT(*) FROM dbstat WHERE name = 'actor_costars'").fetchone()[0]
+    size = pages * conn.execute('PRAGMA page_size').fetchone()[0]
+    conn.close()
+    return covered, size
+
+
+def title_workload(db_path: Path, workload: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Searches typed from the full primary titles of the workload's movies."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    searches = []
+    for params in workload:
+        title = conn.execute('SELECT title FROM movies WHERE tconst = ?', (params['movie'],)).fetchone()[0]
+        if typed_fts_query(title):
+            searches.append({'movie': params['movie'], 'movie_query': typed_fts_query(title)})
+    conn.close()
+    return searches
+
+
+def alias_workload(db_path: Path, size: int) -> List[Dict[str, str]]:
+    """Searches typed from alias titles of the most-voted movies that have aliases."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    rows = conn.execute('''
+        SELECT a.tconst, a.title FROM movie_aliases a JOIN movies m ON m.tconst = a.tconst
+        ORDER BY m.votes DESC, a.alias_id LIMIT ?
+    ''', (size,)).fetchall()
+    conn.close()
+    return [{'movie': tconst, 'movie_query': typed_fts_query(title)}
+            for tconst, title in rows if typed_fts_query(title)]
+
+
+def title_recall(db_path: Path, workload: List[Dict[str, str]], sql: str) -> float:
+    """Share of searches whose results include the intended movie."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    found = sum(1 for params in workload
+                if any(row[0] == params['movie'] for row in conn.execute(sql, params)))
+    conn.close()
+    return found / len(workload) if workload else 0.0
+
+
+def print_latencies(results: dict):
+    """Print one timing run."""
+    print(f"  {'query':<30} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'rows':>8}")
+    for name, stats in results.items():
+        print(f"  {name:<30} {stats['mean_ms']:>10.3f} {stats['p50_ms']:>10.3f} "
+              f"{stats['p95_ms']:>10.3f} {stats['mean_rows']:>8.1f}")
+
+
+def print_savings(old: dict, new: dict, equivalents: dict,
+                  old_label: str = 'full', new_label: str = 'top'):
+    """Compare each new query with the old query it replaces."""
+    print(f"  {'query':<30} {old_label + ' ms':>10} {new_label + ' ms':>10} "
+          f"{old_label + ' rows':>10} {new_label + ' rows':>10} {'saved':>8}")
+    for new_name, old_name in equivalents.items():
+        o, n = old[old_name], new[new_name]
+        saved = (1 - n['mean_ms'] / o['mean_ms']) * 100 if o['mean_ms'] else 0.0
+        print(f"  {new_name:<30} {o['mean_ms']:>10.3f} {n['mean_ms']:>10.3f} "
+              f"{o['mean_rows']:>10.1f} {n['mean_rows']:>10.1f} {saved:>7.1f}%")
+
+
+def main():
+    args = parse_args()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    workload = sample_workload(conn, size=args.samples)
+    conn.close()
+    print(f"Benchmarking {db_path.name} with {len(workload)} movie/actor pairs x {args.repeat}")
+
+    results = time_queries(db_path, workload, repeat=args.repeat)
+    print()
+    print_latencies(results)
+
+    if args.compare:
+        other_path = Path(args.compare)
+        other = time_queries(other_path, workload, repeat=args.repeat)
+        print(f"\n  Compared with {other_path.name} (mean / p95):")
+        print_latency_comparison(results, other, before_label='db', after_label='other')
+
+    if has_billing(db_path):
+        top = time_queries(db_path, workload, queries=TOP_BILLED_QUERIES, repeat=args.repeat)
+        print("\n  Top-billed cast vs full cast:")
+        print_savings(results, top, TOP_BILLED_EQUIVALENTS)
+
+    if has_tables(db_path, 'genres', 'movie_genres', 'genre_decade_pools'):
+        filtered = [params for params in workload if params['genre'] and params['decade']]
+        facets = time_queries(db_path, filtered, queries=FACET_QUERIES, repeat=args.repeat)
+        like = time_queries(db_path, filtered, queries=LIKE_FILTER_QUERIES, repeat=args.repeat)
+        print(f"\n  Genre facets vs LIKE scans ({len(filtered)} genre/decade filters):")
+        print_savings(like, facets, FACET_EQUIVALENTS, old_label='like', new_label='facet')
+
+    if has_tables(db_path, 'movie_hints', 'actor_hints'):
+        hints = time_queries(db_path, workload, queries=HINT_QUERIES, repeat=args.repeat)
+        live = time_queries(db_path, workload, queries=LIVE_HINT_QUERIES, repeat=args.repeat)
+        print("\n  Precomputed hints vs live ranking:")
+        print_savings(live, hints, HINT_EQUIVALENTS, old_label='live', new_label='hint')
+
+    if has_tables(db_path, 'movie_aliases', 'aliases_fts'):
+        print("\n  Any-title search vs primary-title search:")
+        print(f"  {'workload':<30} {'primary ms':>10} {'any ms':>10} {'primary found':>14} "
+              f"{'any found':>10}")
+        primary_titles = title_workload(db_path, workload)
+        for label, searches in (('primary titles', primary_titles),
+                                ('alias titles', alias_workload(db_path, args.samples))):
+            if not searches:
+                continue
+            primary = time_queries(db_path, searches, repeat=args.repeat,
+                                   queries={'search_movies': APP_QUERIES['search_movies']})
+            any_title = time_queries(db_path, searches, queries=ALIAS_QUERIES, repeat=args.repeat)
+            for new_name, old_name in ALIAS_EQUIVALENTS.items():
+                print(f"  {label + f' ({len(searches)})':<30} {primary[old_name]['mean_ms']:>10.3f} "
+                      f"{any_title[new_name]['mean_ms']:>10.3f} "
+                      f"{title_recall(db_path, searches, APP_QUERIES[old_name]) * 100:>13.1f}% "
+                      f"{title_recall(db_path, searches, ALIAS_QUERIES[new_name]) * 100:>9.1f}%")
+
+    covered, costar_bytes = ([], 0)
+    if has_tables(db_path, 'actor_costars'):
+        covered, costar_bytes = costar_coverage(db_path, workload)
+    if covered:
+        costars = time_queries(db_path, covered, queries=COSTAR_QUERIES, repeat=args.repeat)
+        joins = time_queries(db_path, covered, queries=SELF_JOIN_QUERIES, repeat=args.repeat)
+        print(f"\n  actor_costars ({costar_bytes / 1024 / 1024:.1f} MB) vs self-joins "
+              f"({len(covered)} covered pairs):")
+        print_savings(joins, costars, COSTAR_EQUIVALENTS, old_label='join', new_label='table')
+
+
+if __name__ == '__main__':
+    main()
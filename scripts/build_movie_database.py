@@ -6,27 +6,85 @@ This script processes IMDb data files and creates an optimized SQLite database
 for the Movie Chain game containing ALL movies from the IMDb database.
 
 Usage:
-    python3 build_movie_database.py [--data-dir PATH] [--output-dir PATH]
+    python3 build_movie_database.py [--data-dir PATH] [--output-dir PATH] [--max-memory SIZE]
+                                    [--workers N] [--partitioned]
+                                    [--costar-min-films N] [--costar-min-votes N] [--aliases]
+
+The build runs as a small graph of stages (see stage_graph.py). The TSV
+loaders don't depend on each other, so with --workers > 1 they run in
+parallel worker processes and the parse phase takes about as long as the
+slowest file. The critical path is printed at the end. --partitioned also
+builds the movies, actors and movie_actors tables (with their indexes and
+FTS) in separate databases in parallel and merges them with ATTACH. The
+actor_costars table is aggregated from the finished links by actor_costars.py,
+split across the same workers. The last stages finalize the database and
+compress it to moviechain_core.sqlite.gz, the file the app bundles.
+
+With --max-memory (e.g. 2G, 512M) the TSV files are streamed and joined via
+on-disk sorted runs instead of in-memory dicts, so peak RSS stays near the cap.
 
 The script expects these TSV files in the data directory:
 - title.basics.tsv
 - title.principals.tsv
 - title.ratings.tsv
 - name.basics.tsv
+- title.akas.tsv (only with --aliases)
 """
 
 import argparse
 import csv
+import itertools
 import sqlite3
 import os
+import shutil
 import sys
+import tempfile
+import unicodedata
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Set, Tuple, Optional
-from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Optional
+from collections import Counter, defaultdict
+
+from actor_costars import COSTAR_MIN_FILMS, COSTAR_MIN_VOTES, build_actor_costars
+from analyze_database_size import analyze_database_size, print_size_report
+from build_stats import BuildReport, Stage, counted, peak_rss_bytes
+from external_sort import ExternalSorter, merge_join
+from finalize_database import compress_database, finalize_database
+from moviechain_queries import ANY_DECADE, ANY_GENRE, HINT_COUNT, TOP_BILLED_CAST
+from stage_graph import StageGraph
+from storage_profile import load_profile
 
 # Increase CSV field size limit for large fields
 csv.field_size_limit(sys.maxsize)
 
+# Fixed page size, together with ID-ordered inserts, keeps unchanged data on
+# the same pages from one build to the next so db_patch.py deltas stay small
+PAGE_SIZE = 4096
+
+# Physical row orders for movies, actors and movie_actors. 'id' keeps builds
+# patchable with db_patch.py. 'popularity' puts the most-voted movies, the
+# actors with the most films and the links of popular movies on the first
+# pages, so a session's lookups share pages. Any change in votes then
+# reshuffles rows, so patches between popularity builds are close to full size.
+ROW_ORDERS = ('id', 'popularity')
+
+# IMDb's genre vocabulary, in the order genre IDs (and mask bits) are assigned.
+# Genres missing from this list get the next free ID the first time they show
+# up; keep appending rather than reordering, or every movie's genre_mask changes.
+IMDB_GENRES = (
+    'Action', 'Adult', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime',
+    'Documentary', 'Drama', 'Family', 'Fantasy', 'Film-Noir', 'Game-Show', 'History',
+    'Horror', 'Music', 'Musical', 'Mystery', 'News', 'Reality-TV', 'Romance', 'Sci-Fi',
+    'Short', 'Sport', 'Talk-Show', 'Thriller', 'War', 'Western',
+)
+
+# genre_mask is a signed 64-bit SQLite integer; stay clear of the sign bit
+MAX_GENRES = 62
+
+# Most-voted movies kept per (genre, decade) for filtered starting picks
+GENRE_POOL_SIZE = 200
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Build Movie Chain SQLite databases')
@@ -36,10 +94,153 @@ def parse_args():
     parser.add_argument('--output-dir', type=str,
                         default=str(Path(__file__).parent.parent / 'GamesWithFriends' / 'Features' / 'MovieChain' / 'Resources'),
                         help='Directory for output SQLite databases')
+    parser.add_argument('--keep-build', action='store_true',
+                        help='Keep the un-finalized build database next to the output')
+    parser.add_argument('--max-memory', type=str, default=None,
+                        help='Memory cap for an external-sort build, e.g. 2G or 512M '
+                             '(default: in-memory build)')
+    parser.add_argument('--report', type=str, default=None,
+                        help='Path for the JSON stage report '
+                             '(default: build_report.json in the output directory)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='Dump per-stage cProfile stats into DIR')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for independent stages '
+                             '(default: CPU count; 1 runs every stage in this process)')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='Build each table and its indexes in a separate database in '
+                             'parallel, then merge them (in-memory build only)')
+    parser.add_argument('--row-order', choices=ROW_ORDERS, default='id',
+                        help="Physical order of movie, actor and link rows (default: id; "
+                             "'popularity' improves page locality but defeats db_patch.py)")
+    parser.add_argument('--storage-profile', type=str, default=None,
+                        help='Storage profile JSON from tune_storage.py to finalize with')
+    parser.add_argument('--aliases', action='store_true',
+                        help='Index original and regional titles (title.akas.tsv) for search')
+    parser.add_argument('--hint-count', type=int, default=HINT_COUNT,
+                        help='Cast members per movie and films per actor kept as hints '
+                             f'(default: {HINT_COUNT})')
+    parser.add_argument('--costar-min-films', type=int, default=COSTAR_MIN_FILMS,
+                        help='Films with --costar-min-votes or more an actor needs to get '
+                             f'actor_costars rows (default: {COSTAR_MIN_FILMS})')
+    parser.add_argument('--costar-min-votes', type=int, default=COSTAR_MIN_VOTES,
+                        help='Votes a film needs to count towards --costar-min-films '
+                             f'(default: {COSTAR_MIN_VOTES})')
+    parser.add_argument('--analyze-size', action='store_true',
+                        help='Print a per-table/index size breakdown of the finished database')
     return parser.parse_args()
 
 
-def load_ratings(data_dir: Path) -> Dict[str, Tuple[float, int]]:
+def parse_size(value: str) -> int:
+    """Parse a size such as '2G', '512M' or '4096K' into bytes (bare numbers are MB)."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(float(value) * units['M'])
+
+
+def parse_rating_row(row: dict) -> Optional[Tuple[str, float, int]]:
+    """Return (tconst, rating, votes) for a title.ratings row, or None if malformed."""
+    try:
+        return row['tconst'], float(row['averageRating']), int(row['numVotes'])
+    except (ValueError, KeyError):
+        return None
+
+
+def parse_movie_row(row: dict) -> Optional[dict]:
+    """Return the movie fields for a title.basics row, or None if it isn't a non-adult movie."""
+    # Only include movies (not TV shows, shorts, etc.)
+    if row['titleType'] != 'movie':
+        return None
+    # Skip adult content
+    if row.get('isAdult', '0') == '1':
+        return None
+
+    year = row.get('startYear', '\\N')
+    if year == '\\N':
+        year = None
+    else:
+        try:
+            year = int(year)
+        except ValueError:
+            year = None
+
+    return {
+        'tconst': row['tconst'],
+        'title': row['primaryTitle'],
+        'year': year,
+        'genres': row.get('genres', '').replace('\\N', '')
+    }
+
+
+def parse_actor_row(row: dict) -> Optional[dict]:
+    """Return the actor fields for a name.basics row, or None if not an actor/actress."""
+    professions = row.get('primaryProfession', '')
+    # Include people who are actors or actresses
+    if 'actor' not in professions and 'actress' not in professions:
+        return None
+    known_for = row.get('knownForTitles', '').replace('\\N', '')
+    return {
+        'nconst': row['nconst'],
+        'name': row['primaryName'],
+        'known_for': known_for.split(',') if known_for else []
+    }
+
+
+def parse_cast_row(row: dict) -> Optional[Tuple[str, str, int]]:
+    """
+    Return (tconst, nconst, ordering) for an actor/actress principals row, else None.
+    A missing or malformed ordering becomes sys.maxsize, so the link is kept and
+    billed after the rest of the cast.
+    """
+    if row.get('category', '') not in ('actor', 'actress'):
+        return None
+    try:
+        ordering = int(row['ordering'])
+    except (ValueError, KeyError):
+        ordering = sys.maxsize
+    return row['tconst'], row['nconst'], ordering
+
+
+def rank_billing(cast: Dict[str, int]) -> Dict[str, int]:
+    """
+    Turn {actor_id: principals ordering} into {actor_id: billing}.
+
+    Billing ranks cast rows only, so crew rows interleaved in principals
+    don't leave gaps.
+    """
+    ranked = sorted(cast.items(), key=lambda item: (item[1], item[0]))
+    return {nconst: billing for billing, (nconst, _) in enumerate(ranked, 1)}
+
+
+def genre_mask(genres: str, genre_ids: Dict[str, int]) -> int:
+    """
+    Encode a comma-joined genres string as a bitmask (bit genre_id - 1).
+
+    Genres not yet in genre_ids are given the next ID, so genre_ids must be
+    shared across every row of one build.
+    """
+    mask = 0
+    for name in genres.split(','):
+        if not name:
+            continue
+        genre_id = genre_ids.get(name)
+        if genre_id is None:
+            genre_id = len(genre_ids) + 1
+            if genre_id > MAX_GENRES:
+                raise ValueError(f"Too many genres for a 64-bit mask (at {name!r})")
+            genre_ids[name] = genre_id
+        mask |= 1 << (genre_id - 1)
+    return mask
+
+
+def new_genre_ids() -> Dict[str, int]:
+    """Genre name -> ID, seeded with IMDB_GENRES."""
+    return {name: genre_id for genre_id, name in enumerate(IMDB_GENRES, 1)}
+
+
+def load_ratings(data_dir: Path, stage: Optional[Stage] = None) -> Dict[str, Tuple[float, int]]:
     """Load all movie ratings."""
     print("Loading ratings...")
     ratings = {}
@@ -47,104 +248,109 @@ def load_ratings(data_dir: Path) -> Dict[str, Tuple[float, int]]:
 
     with open(ratings_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            try:
-                num_votes = int(row['numVotes'])
-                ratings[row['tconst']] = (float(row['averageRating']), num_votes)
-            except (ValueError, KeyError):
-                continue
+        for row in counted(reader, stage):
+            parsed = parse_rating_row(row)
+            if parsed is not None:
+                ratings[parsed[0]] = (parsed[1], parsed[2])
 
     print(f"  Found {len(ratings):,} titles with ratings")
+    if stage is not None:
+        stage.rows_out = len(ratings)
     return ratings
 
 
-def load_all_movies(data_dir: Path) -> Dict[str, dict]:
-    """Load ALL movies from title.basics (no filtering by votes)."""
+def load_all_movies(data_dir: Path,
+                    stage: Optional[Stage] = None) -> Dict[str, Tuple[str, Optional[int], str]]:
+    """
+    Load ALL movies from title.basics (no filtering by votes).
+
+    Returns movie_id -> (title, year, genres).
+    """
     print("Loading ALL movies...")
     movies = {}
     basics_file = data_dir / 'title.basics.tsv'
 
     with open(basics_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            tconst = row['tconst']
-            # Only include movies (not TV shows, shorts, etc.)
-            if row['titleType'] == 'movie':
-                # Skip adult content
-                if row.get('isAdult', '0') == '1':
-                    continue
-
-                year = row.get('startYear', '\\N')
-                if year == '\\N':
-                    year = None
-                else:
-                    try:
-                        year = int(year)
-                    except ValueError:
-                        year = None
-
-                movies[tconst] = {
-                    'tconst': tconst,
-                    'title': row['primaryTitle'],
-                    'year': year,
-                    'genres': row.get('genres', '').replace('\\N', '')
-                }
+        for row in counted(reader, stage):
+            movie = parse_movie_row(row)
+            if movie is not None:
+                movies[movie['tconst']] = (movie['title'], movie['year'], movie['genres'])
 
     print(f"  Loaded {len(movies):,} movies")
+    if stage is not None:
+        stage.rows_out = len(movies)
     return movies
 
 
-def load_actors(data_dir: Path) -> Dict[str, dict]:
-    """Load actor/actress information."""
+def load_actors(data_dir: Path,
+                stage: Optional[Stage] = None) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Load actor/actress information.
+
+    Returns actor_id -> (name, comma-joined known_for titles or None).
+    """
     print("Loading actors...")
     actors = {}
     names_file = data_dir / 'name.basics.tsv'
 
     with open(names_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            professions = row.get('primaryProfession', '')
-            # Include people who are actors or actresses
-            if 'actor' in professions or 'actress' in professions:
-                known_for = row.get('knownForTitles', '').replace('\\N', '')
-                actors[row['nconst']] = {
-                    'nconst': row['nconst'],
-                    'name': row['primaryName'],
-                    'known_for': known_for.split(',') if known_for else []
-                }
+        for row in counted(reader, stage):
+            actor = parse_actor_row(row)
+            if actor is not None:
+                actors[actor['nconst']] = (actor['name'], ','.join(actor['known_for']) or None)
 
     print(f"  Loaded {len(actors):,} actors/actresses")
+    if stage is not None:
+        stage.rows_out = len(actors)
     return actors
 
 
-def load_movie_actor_links(data_dir: Path, valid_movies: Set[str]) -> Dict[str, Set[str]]:
-    """Load movie-actor links from title.principals, filtering to valid movies."""
+def load_movie_actor_links(data_dir: Path, valid_movies: Set[str],
+                           stage: Optional[Stage] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Load movie-actor links from title.principals, filtering to valid movies.
+
+    Returns movie_id -> {actor_id: billing}, where billing is the actor's
+    1-based position among the movie's cast rows in principals `ordering`.
+    """
     print("Loading movie-actor links...")
-    # movie_id -> set of actor_ids
-    links = defaultdict(set)
+    # movie_id -> {actor_id: lowest principals ordering}
+    orderings = defaultdict(dict)
     principals_file = data_dir / 'title.principals.tsv'
 
     with open(principals_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            tconst = row['tconst']
-            category = row.get('category', '')
-
+        for row in counted(reader, stage):
             # Only include actors/actresses in movies we care about
-            if tconst in valid_movies and category in ('actor', 'actress'):
-                links[tconst].add(row['nconst'])
+            if row['tconst'] not in valid_movies:
+                continue
+            cast_row = parse_cast_row(row)
+            if cast_row is None:
+                continue
+            tconst, nconst, ordering = cast_row
+            cast = orderings[tconst]
+            if nconst not in cast or ordering < cast[nconst]:
+                cast[nconst] = ordering
+
+    links = {tconst: rank_billing(cast) for tconst, cast in orderings.items()}
 
     total_links = sum(len(v) for v in links.values())
     print(f"  Loaded {total_links:,} movie-actor links for {len(links):,} movies")
+    if stage is not None:
+        stage.rows_out = total_links
     return links
 
 
-def create_database(output_path: Path, movies: Dict[str, dict],
-                   actors: Dict[str, dict], links: Dict[str, Set[str]],
-                   ratings: Dict[str, Tuple[float, int]]):
-    """Create the SQLite database with all tables and indexes."""
-    print(f"Creating database: {output_path}")
+def load_links_for_movies(data_dir: Path, movies: Dict[str, tuple],
+                          stage: Optional[Stage] = None) -> Dict[str, Dict[str, int]]:
+    """load_movie_actor_links restricted to the keys of a load_all_movies result."""
+    return load_movie_actor_links(data_dir, set(movies), stage)
+
 
+def open_new_database(output_path: Path) -> sqlite3.Connection:
+    """Create an empty database file with the MovieChain schema."""
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -153,6 +359,7 @@ def create_database(output_path: Path, movies: Dict[str, dict],
         output_path.unlink()
 
     conn = sqlite3.connect(str(output_path))
+    conn.execute(f'PRAGMA page_size = {PAGE_SIZE}')
     cursor = conn.cursor()
 
     # Create tables
@@ -163,10 +370,54 @@ def create_database(output_path: Path, movies: Dict[str, dict],
             title TEXT NOT NULL,
             year INTEGER,
             genres TEXT,
+            genre_mask INTEGER NOT NULL DEFAULT 0,
             rating REAL,
             votes INTEGER
         );
 
+        -- Genre dictionary; genre_mask has bit (1 << (genre_id - 1)) set per genre
+        CREATE TABLE genres (
+            genre_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            bit INTEGER NOT NULL
+        );
+
+        -- One row per (movie, genre) for movies with a known year, clustered
+        -- so a genre + decade filter is a single index range in votes order
+        CREATE TABLE movie_genres (
+            genre_id INTEGER NOT NULL,
+            decade INTEGER NOT NULL,
+            votes INTEGER NOT NULL,
+            tconst TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            PRIMARY KEY (genre_id, decade, votes DESC, tconst)
+        ) WITHOUT ROWID;
+
+        -- Most-voted movies per (genre, decade); genre_id/decade 0 means any
+        CREATE TABLE genre_decade_pools (
+            genre_id INTEGER NOT NULL,
+            decade INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            tconst TEXT NOT NULL,
+            PRIMARY KEY (genre_id, decade, rank)
+        ) WITHOUT ROWID;
+
+        -- Hint lists: the most recognizable cast of each movie and the
+        -- best-known films of each actor, rank 1 first
+        CREATE TABLE movie_hints (
+            tconst TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            nconst TEXT NOT NULL,
+            PRIMARY KEY (tconst, rank)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE actor_hints (
+            nconst TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            tconst TEXT NOT NULL,
+            PRIMARY KEY (nconst, rank)
+        ) WITHOUT ROWID;
+
         -- Actors table
         CREATE TABLE actors (
             nconst TEXT PRIMARY KEY,
@@ -178,6 +429,7 @@ def create_database(output_path: Path, movies: Dict[str, dict],
         CREATE TABLE movie_actors (
             tconst TEXT NOT NULL,
             nconst TEXT NOT NULL,
+            billing INTEGER NOT NULL,
             PRIMARY KEY (tconst, nconst),
             FOREIGN KEY (tconst) REFERENCES movies(tconst),
             FOREIGN KEY (nconst) REFERENCES actors(nconst)
@@ -198,89 +450,245 @@ def create_database(output_path: Path, movies: Dict[str, dict],
         );
     ''')
 
-    # Insert movies
-    print("  Inserting movies...")
-    movie_rows = []
-    for tconst, movie in movies.items():
-        rating_info = ratings.get(tconst, (None, None))
-        movie_rows.append((
-            tconst,
-            movie['title'],
-            movie['year'],
-            movie['genres'],
-            rating_info[0],
-            rating_info[1]
-        ))
-
-    cursor.executemany(
-        'INSERT INTO movies (tconst, title, year, genres, rating, votes) VALUES (?, ?, ?, ?, ?, ?)',
-        movie_rows
-    )
-
-    # Build set of actors we actually need (those linked to our movies)
-    needed_actors = set()
-    for movie_actors in links.values():
-        needed_actors.update(movie_actors)
-
-    # Insert only actors that appear in our movies
-    print("  Inserting actors...")
-    actor_rows = []
-    for nconst in needed_actors:
-        if nconst in actors:
-            actor = actors[nconst]
-            actor_rows.append((
-                nconst,
-                actor['name'],
-                ','.join(actor['known_for']) if actor['known_for'] else None
-            ))
+    return conn
+
+
+def build_genre_facets(cursor: sqlite3.Cursor, genre_ids: Dict[str, int],
+                       report: Optional[BuildReport] = None):
+    """Write the genre dictionary, the movie_genres facet and the popular pools."""
+    report = report or BuildReport('build_genre_facets')
+    print("  Building genre facets and popular pools...")
+    with report.stage('facets') as stage:
+        cursor.executemany(
+            'INSERT INTO genres (genre_id, name, bit) VALUES (?, ?, ?)',
+            sorted((genre_id, name, 1 << (genre_id - 1)) for name, genre_id in genre_ids.items())
+        )
+        cursor.execute('''
+            INSERT INTO movie_genres (genre_id, decade, votes, tconst, year)
+            SELECT g.genre_id, m.year / 10 * 10, COALESCE(m.votes, 0), m.tconst, m.year
+            FROM movies m
+            JOIN genres g ON m.genre_mask & g.bit
+            WHERE m.year IS NOT NULL
+            ORDER BY g.genre_id, m.year / 10 * 10, COALESCE(m.votes, 0) DESC, m.tconst
+        ''')
+        stage.rows_out = cursor.rowcount
+
+        # Pools for each (genre, decade), each genre across all decades, each
+        # decade across all genres, and the overall top; rated movies only
+        cursor.execute(f'''
+            INSERT INTO genre_decade_pools (genre_id, decade, rank, tconst)
+            SELECT genre_id, decade, rank, tconst FROM (
+                SELECT genre_id, decade, tconst,
+                       ROW_NUMBER() OVER (PARTITION BY genre_id, decade
+                                          ORDER BY votes DESC, tconst) AS rank
+                FROM (
+                    SELECT genre_id, decade, votes, tconst FROM movie_genres WHERE votes > 0
+                    UNION ALL
+                    SELECT genre_id, {ANY_DECADE}, votes, tconst FROM movie_genres WHERE votes > 0
+                )
+                UNION ALL
+                SELECT {ANY_GENRE}, decade, tconst,
+                       ROW_NUMBER() OVER (PARTITION BY decade ORDER BY votes DESC, tconst)
+                FROM (
+                    SELECT year / 10 * 10 AS decade, votes, tconst
+                    FROM movies WHERE year IS NOT NULL AND votes > 0
+                    UNION ALL
+                    SELECT {ANY_DECADE}, votes, tconst FROM movies WHERE votes > 0
+                )
+            )
+            WHERE rank <= {GENRE_POOL_SIZE}
+            ORDER BY genre_id, decade, rank
+        ''')
+        stage.rows_out += cursor.rowcount
+        stage.rows_in = cursor.execute('SELECT COUNT(*) FROM movies').fetchone()[0]
+    print(f"  {len(genre_ids)} genres")
+
+
+def normalize_title(title: str) -> str:
+    """Casefolded title without accents or punctuation, for telling titles apart."""
+    decomposed = unicodedata.normalize('NFKD', title)
+    letters = ''.join(c if c.isalnum() else ' ' for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(letters.casefold().split())
+
+
+def build_title_aliases(db_path: Path, data_dir: Path,
+                        report: Optional[BuildReport] = None) -> int:
+    """
+    Add movie_aliases and its FTS index to a finished build database.
+
+    Aliases are each movie's originalTitle and its title.akas titles, minus
+    any that normalize (see normalize_title) to the primary title or to an
+    alias already kept. aliases_fts uses the same tokenizer as movies_fts, so
+    one prefix query can be run against both (see ALIAS_QUERIES).
+    """
+    report = report or BuildReport('build_title_aliases')
+    print("Building title aliases...")
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+    cursor.executescript('''
+        DROP TABLE IF EXISTS aliases_fts;
+        DROP TABLE IF EXISTS movie_aliases;
 
-    cursor.executemany(
-        'INSERT INTO actors (nconst, name, known_for) VALUES (?, ?, ?)',
-        actor_rows
-    )
-    print(f"  Inserted {len(actor_rows):,} actors")
+        -- Original and regional titles that differ from movies.title
+        CREATE TABLE movie_aliases (
+            alias_id INTEGER PRIMARY KEY,
+            tconst TEXT NOT NULL,
+            title TEXT NOT NULL
+        );
+
+        CREATE VIRTUAL TABLE aliases_fts USING fts5(
+            title,
+            content='movie_aliases',
+            content_rowid='alias_id'
+        );
+    ''')
+    primary = {tconst: normalize_title(title)
+               for tconst, title in cursor.execute('SELECT tconst, title FROM movies')}
+    # movie_id -> {normalized alias: first spelling seen}
+    aliases: Dict[str, Dict[str, str]] = {}
+
+    def add(tconst: str, title: str):
+        key = normalize_title(title)
+        if key and key != primary[tconst]:
+            aliases.setdefault(tconst, {}).setdefault(key, title)
+
+    with report.stage('aliases:parse') as stage:
+        with open(data_dir / 'title.basics.tsv', 'r', encoding='utf-8') as f:
+            for row in counted(csv.DictReader(f, delimiter='\t'), stage):
+                if row['tconst'] in primary and row.get('originalTitle', '\\N') != '\\N':
+                    add(row['tconst'], row['originalTitle'])
+        with open(data_dir / 'title.akas.tsv', 'r', encoding='utf-8') as f:
+            for row in counted(csv.DictReader(f, delimiter='\t'), stage):
+                if row['titleId'] in primary and row.get('title', '\\N') != '\\N':
+                    add(row['titleId'], row['title'])
+        stage.rows_out = sum(len(titles) for titles in aliases.values())
+
+    with report.stage('aliases:insert') as stage:
+        rows = ((tconst, title) for tconst in sorted(aliases) for title in aliases[tconst].values())
+        cursor.executemany('INSERT INTO movie_aliases (tconst, title) VALUES (?, ?)', rows)
+        stage.rows_out = cursor.execute('SELECT COUNT(*) FROM movie_aliases').fetchone()[0]
+        cursor.execute("INSERT INTO aliases_fts(aliases_fts) VALUES('rebuild')")
+        conn.commit()
+
+    def size(*names: str) -> int:
+        pages = 0
+        for name in names:
+            pages += cursor.execute('SELECT COUNT(*) FROM dbstat WHERE name = ? OR name GLOB ?',
+                                    (name, name + '_*')).fetchone()[0]
+        return pages * cursor.execute('PRAGMA page_size').fetchone()[0]
+    title_index = size('movies_fts')
+    alias_index = size('movie_aliases', 'aliases_fts')
+    conn.close()
+
+    count = stage.rows_out
+    mb = 1024 * 1024
+    print(f"  {count:,} aliases for {len(aliases):,} movies: {alias_index / mb:.1f} MB "
+          f"(title FTS {title_index / mb:.1f} MB, +{alias_index / title_index * 100 if title_index else 0:.0f}%)")
+    return count
+
+
+def build_hint_lists(db_path: Path, hint_count: int = HINT_COUNT,
+                     report: Optional[BuildReport] = None):
+    """
+    Fill movie_hints and actor_hints in a finished build database.
+
+    A movie's cast is ranked by whether the movie is in the actor's
+    known_for titles, then billing, then the actor's total votes across
+    their films. An actor's films are ranked by known_for membership, then
+    votes, then billing. Both keep the top hint_count.
+    """
+    report = report or BuildReport('build_hint_lists')
+    print(f"Building hint lists (top {hint_count} per movie and actor)...")
+    conn = sqlite3.connect(str(db_path))
+    cursor = conn.cursor()
+    with report.stage('hints') as stage:
+        cursor.execute('DELETE FROM movie_hints')
+        cursor.execute('DELETE FROM actor_hints')
+        cursor.execute('''
+            CREATE TEMP TABLE hint_links AS
+            SELECT ma.tconst, ma.nconst, ma.billing, COALESCE(m.votes, 0) AS votes,
+                   INSTR(',' || COALESCE(a.known_for, '') || ',', ',' || ma.tconst || ',') > 0
+                       AS known,
+                   SUM(COALESCE(m.votes, 0)) OVER (PARTITION BY ma.nconst) AS fame
+            FROM movie_actors ma
+            JOIN movies m ON m.tconst = ma.tconst
+            JOIN actors a ON a.nconst = ma.nconst
+        ''')
+        stage.rows_in = cursor.execute('SELECT COUNT(*) FROM temp.hint_links').fetchone()[0]
+        cursor.execute('''
+            INSERT INTO movie_hints (tconst, rank, nconst)
+            SELECT tconst, rank, nconst FROM (
+                SELECT tconst, nconst,
+                       ROW_NUMBER() OVER (PARTITION BY tconst
+                                          ORDER BY known DESC, billing, fame DESC, nconst) AS rank
+                FROM temp.hint_links
+            )
+            WHERE rank <= ?
+            ORDER BY tconst, rank
+        ''', (hint_count,))
+        stage.rows_out = cursor.rowcount
+        cursor.execute('''
+            INSERT INTO actor_hints (nconst, rank, tconst)
+            SELECT nconst, rank, tconst FROM (
+                SELECT nconst, tconst,
+                       ROW_NUMBER() OVER (PARTITION BY nconst
+                                          ORDER BY known DESC, votes DESC, billing, tconst) AS rank
+                FROM temp.hint_links
+            )
+            WHERE rank <= ?
+            ORDER BY nconst, rank
+        ''', (hint_count,))
+        stage.rows_out += cursor.rowcount
+        cursor.execute('DROP TABLE temp.hint_links')
+        conn.commit()
+    conn.close()
+    print(f"  {stage.rows_out:,} hint rows")
 
-    # Insert movie-actor links
-    print("  Inserting movie-actor links...")
-    link_rows = []
-    for tconst, actor_ids in links.items():
-        for nconst in actor_ids:
-            if nconst in actors:  # Only link to actors we have
-                link_rows.append((tconst, nconst))
-
-    cursor.executemany(
-        'INSERT INTO movie_actors (tconst, nconst) VALUES (?, ?)',
-        link_rows
-    )
-    print(f"  Inserted {len(link_rows):,} links")
+
+def build_search_indexes(cursor: sqlite3.Cursor, report: Optional[BuildReport] = None):
+    """Populate the FTS tables and create secondary indexes once all rows are in."""
+    report = report or BuildReport('build_search_indexes')
 
     # Populate FTS indexes
     print("  Building full-text search indexes...")
-    cursor.execute('''
-        INSERT INTO movies_fts(rowid, title)
-        SELECT rowid, title FROM movies
-    ''')
-    cursor.execute('''
-        INSERT INTO actors_fts(rowid, name)
-        SELECT rowid, name FROM actors
-    ''')
+    with report.stage('fts') as stage:
+        cursor.execute('''
+            INSERT INTO movies_fts(rowid, title)
+            SELECT rowid, title FROM movies
+        ''')
+        stage.rows_in += cursor.rowcount
+        cursor.execute('''
+            INSERT INTO actors_fts(rowid, name)
+            SELECT rowid, name FROM actors
+        ''')
+        stage.rows_in += cursor.rowcount
 
     # Create additional indexes for fast lookups
     print("  Creating indexes...")
-    cursor.executescript('''
-        -- Index for finding actors in a movie
-        CREATE INDEX idx_movie_actors_movie ON movie_actors(tconst);
+    with report.stage('indexes'):
+        cursor.executescript(f'''
+            -- Finding actors in a movie needs no index of its own: the
+            -- (tconst, nconst) primary key already leads with tconst.
 
-        -- Index for finding movies with an actor
-        CREATE INDEX idx_movie_actors_actor ON movie_actors(nconst);
+            -- Index for finding movies with an actor
+            CREATE INDEX idx_movie_actors_actor ON movie_actors(nconst);
 
-        -- Index for sorting movies by popularity
-        CREATE INDEX idx_movies_votes ON movies(votes DESC);
+            -- Covering partial index for an actor's top-billed ("main cast") films.
+            -- A movie's main cast needs none: its whole cast is a handful of
+            -- adjacent primary-key entries.
+            CREATE INDEX idx_movie_actors_actor_top_billed
+                ON movie_actors(nconst, billing, tconst) WHERE billing <= {TOP_BILLED_CAST};
 
-        -- Index for year filtering
-        CREATE INDEX idx_movies_year ON movies(year);
-    ''')
+            -- Index for sorting movies by popularity
+            CREATE INDEX idx_movies_votes ON movies(votes DESC);
+
+            -- Index for year/decade filtering, most-voted first within a year
+            CREATE INDEX idx_movies_year_votes ON movies(year, votes DESC);
+        ''')
 
+
+def close_database(conn: sqlite3.Connection, output_path: Path):
+    """Commit, close and report the size of a freshly built database."""
     conn.commit()
     conn.close()
 
@@ -289,6 +697,475 @@ def create_database(output_path: Path, movies: Dict[str, dict],
     print(f"  Database size: {size_mb:.1f} MB")
 
 
+def movie_order(movies: Iterable[str], ratings: Dict[str, Tuple[float, int]],
+                row_order: str = 'id') -> List[str]:
+    """Movie IDs in insert order: by ID, or most-voted first (ties by ID)."""
+    if row_order == 'popularity':
+        return sorted(movies, key=lambda tconst: (-ratings.get(tconst, (None, 0))[1], tconst))
+    return sorted(movies)
+
+
+def insert_movies(cursor: sqlite3.Cursor, movies: Dict[str, Tuple[str, Optional[int], str]],
+                  ratings: Dict[str, Tuple[float, int]], genre_ids: Dict[str, int],
+                  report: BuildReport, order: Optional[List[str]] = None) -> int:
+    """Insert movies with their ratings and genre mask, in ID order unless order is given."""
+    print("  Inserting movies...")
+    with report.stage('insert:movies') as stage:
+        movie_rows = []
+        for tconst in order or sorted(movies):
+            title, year, genres = movies[tconst]
+            rating_info = ratings.get(tconst, (None, None))
+            movie_rows.append((
+                tconst,
+                title,
+                year,
+                genres,
+                genre_mask(genres, genre_ids),
+                rating_info[0],
+                rating_info[1]
+            ))
+
+        cursor.executemany(
+            'INSERT INTO movies (tconst, title, year, genres, genre_mask, rating, votes) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            movie_rows
+        )
+        stage.rows_in = stage.rows_out = len(movie_rows)
+    return len(movie_rows)
+
+
+def insert_actors(cursor: sqlite3.Cursor, actors: Dict[str, Tuple[str, Optional[str]]],
+                  links: Dict[str, Dict[str, int]], report: BuildReport,
+                  row_order: str = 'id') -> int:
+    """Insert only actors that appear in our movies, by ID or most films first."""
+    print("  Inserting actors...")
+    with report.stage('insert:actors') as stage:
+        # Count films per actor we actually need (those linked to our movies)
+        film_counts = Counter()
+        for movie_actors in links.values():
+            film_counts.update(movie_actors.keys())
+        needed_actors = film_counts.keys()
+
+        if row_order == 'popularity':
+            order = sorted(needed_actors, key=lambda nconst: (-film_counts[nconst], nconst))
+        else:
+            order = sorted(needed_actors)
+
+        actor_rows = []
+        for nconst in order:
+            if nconst in actors:
+                name, known_for = actors[nconst]
+                actor_rows.append((nconst, name, known_for))
+
+        cursor.executemany(
+            'INSERT INTO actors (nconst, name, known_for) VALUES (?, ?, ?)',
+            actor_rows
+        )
+        stage.rows_in = len(needed_actors)
+        stage.rows_out = len(actor_rows)
+    print(f"  Inserted {len(actor_rows):,} actors")
+    return len(actor_rows)
+
+
+def insert_movie_actors(cursor: sqlite3.Cursor, links: Dict[str, Dict[str, int]],
+                        actors: Dict[str, tuple], report: BuildReport,
+                        order: Optional[List[str]] = None) -> int:
+    """
+    Insert movie-actor links, skipping unknown actors.
+
+    Links go in (movie, actor) order, or with an order of movie IDs (see
+    movie_order) in that movie order with each cast in billing order.
+    """
+    print("  Inserting movie-actor links...")
+    with report.stage('insert:movie_actors') as stage:
+        link_rows = []
+        if order is None:
+            cast_order = ((tconst, sorted(links[tconst].items())) for tconst in sorted(links))
+        else:
+            cast_order = ((tconst, sorted(links[tconst].items(), key=lambda item: (item[1], item[0])))
+                          for tconst in order if tconst in links)
+        for tconst, cast in cast_order:
+            for nconst, billing in cast:
+                if nconst in actors:  # Only link to actors we have
+                    link_rows.append((tconst, nconst, billing))
+
+        cursor.executemany(
+            'INSERT INTO movie_actors (tconst, nconst, billing) VALUES (?, ?, ?)',
+            link_rows
+        )
+        stage.rows_in = sum(len(cast) for cast in links.values())
+        stage.rows_out = len(link_rows)
+    print(f"  Inserted {len(link_rows):,} links")
+    return len(link_rows)
+
+
+def create_database(output_path: Path, movies: Dict[str, Tuple[str, Optional[int], str]],
+                   actors: Dict[str, Tuple[str, Optional[str]]],
+                   links: Dict[str, Dict[str, int]],
+                   ratings: Dict[str, Tuple[float, int]],
+                   report: Optional[BuildReport] = None, row_order: str = 'id'):
+    """
+    Create the SQLite database with all tables and indexes.
+
+    Rows are inserted in a fixed order (see ROW_ORDERS) so repeated builds
+    lay out pages identically.
+    """
+    print(f"Creating database: {output_path}")
+    report = report or BuildReport('create_database')
+    conn = open_new_database(output_path)
+    cursor = conn.cursor()
+
+    genre_ids = new_genre_ids()
+    order = movie_order(movies, ratings, row_order) if row_order != 'id' else None
+    insert_movies(cursor, movies, ratings, genre_ids, report, order)
+    insert_actors(cursor, actors, links, report, row_order)
+    insert_movie_actors(cursor, links, actors, report, order)
+
+    build_genre_facets(cursor, genre_ids, report)
+    build_search_indexes(cursor, report)
+    close_database(conn, output_path)
+
+
+# Tables each partition of a partitioned build fills, and the FTS tables
+# whose shadow tables come along with them
+PARTITION_TABLES = {
+    'movies': (['movies', 'genres', 'movie_genres', 'genre_decade_pools'], ['movies_fts']),
+    'actors': (['actors'], ['actors_fts']),
+    'movie_actors': (['movie_actors'], []),
+}
+
+# Shadow tables of an external-content FTS5 table
+FTS_SHADOW_TABLES = ('data', 'idx', 'docsize', 'config')
+
+
+def _build_partition(name: str, partition_dir: Path, fill, stage: Optional[Stage]) -> dict:
+    """
+    Build one partition: the full schema with only this partition's tables filled.
+
+    Every partition has every table and index (empty ones cost nothing), so
+    its tables match the final database exactly and merge_partitions can
+    copy them with SQLite's transfer optimization.
+    """
+    path = partition_dir / f'{name}.sqlite'
+    report = BuildReport(f'partition:{name}')
+    conn = open_new_database(path)
+    cursor = conn.cursor()
+    rows = fill(cursor, report)
+    build_search_indexes(cursor, report)
+    conn.commit()
+    conn.close()
+    if stage is not None:
+        stage.rows_out = rows
+    return {'name': name, 'path': str(path), 'rows': rows, 'stages': report.stages}
+
+
+def build_movies_partition(partition_dir: Path, row_order: str, movies: Dict[str, tuple],
+                           ratings: Dict[str, Tuple[float, int]],
+                           stage: Optional[Stage] = None) -> dict:
+    def fill(cursor, report):
+        genre_ids = new_genre_ids()
+        order = movie_order(movies, ratings, row_order) if row_order != 'id' else None
+        count = insert_movies(cursor, movies, ratings, genre_ids, report, order)
+        build_genre_facets(cursor, genre_ids, report)
+        return count
+    return _build_partition('movies', partition_dir, fill, stage)
+
+
+def build_actors_partition(partition_dir: Path, row_order: str, actors: Dict[str, tuple],
+                           links: Dict[str, Dict[str, int]],
+                           stage: Optional[Stage] = None) -> dict:
+    return _build_partition(
+        'actors', partition_dir,
+        lambda cursor, report: insert_actors(cursor, actors, links, report, row_order),
+        stage)
+
+
+def build_movie_actors_partition(partition_dir: Path, row_order: str,
+                                 links: Dict[str, Dict[str, int]], actors: Dict[str, tuple],
+                                 ratings: Dict[str, Tuple[float, int]],
+                                 stage: Optional[Stage] = None) -> dict:
+    order = movie_order(links, ratings, row_order) if row_order != 'id' else None
+    return _build_partition(
+        'movie_actors', partition_dir,
+        lambda cursor, report: insert_movie_actors(cursor, links, actors, report, order),
+        stage)
+
+
+def merge_partitions(output_path: Path, *partitions: dict,
+                     report: Optional[BuildReport] = None):
+    """
+    Assemble the final build database from partition files.
+
+    The empty final schema (tables, then FTS, then indexes, the same order
+    create_database uses) is created first. Each partition is then ATTACHed
+    and its tables copied with plain `INSERT INTO t SELECT * FROM part.t`.
+    Source and destination have identical columns and indexes, so SQLite
+    transfers b-tree records, index entries included, in key order instead
+    of re-inserting rows and rebuilding indexes. FTS shadow tables are
+    copied the same way (rowids are preserved, so they stay valid).
+    """
+    print(f"Merging {len(partitions)} partitions into {output_path}")
+    report = report or BuildReport('merge_partitions')
+    conn = open_new_database(output_path)
+    cursor = conn.cursor()
+    build_search_indexes(cursor, BuildReport('merge_schema'))
+    conn.commit()
+
+    with report.stage('merge') as stage:
+        for partition in partitions:
+            tables, fts = PARTITION_TABLES[partition['name']]
+            cursor.execute('ATTACH DATABASE ? AS part', (partition['path'],))
+            for table in tables:
+                cursor.execute(f'INSERT INTO main.{table} SELECT * FROM part.{table}')
+                stage.rows_out += cursor.rowcount
+            for table in fts:
+                for suffix in FTS_SHADOW_TABLES:
+                    shadow = f'{table}_{suffix}'
+                    cursor.execute(f'DELETE FROM main.{shadow}')
+                    cursor.execute(f'INSERT INTO main.{shadow} SELECT * FROM part.{shadow}')
+            conn.commit()
+            cursor.execute('DETACH DATABASE part')
+            stage.rows_in += partition['rows']
+    close_database(conn, output_path)
+
+    # Reopen so FTS5 doesn't reuse the structure it cached before the copy
+    conn = sqlite3.connect(str(output_path))
+    try:
+        for table in ('movies_fts', 'actors_fts'):
+            conn.execute(f"INSERT INTO {table}({table}) VALUES('integrity-check')")
+    finally:
+        conn.close()
+
+
+def print_partition_report(graph: StageGraph, partitions: List[dict]):
+    """Per-partition timings against the serial equivalent of the same work."""
+    print("\n  Partitions:")
+    print(f"  {'partition':<16} {'wall s':>9} {'rows':>12}   sub-stages")
+    for partition in partitions:
+        node = graph.nodes[f"partition:{partition['name']}"]
+        parts = ', '.join(f"{s.name} {s.wall_seconds:.2f}s" for s in partition['stages']
+                          if s.wall_seconds >= 0.005)
+        print(f"  {partition['name']:<16} {node.seconds:>9.2f} {partition['rows']:>12,}   {parts}")
+    seconds = [graph.nodes[f"partition:{p['name']}"].seconds for p in partitions]
+    merge = graph.nodes['build'].seconds
+    # Partitions start as soon as their own inputs are parsed, so compare
+    # durations rather than the span between first start and last finish
+    print(f"  Serial (one connection, sum):  {sum(seconds):>8.2f}s")
+    print(f"  Longest partition + merge:     {max(seconds):>8.2f}s + {merge:.2f}s "
+          f"= {max(seconds) + merge:.2f}s")
+
+
+def iter_tsv(path: Path) -> Iterator[dict]:
+    """Stream the rows of an IMDb TSV file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from csv.DictReader(f, delimiter='\t')
+
+
+def insert_batched(cursor: sqlite3.Cursor, sql: str, rows: Iterable[tuple],
+                   batch_size: int = 5_000) -> int:
+    """
+    executemany over a stream in fixed-size batches; returns the row count.
+    Batches stay small: under a memory cap, 50,000 actor rows are ~12 MB.
+    """
+    rows = iter(rows)
+    inserted = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return inserted
+        cursor.executemany(sql, batch)
+        inserted += len(batch)
+
+
+def build_database_external(data_dir: Path, output_path: Path, max_memory: int,
+                            report: Optional[BuildReport] = None, row_order: str = 'id') -> int:
+    """
+    Build the same database as create_database without holding the IMDb data in memory.
+
+    Each TSV is streamed into an ExternalSorter keyed on the join column.
+    Ratings are left-joined onto titles, principals are joined onto movies,
+    and links are joined onto names, all with merge joins over sorted runs.
+    Rows are inserted in ID order as they come out of the joins, the same
+    order create_database uses. For row_order 'popularity' they go through
+    one more sorter keyed on popularity first. Returns the number of movies
+    inserted.
+    """
+    mb = 1024 * 1024
+    report = report or BuildReport('build_database_external')
+    print(f"Creating database with external sort: {output_path}")
+    print(f"  Memory cap: {max_memory / mb:.0f} MB")
+
+    # Of what the interpreter isn't already using, half goes to the sort buffers
+    # that are filling and a quarter to SQLite, split between its page cache
+    # and its own sorter (which may buffer as much as cache_size); the rest is
+    # headroom for merge reads and allocator slack. Each new sorter flushes the
+    # others, and they write their last buffer to disk too, so a sorter being
+    # read holds one chunk per run instead of its records. Two sorters only
+    # ever fill at once for row_order 'popularity' (links and actors by
+    # films), and they split the budget.
+    available = max(max_memory - (peak_rss_bytes() or 0), 8 * mb)
+    sort_budget = available // 2
+    conn = open_new_database(output_path)
+    conn.execute(f'PRAGMA cache_size = -{max(2048, available // 8 // 1024)}')
+    conn.execute('PRAGMA temp_store = FILE')
+    cursor = conn.cursor()
+
+    temp_dir = Path(tempfile.mkdtemp(prefix='moviechain-sort-', dir=str(output_path.parent)))
+    by_first = itemgetter(0)
+    sorters = []
+
+    def new_sorter(key, name, budget=sort_budget):
+        for sorter in sorters:
+            sorter.flush()
+        sorter = ExternalSorter(key, budget, temp_dir, name, keep_in_memory=False)
+        sorters.append(sorter)
+        return sorter
+
+    try:
+        print("  Sorting movies...")
+        with report.stage('sort:movies') as stage:
+            movies = new_sorter(by_first, 'movies')
+            for row in counted(iter_tsv(data_dir / 'title.basics.tsv'), stage):
+                movie = parse_movie_row(row)
+                if movie is not None:
+                    movies.add((movie['tconst'], movie['title'], movie['year'], movie['genres']))
+            stage.rows_out = movies.count
+
+        print("  Sorting ratings...")
+        with report.stage('sort:ratings') as stage:
+            ratings = new_sorter(by_first, 'ratings')
+            for row in counted(iter_tsv(data_dir / 'title.ratings.tsv'), stage):
+                parsed = parse_rating_row(row)
+                if parsed is not None:
+                    ratings.add(parsed)
+            stage.rows_out = ratings.count
+
+        print("  Inserting movies...")
+        genre_ids = new_genre_ids()
+        # (tconst, rank) of each movie in insert order, for ordering links by movie popularity
+        movie_ranks = new_sorter(by_first, 'movie-ranks')
+        with report.stage('insert:movies') as stage:
+            movie_rows = (
+                (tconst, movie[-1][1], movie[-1][2], movie[-1][3],
+                 rating[-1][1] if rating else None, rating[-1][2] if rating else None)
+                for tconst, movie, rating in merge_join(movies, ratings, by_first, by_first,
+                                                        keep_unmatched_left=True)
+            )
+            if row_order == 'popularity':
+                by_votes = new_sorter(lambda row: (-(row[5] or 0), row[0]), 'movies-by-votes')
+                by_votes.extend(movie_rows)
+                movie_rows = by_votes
+
+            def masked_movie_rows():
+                for rank, (tconst, title, year, genres, rating, votes) in enumerate(movie_rows):
+                    if row_order == 'popularity':
+                        movie_ranks.add((tconst, rank))
+                    yield tconst, title, year, genres, genre_mask(genres, genre_ids), rating, votes
+
+            movie_count = insert_batched(
+                cursor,
+                'INSERT INTO movies (tconst, title, year, genres, genre_mask, rating, votes) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                masked_movie_rows()
+            )
+            stage.rows_in = movies.count
+            stage.rows_out = movie_count
+        print(f"  Inserted {movie_count:,} movies")
+        ratings.close()
+
+        print("  Sorting cast rows from principals...")
+        with report.stage('sort:cast') as stage:
+            cast = new_sorter(by_first, 'cast')
+            for row in counted(iter_tsv(data_dir / 'title.principals.tsv'), stage):
+                cast_row = parse_cast_row(row)
+                if cast_row is not None:
+                    cast.add(cast_row)
+            stage.rows_out = cast.count
+
+        print("  Ranking billing and re-sorting links by actor...")
+        with report.stage('join:links') as stage:
+            links_by_actor = new_sorter(itemgetter(1, 0), 'links-by-actor')
+            for tconst, _, cast_rows in merge_join(movies, cast, by_first, by_first):
+                orderings = {}
+                for _, nconst, ordering in cast_rows:
+                    if nconst not in orderings or ordering < orderings[nconst]:
+                        orderings[nconst] = ordering
+                for nconst, billing in rank_billing(orderings).items():
+                    links_by_actor.add((tconst, nconst, billing))
+            stage.rows_in = cast.count
+            stage.rows_out = links_by_actor.count
+        movies.close()
+        cast.close()
+
+        print("  Sorting actors...")
+        with report.stage('sort:actors') as stage:
+            actors = new_sorter(by_first, 'actors')
+            for row in counted(iter_tsv(data_dir / 'name.basics.tsv'), stage):
+                actor = parse_actor_row(row)
+                if actor is not None:
+                    actors.add((actor['nconst'], actor['name'], ','.join(actor['known_for']) or None))
+            stage.rows_out = actors.count
+
+        # Only actors that appear in our movies, and only links to actors we have
+        print("  Inserting actors...")
+        actor_budget = sort_budget // 2 if row_order == 'popularity' else sort_budget
+        links_by_movie = new_sorter(itemgetter(0, 1), 'links-by-movie', actor_budget)
+
+        def linked_actor_rows():
+            for _, actor, links in merge_join(actors, links_by_actor, by_first, itemgetter(1)):
+                links_by_movie.extend(links)
+                yield actor[-1] + (len(links),)
+
+        with report.stage('insert:actors') as stage:
+            actor_rows = linked_actor_rows()
+            if row_order == 'popularity':
+                # Most films first; this drains the join, filling links_by_movie
+                by_films = new_sorter(lambda row: (-row[3], row[0]), 'actors-by-films', actor_budget)
+                by_films.extend(actor_rows)
+                actor_rows = by_films
+            actor_count = insert_batched(
+                cursor, 'INSERT INTO actors (nconst, name, known_for) VALUES (?, ?, ?)',
+                (row[:3] for row in actor_rows)
+            )
+            stage.rows_in = actors.count
+            stage.rows_out = actor_count
+        print(f"  Inserted {actor_count:,} actors")
+        actors.close()
+        links_by_actor.close()
+
+        print("  Inserting movie-actor links...")
+        with report.stage('insert:movie_actors') as stage:
+            link_rows = links_by_movie
+            if row_order == 'popularity':
+                # Movie popularity rank, then billing (the in-memory build's order)
+                by_rank = new_sorter(itemgetter(0, 3), 'links-by-rank')
+                for _, links, rank in merge_join(links_by_movie, movie_ranks, by_first, by_first):
+                    by_rank.extend((rank[0][1],) + link for link in links)
+                link_rows = (row[1:] for row in by_rank)
+            link_count = insert_batched(
+                cursor, 'INSERT INTO movie_actors (tconst, nconst, billing) VALUES (?, ?, ?)',
+                link_rows
+            )
+            stage.rows_in = links_by_actor.count
+            stage.rows_out = link_count
+        print(f"  Inserted {link_count:,} links")
+        links_by_movie.close()
+
+        build_genre_facets(cursor, genre_ids, report)
+        build_search_indexes(cursor, report)
+        close_database(conn, output_path)
+    finally:
+        for sorter in sorters:
+            sorter.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    peak = peak_rss_bytes()
+    if peak is not None:
+        status = 'within' if peak <= max_memory else 'OVER'
+        print(f"  Peak RSS: {peak / mb:.0f} MB ({status} the {max_memory / mb:.0f} MB cap)")
+    return movie_count
+
+
 def verify_database(db_path: Path):
     """Run verification queries on the database."""
     print(f"\nVerifying database: {db_path.name}")
@@ -305,9 +1182,13 @@ def verify_database(db_path: Path):
     cursor.execute('SELECT COUNT(*) FROM movie_actors')
     link_count = cursor.fetchone()[0]
 
+    cursor.execute('SELECT COUNT(*) FROM actor_costars')
+    costar_count = cursor.fetchone()[0]
+
     print(f"  Movies: {movie_count:,}")
     print(f"  Actors: {actor_count:,}")
     print(f"  Links: {link_count:,}")
+    print(f"  Co-star pairs: {costar_count:,}")
 
     # Test a sample query - search for "Matrix"
     print("\n  Sample search for 'Matrix':")
@@ -369,30 +1250,109 @@ def main():
         if not (data_dir / filename).exists():
             print(f"ERROR: Missing required file: {filename}")
             sys.exit(1)
+    if args.aliases and not (data_dir / 'title.akas.tsv').exists():
+        print("ERROR: Missing required file: title.akas.tsv (needed for --aliases)")
+        sys.exit(1)
+    if args.partitioned and args.max_memory:
+        print("ERROR: --partitioned builds from in-memory data and can't be combined with --max-memory")
+        sys.exit(1)
+    storage = None
+    if args.storage_profile:
+        try:
+            storage = load_profile(Path(args.storage_profile))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Could not load storage profile: {e}")
+            sys.exit(1)
 
-    # Load all actors first (we'll filter later)
-    actors = load_actors(data_dir)
-
-    # Load all ratings (for display purposes, not filtering)
-    ratings = load_ratings(data_dir)
-
-    # Build COMPLETE database with ALL movies
-    print("\n" + "=" * 60)
-    print("Building COMPLETE database (ALL movies)")
-    print("=" * 60)
-
-    all_movies = load_all_movies(data_dir)
-    all_links = load_movie_actor_links(data_dir, set(all_movies.keys()))
-
+    build_path = output_dir / 'moviechain_core.build.sqlite'
     db_path = output_dir / 'moviechain_core.sqlite'
-    create_database(db_path, all_movies, actors, all_links, ratings)
+    report_path = Path(args.report) if args.report else output_dir / 'build_report.json'
+    report = BuildReport('build_movie_database',
+                         profile_dir=Path(args.profile) if args.profile else None)
+
+    graph = StageGraph(report, workers=args.workers)
+    if args.max_memory:
+        print("=" * 60)
+        print("Building COMPLETE database (ALL movies, bounded memory)")
+        print("=" * 60)
+        # One streaming pipeline; parallel sorts would each need their own share of the cap
+        graph.add('build', build_database_external, data_dir, build_path,
+                  parse_size(args.max_memory), report, args.row_order, local=True)
+    else:
+        print("=" * 60)
+        print(f"Building COMPLETE database (ALL movies, {graph.workers} workers)")
+        print("=" * 60)
+        # Actors, ratings and movies read different files; only the links
+        # filter needs the movie IDs
+        graph.add('parse:actors', load_actors, data_dir)
+        graph.add('parse:ratings', load_ratings, data_dir)
+        graph.add('parse:movies', load_all_movies, data_dir)
+        graph.add('filter:links', load_links_for_movies, data_dir, deps=['parse:movies'])
+        if args.partitioned:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            partition_dir = Path(tempfile.mkdtemp(prefix='moviechain-partitions-',
+                                                  dir=str(output_dir)))
+            graph.add('partition:movies', build_movies_partition, partition_dir, args.row_order,
+                      deps=['parse:movies', 'parse:ratings'])
+            graph.add('partition:actors', build_actors_partition, partition_dir, args.row_order,
+                      deps=['parse:actors', 'filter:links'])
+            graph.add('partition:movie_actors', build_movie_actors_partition, partition_dir,
+                      args.row_order, deps=['filter:links', 'parse:actors', 'parse:ratings'])
+            graph.add('build', partial(merge_partitions, report=report), build_path,
+                      deps=['partition:movies', 'partition:actors', 'partition:movie_actors'],
+                      local=True)
+        else:
+            graph.add('build', partial(create_database, report=report, row_order=args.row_order),
+                      build_path,
+                      deps=['parse:movies', 'parse:actors', 'filter:links', 'parse:ratings'],
+                      local=True)
+
+    if args.aliases:
+        graph.add('aliases', lambda _: build_title_aliases(build_path, data_dir, report),
+                  deps=['build'], local=True)
+    graph.add('hints', lambda _: build_hint_lists(build_path, args.hint_count, report),
+              deps=['aliases' if args.aliases else 'build'], local=True)
+    # Pair counts share the build's memory cap when there is one
+    costar_memory = parse_size(args.max_memory) if args.max_memory else parse_size('512M')
+    graph.add('costars', lambda _: build_actor_costars(build_path, graph.workers, costar_memory,
+                                                       args.costar_min_films,
+                                                       args.costar_min_votes, report),
+              deps=['hints'], local=True)
+    # Ship a compacted, analyzed copy rather than the working file
+    graph.add('finalize', lambda _: finalize_database(build_path, db_path, build_report=report,
+                                                      storage=storage),
+              deps=['costars'], local=True)
+    graph.add('compress', lambda _: compress_database(db_path, build_report=report),
+              deps=['finalize'], local=True)
+    try:
+        results = graph.run()
+    finally:
+        if args.partitioned:
+            shutil.rmtree(partition_dir, ignore_errors=True)
+    if args.max_memory:
+        movie_count = results['build']
+    else:
+        movie_count = len(results['parse:movies'])
+    if not args.keep_build:
+        build_path.unlink()
     verify_database(db_path)
 
+    if args.analyze_size:
+        with report.stage('analyze_size'):
+            print_size_report(analyze_database_size(db_path))
+
+    report.print_summary()
+    if args.partitioned:
+        print_partition_report(graph, [results[f'partition:{name}'] for name in PARTITION_TABLES])
+    graph.print_critical_path()
+    report.write_json(report_path)
+
     print("\n" + "=" * 60)
     print("BUILD COMPLETE!")
     print("=" * 60)
     print(f"\nDatabase created: {db_path}")
-    print(f"This database contains ALL {len(all_movies):,} movies from IMDb!")
+    print(f"Compressed for the app bundle: {results['compress']}")
+    print(f"This database contains ALL {movie_count:,} movies from IMDb!")
 
 
 if __name__ == '__main__':
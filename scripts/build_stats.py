@@ -0,0 +1,138 @@
+"""
+Stage-level instrumentation for the MovieChain build scripts.
+
+Wrap each build stage in BuildReport.stage() to record wall time, CPU time,
+rows in/out, throughput and peak RSS:
+
+    report = BuildReport('build_movie_database', profile_dir=Path('profiles'))
+    with report.stage('parse:movies') as stage:
+        for row in counted(reader, stage):
+            ...
+        stage.rows_out = len(movies)
+    report.write_json(Path('build_report.json'))
+
+With a profile_dir, every stage also runs under cProfile and its stats are
+dumped to <profile_dir>/<NN>-<stage>.prof (open with `python3 -m pstats`).
+Stages are flat: cProfile cannot nest, so don't open a stage inside another.
+"""
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """Peak resident set size of this process (or its reaped children), or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Stage:
+    """Measurements for one build stage; set rows_in/rows_out while it runs."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows_in = 0
+        self.rows_out = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes: Optional[int] = None
+        self.peak_rss_children_bytes: Optional[int] = None
+        self.profile_path: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.rows_in or self.rows_out
+        return rows / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_per_second': round(self.rows_per_second, 1),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_rss_children_bytes': self.peak_rss_children_bytes,
+            'profile': self.profile_path,
+        }
+
+
+def counted(rows: Iterable, stage: Optional[Stage]) -> Iterator:
+    """Yield rows unchanged, counting each one into stage.rows_in."""
+    if stage is None:
+        yield from rows
+        return
+    for row in rows:
+        stage.rows_in += 1
+        yield row
+
+
+class BuildReport:
+    """Collects Stage measurements for one build run."""
+
+    def __init__(self, name: str, profile_dir: Optional[Path] = None):
+        self.name = name
+        self.profile_dir = profile_dir
+        self.stages: List[Stage] = []
+        self._started = time.perf_counter()
+        if profile_dir is not None:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = Stage(name)
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield stage
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            stage.wall_seconds = time.perf_counter() - wall_start
+            stage.cpu_seconds = time.process_time() - cpu_start
+            stage.peak_rss_bytes = peak_rss_bytes()
+            stage.peak_rss_children_bytes = peak_rss_bytes(children=True)
+            if profiler is not None:
+                safe_name = name.replace(':', '-').replace('/', '-')
+                path = self.profile_dir / f'{len(self.stages) + 1:02d}-{safe_name}.prof'
+                profiler.dump_stats(str(path))
+                stage.profile_path = str(path)
+            self.stages.append(stage)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'total_wall_seconds': round(time.perf_counter() - self._started, 4),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': [stage.to_dict() for stage in self.stages],
+        }
+
+    def write_json(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+        print(f"Build report written to {path}")
+
+    def print_summary(self):
+        mb = 1024 * 1024
+        print(f"\n  {'stage':<28} {'wall s':>9} {'cpu s':>9} {'rows in':>12} "
+              f"{'rows out':>12} {'rows/s':>11} {'peak MB':>8}")
+        for stage in self.stages:
+            peak = f"{stage.peak_rss_bytes / mb:.0f}" if stage.peak_rss_bytes else '-'
+            print(f"  {stage.name:<28} {stage.wall_seconds:>9.2f} {stage.cpu_seconds:>9.2f} "
+                  f"{stage.rows_in:>12,} {stage.rows_out:>12,} "
+                  f"{stage.rows_per_second:>11,.0f} {peak:>8}")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Page-level delta patches between two MovieChain database builds.
+
+Two builds made from similar IMDb dumps share most of their pages, as long as
+rows are inserted in a deterministic order and the page size is fixed (both
+are set by build_movie_database.py). `make` compares the builds page by page
+and writes only the pages that differ; `apply` rebuilds the new database from
+the old one plus the patch and checks SHA-256 digests of both.
+
+Patch format (gzip-compressed):
+    b'MCPATCH1'
+    header:  page_size, old_page_count, new_page_count   (3 x uint32, big-endian)
+    entries: page_number (uint32, 1-based) + page_size bytes, repeated
+    end:     page_number 0
+    trailer: sha256(old) + sha256(new)                    (2 x 32 bytes)
+
+Usage:
+    python3 db_patch.py make OLD.sqlite NEW.sqlite PATCH
+    python3 db_patch.py apply OLD.sqlite PATCH OUTPUT.sqlite
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import struct
+import sys
+from pathlib import Path
+
+from finalize_database import gzip_size
+
+MAGIC = b'MCPATCH1'
+HEADER = struct.Struct('>III')
+PAGE_NUMBER = struct.Struct('>I')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Page-level delta patches between database builds')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    make = commands.add_parser('make', help='Write a patch that turns OLD into NEW')
+    make.add_argument('old', type=str)
+    make.add_argument('new', type=str)
+    make.add_argument('patch', type=str)
+
+    apply = commands.add_parser('apply', help='Apply PATCH to OLD and write OUTPUT')
+    apply.add_argument('old', type=str)
+    apply.add_argument('patch', type=str)
+    apply.add_argument('output', type=str)
+    return parser.parse_args()
+
+
+def read_page_size(path: Path) -> int:
+    """Page size from the SQLite file header (offset 16, big-endian; 1 means 65536)."""
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b'SQLite format 3\x00'):
+        raise ValueError(f"{path} is not a SQLite database")
+    size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def make_patch(old_path: Path, new_path: Path, patch_path: Path) -> dict:
+    """Write the pages of new_path that differ from old_path. Returns a summary."""
+    page_size = read_page_size(old_path)
+    new_page_size = read_page_size(new_path)
+    if page_size != new_page_size:
+        raise ValueError(f"Page sizes differ ({page_size} vs {new_page_size}); "
+                         "rebuild both databases with the same page size")
+
+    old_pages = old_path.stat().st_size // page_size
+    new_pages = new_path.stat().st_size // page_size
+    old_hash = hashlib.sha256()
+    new_hash = hashlib.sha256()
+    changed = 0
+
+    with open(old_path, 'rb') as old, open(new_path, 'rb') as new, \
+            gzip.open(patch_path, 'wb', compresslevel=9) as patch:
+        patch.write(MAGIC)
+        patch.write(HEADER.pack(page_size, old_pages, new_pages))
+        for page_number in range(1, max(old_pages, new_pages) + 1):
+            old_page = old.read(page_size)
+            new_page = new.read(page_size)
+            old_hash.update(old_page)
+            new_hash.update(new_page)
+            if new_page and new_page != old_page:
+                patch.write(PAGE_NUMBER.pack(page_number))
+                patch.write(new_page)
+                changed += 1
+        patch.write(PAGE_NUMBER.pack(0))
+        patch.write(old_hash.digest())
+        patch.write(new_hash.digest())
+
+    return {
+        'page_size': page_size,
+        'old_pages': old_pages,
+        'new_pages': new_pages,
+        'changed_pages': changed,
+        'patch_bytes': patch_path.stat().st_size,
+        'full_gzip_bytes': gzip_size(new_path),
+        'new_sha256': new_hash.hexdigest(),
+    }
+
+
+def file_sha256(path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def apply_patch(old_path: Path, patch_path: Path, output_path: Path):
+    """Rebuild the new database from old_path and a patch, verifying both checksums."""
+    temp_path = output_path.with_name(output_path.name + '.partial')
+    shutil.copyfile(old_path, temp_path)
+    old_digest = file_sha256(old_path)
+
+    try:
+        with gzip.open(patch_path, 'rb') as patch, open(temp_path, 'r+b') as out:
+            if patch.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{patch_path} is not a MovieChain database patch")
+            page_size, old_pages, new_pages = HEADER.unpack(patch.read(HEADER.size))
+            if old_path.stat().st_size != old_pages * page_size:
+                raise ValueError("Patch was made for a different base database (size mismatch)")
+
+            while True:
+                page_number = PAGE_NUMBER.unpack(patch.read(PAGE_NUMBER.size))[0]
+                if page_number == 0:
+                    break
+                page = patch.read(page_size)
+                if len(page) != page_size:
+                    raise ValueError("Patch is truncated")
+                out.seek((page_number - 1) * page_size)
+                out.write(page)
+            out.truncate(new_pages * page_size)
+
+            expected_old = patch.read(32)
+            expected_new = patch.read(32)
+
+        if old_digest != expected_old:
+            raise ValueError("Patch was made for a different base database (checksum mismatch)")
+        if file_sha256(temp_path) != expected_new:
+            raise ValueError("Patched database does not match the expected checksum")
+        os.replace(temp_path, output_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def print_patch_report(summary: dict):
+    mb = 1024 * 1024
+    total = summary['new_pages']
+    pct = summary['changed_pages'] / total * 100 if total else 0.0
+    saved = (1 - summary['patch_bytes'] / summary['full_gzip_bytes']) * 100
+    print(f"  Page size:      {summary['page_size']:,} bytes")
+    print(f"  Pages:          {summary['old_pages']:,} -> {summary['new_pages']:,}")
+    print(f"  Changed pages:  {summary['changed_pages']:,} ({pct:.1f}%)")
+    print(f"  Patch size:     {summary['patch_bytes'] / mb:.2f} MB")
+    print(f"  Full download:  {summary['full_gzip_bytes'] / mb:.2f} MB (gzip -9)")
+    print(f"  Download saved: {saved:.1f}%")
+    print(f"  New SHA-256:    {summary['new_sha256']}")
+
+
+def main():
+    args = parse_args()
+    if args.command == 'make':
+        old, new, patch = Path(args.old), Path(args.new), Path(args.patch)
+        for path in (old, new):
+            if not path.exists():
+                print(f"ERROR: Database not found: {path}")
+                sys.exit(1)
+        print(f"Making patch {old.name} -> {new.name}")
+        print_patch_report(make_patch(old, new, patch))
+    else:
+        old, patch, output = Path(args.old), Path(args.patch), Path(args.output)
+        print(f"Applying {patch.name} to {old.name}")
+        try:
+            apply_patch(old, patch, output)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        print(f"  Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Forecast a MovieChain build from a small sample of the IMDb TSV files.
+
+Reads a few percent of each input in evenly spread blocks, runs the
+builder's own row filters (parse_movie_row, parse_actor_row, parse_cast_row)
+over the sampled rows and scales the results up:
+
+- title.basics, title.principals and title.ratings are all sorted by tconst,
+  so each title.basics block's tconst range is looked up in the other two by
+  binary search. Every sampled cast row is then checked against the
+  sampled movies exactly, as load_movie_actor_links does.
+- name.basics is sampled on its own for the actor filter's pass rate.
+- Row totals scale with file size over bytes per sampled row. Linked movies
+  scale linearly, because principals is sorted by movie. Linked actors
+  recur across movies, so their distinct count can't simply be scaled.
+  It is reported as a range: the GEE estimate (low on long-tailed casts)
+  to the Shlosser estimate (high), capped at the actors loaded. Output
+  size uses the top of the range. With --sample 1 every row is read and
+  linked actors are counted in a HyperLogLog sketch, so memory stays a few
+  KB whatever the dump size.
+
+Bytes per dict entry are measured by building the loaders' structures for
+the sampled rows under tracemalloc. Those sizes give the forecast peak RSS
+of the in-memory build at each worker count. Output size uses bytes per
+movie, actor and link from a previous build (--reference), or per-row
+estimates from the sampled field lengths. The report ends with recommended
+build flags for the available memory.
+
+Usage:
+    python3 estimate_build.py [--data-dir PATH] [--sample 0.02] [--reference OLD.sqlite]
+                              [--memory-available SIZE] [--json PATH]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from build_movie_database import (parse_actor_row, parse_cast_row, parse_movie_row,
+                                  parse_rating_row, parse_size, rank_billing)
+from moviechain_queries import HINT_COUNT
+
+mb = 1024 * 1024
+
+# Share of available memory a build may plan to use
+MEMORY_HEADROOM = 0.7
+
+# Interpreter, modules and SQLite page cache on top of the loaded data
+BASE_RSS = 40 * mb
+
+# Parse stages that can run at once (actors, ratings, movies, links)
+PARSE_STAGES = 4
+
+# Download size relative to the raw database (see DATA_FILES.md)
+GZIP_RATIO = 0.36
+
+# Schema objects whose size grows with each movie / actor / link
+SIZE_GROUPS = {
+    'movie': ('movies', 'genres', 'movie_genres', 'genre_decade_pools', 'movie_hints',
+              'movies_fts'),
+    'actor': ('actors', 'actor_hints', 'actors_fts'),
+    'link': ('movie_actors', 'actor_costars'),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Forecast a MovieChain build from a TSV sample')
+    parser.add_argument('--data-dir', type=str, default=str(Path(__file__).parent.parent),
+                        help='Directory containing IMDb TSV files')
+    parser.add_argument('--sample', type=float, default=0.02,
+                        help='Fraction of each file to read (1 reads everything)')
+    parser.add_argument('--blocks', type=int, default=64,
+                        help='Number of evenly spread blocks the sample is read in')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reference', type=str, default=None,
+                        help='Previous moviechain_core.sqlite to take bytes per row from')
+    parser.add_argument('--memory-available', type=str, default=None,
+                        help='Memory the build may use, e.g. 16G (default: physical RAM)')
+    parser.add_argument('--json', type=str, default=None,
+                        help='Also write the forecast as JSON to this path')
+    return parser.parse_args()
+
+
+class HyperLogLog:
+    """Distinct-count sketch: 2**precision registers, about 1.04 / sqrt(2**precision) error."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            return m * math.log(m / zeros)
+        return estimate
+
+
+def gee_estimate(frequencies: Counter, fraction: float) -> float:
+    """Guaranteed-error estimate of distinct values from a sample's value frequencies."""
+    singletons = sum(1 for count in frequencies.values() if count == 1)
+    return math.sqrt(1 / fraction) * singletons + (len(frequencies) - singletons)
+
+
+def shlosser_estimate(frequencies: Counter, fraction: float) -> float:
+    """Shlosser's estimate of distinct values, for a Bernoulli sample of the given fraction."""
+    counts_of = Counter(frequencies.values())
+    singletons = counts_of.get(1, 0)
+    miss = 1 - fraction
+    numerator = sum(miss ** i * n for i, n in counts_of.items())
+    denominator = sum(i * fraction * miss ** (i - 1) * n for i, n in counts_of.items())
+    return len(frequencies) + singletons * numerator / denominator if denominator else len(frequencies)
+
+
+def tconst_key(line: bytes) -> int:
+    """Numeric part of a line's leading tconst (-1 for the header)."""
+    try:
+        return int(line[2:line.index(b'\t')])
+    except ValueError:
+        return -1
+
+
+def seek_key(f, size: int, key: int):
+    """Position f at the first full line whose tconst is >= key (the file is tconst-sorted)."""
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()
+        line = f.readline()
+        if line and tconst_key(line) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    f.seek(lo)
+    if lo:
+        f.readline()
+
+
+class FileSample:
+    """Lines read from one TSV file and the bytes they took."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.size = path.stat().st_size
+        with open(path, 'rb') as f:
+            self.header = f.readline().decode('utf-8').rstrip('\n').split('\t')
+        self.lines: List[str] = []
+        self.bytes = 0
+
+    def take(self, line: bytes):
+        self.lines.append(line.decode('utf-8').rstrip('\n'))
+        self.bytes += len(line)
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.bytes / self.size) if self.size else 1.0
+
+    @property
+    def total_rows(self) -> float:
+        return len(self.lines) * self.size / self.bytes if self.bytes else 0.0
+
+    def rows(self) -> Iterator[dict]:
+        return csv.DictReader(self.lines, fieldnames=self.header, delimiter='\t')
+
+
+def block_offsets(size: int, blocks: int, block_bytes: int, rng: random.Random) -> List[int]:
+    """Evenly spread, jittered block start offsets."""
+    if block_bytes * blocks >= size:
+        return [0]
+    span = size / blocks
+    return [int(i * span + rng.random() * max(0, span - block_bytes)) for i in range(blocks)]
+
+
+def read_block(f, sample: FileSample, offset: int, block_bytes: int) -> List[bytes]:
+    """Read whole lines starting at offset until block_bytes are consumed."""
+    f.seek(offset)
+    f.readline()  # partial line (or the header at offset 0)
+    lines, read = [], 0
+    while read < block_bytes:
+        line = f.readline()
+        if not line:
+            break
+        lines.append(line)
+        read += len(line)
+        sample.take(line)
+    return lines
+
+
+def sample_inputs(data_dir: Path, fraction: float, blocks: int,
+                  seed: int = 0) -> Dict[str, FileSample]:
+    """Block-sample name.basics and title.basics, and the matching tconst ranges of the others."""
+    rng = random.Random(seed)
+    samples = {name: FileSample(data_dir / f'{name}.tsv') for name in
+               ('title.basics', 'title.principals', 'title.ratings', 'name.basics')}
+
+    names = samples['name.basics']
+    block_bytes = max(4096, int(names.size * fraction / blocks))
+    with open(names.path, 'rb') as f:
+        for offset in block_offsets(names.size, blocks, block_bytes, rng):
+            read_block(f, names, offset, block_bytes)
+
+    basics = samples['title.basics']
+    block_bytes = max(4096, int(basics.size * fraction / blocks))
+    ranged = [samples['title.principals'], samples['title.ratings']]
+    handles = [open(sample.path, 'rb') for sample in ranged]
+    try:
+        with open(basics.path, 'rb') as f:
+            for offset in block_offsets(basics.size, blocks, block_bytes, rng):
+                lines = read_block(f, basics, offset, block_bytes)
+                if not lines:
+                    continue
+                first, last = tconst_key(lines[0]), tconst_key(lines[-1])
+                for sample, handle in zip(ranged, handles):
+                    seek_key(handle, sample.size, first)
+                    for line in iter(handle.readline, b''):
+                        if tconst_key(line) > last:
+                            break
+                        sample.take(line)
+    finally:
+        for handle in handles:
+            handle.close()
+    return samples
+
+
+def traced_bytes(build) -> int:
+    """Bytes still allocated after build() returns its structure."""
+    tracemalloc.start()
+    try:
+        structure = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del structure
+    return size
+
+
+def measure_sample(samples: Dict[str, FileSample], full_scan: bool) -> dict:
+    """Run the build's filters over the sampled rows and size the loaders' structures."""
+    started = time.perf_counter()
+    movies = {}
+    for row in samples['title.basics'].rows():
+        movie = parse_movie_row(row)
+        if movie is not None:
+            movies[movie['tconst']] = (movie['title'], movie['year'], movie['genres'])
+    ratings = {}
+    for row in samples['title.ratings'].rows():
+        parsed = parse_rating_row(row)
+        if parsed is not None:
+            ratings[parsed[0]] = (parsed[1], parsed[2])
+    actors = {}
+    for row in samples['name.basics'].rows():
+        actor = parse_actor_row(row)
+        if actor is not None:
+            actors[actor['nconst']] = (actor['name'], ','.join(actor['known_for']) or None)
+    orderings = defaultdict(dict)
+    cast_rows = 0
+    for row in samples['title.principals'].rows():
+        if row['tconst'] not in movies:
+            continue
+        cast_row = parse_cast_row(row)
+        if cast_row is None:
+            continue
+        cast_rows += 1
+        tconst, nconst, ordering = cast_row
+        cast = orderings[tconst]
+        if nconst not in cast or ordering < cast[nconst]:
+            cast[nconst] = ordering
+    links = {tconst: rank_billing(cast) for tconst, cast in orderings.items()}
+    parse_seconds = time.perf_counter() - started
+
+    linked = HyperLogLog() if full_scan else Counter()
+    for cast in links.values():
+        for nconst in cast:
+            if full_scan:
+                linked.add(nconst)
+            else:
+                linked[nconst] += 1
+
+    link_count = sum(len(cast) for cast in links.values())
+    # Entry sizes of the loaders' dicts, rebuilt from fresh copies of the rows
+    def per_entry(build, entries):
+        return traced_bytes(build) / entries if entries else 0.0
+    copy = lambda value: value if not isinstance(value, str) else (value + '.')[:-1]
+    return {
+        'rows_read': sum(len(sample.lines) for sample in samples.values()),
+        'parse_seconds': parse_seconds,
+        'movies': len(movies),
+        'ratings': len(ratings),
+        'actors': len(actors),
+        'linked_movies': len(links),
+        'links': link_count,
+        'cast_rows': cast_rows,
+        'linked_actors': linked,
+        'bytes_per_entry': {
+            'movies': per_entry(lambda: {copy(k): tuple(copy(v) for v in value)
+                                         for k, value in movies.items()}, len(movies)),
+            'ratings': per_entry(lambda: {copy(k): tuple(value) for k, value in ratings.items()},
+                                 len(ratings)),
+            'actors': per_entry(lambda: {copy(k): tuple(copy(v) for v in value)
+                                         for k, value in actors.items()}, len(actors)),
+            'links': per_entry(lambda: {copy(k): {copy(n): b for n, b in cast.items()}
+                                        for k, cast in links.items()}, link_count),
+            'link_rows': sys.getsizeof((None, None, None)) + 8,
+        },
+        'field_bytes': {
+            'title': sum(len(value[0]) for value in movies.values()) / max(1, len(movies)),
+            'genres': sum(len(value[2]) for value in movies.values()) / max(1, len(movies)),
+            'name': sum(len(value[0]) for value in actors.values()) / max(1, len(actors)),
+            'known_for': sum(len(value[1] or '') for value in actors.values()) / max(1, len(actors)),
+            'genres_per_movie': sum(len([g for g in value[2].split(',') if g])
+                                    for value in movies.values()) / max(1, len(movies)),
+        },
+    }
+
+
+def reference_bytes_per_row(db_path: Path) -> Dict[str, float]:
+    """Bytes per movie, actor and link in an existing build, from dbstat."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        owners = dict(conn.execute('SELECT name, tbl_name FROM sqlite_master'))
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        totals = Counter()
+        for name, pages in conn.execute('SELECT name, COUNT(*) FROM dbstat GROUP BY name'):
+            owner = owners.get(name, name)
+            for group, tables in SIZE_GROUPS.items():
+                if any(owner == table or owner.startswith(table + '_') for table in tables):
+                    totals[group] += pages * page_size
+                    break
+        counts = {
+            'movie': conn.execute('SELECT COUNT(*) FROM movies').fetchone()[0],
+            'actor': conn.execute('SELECT COUNT(*) FROM actors').fetchone()[0],
+            'link': conn.execute('SELECT COUNT(*) FROM movie_actors').fetchone()[0],
+        }
+    finally:
+        conn.close()
+    return {group: totals[group] / counts[group] if counts[group] else 0.0 for group in SIZE_GROUPS}
+
+
+def estimated_bytes_per_row(fields: dict) -> Dict[str, float]:
+    """Bytes per movie, actor and link from field lengths, at about 85% page fill."""
+    fill = 0.85
+    movie = (fields['title'] + fields['genres'] + 10 + 20  # row: tconst, numbers, header
+             + 16                                           # tconst index
+             + 12                                           # (year, votes) index
+             + fields['title'] * 1.5 + 8                    # FTS
+             + fields['genres_per_movie'] * 22              # movie_genres
+             + HINT_COUNT * 24)                             # movie_hints
+    actor = (fields['name'] + fields['known_for'] + 10 + 8
+             + 16
+             + fields['name'] * 1.5 + 8
+             + HINT_COUNT * 24)
+    link = 30 + 26 + 26 + 14  # row, primary key, nconst index, top-billed partial index
+    return {'movie': movie / fill, 'actor': actor / fill, 'link': link / fill}
+
+
+def forecast(samples: Dict[str, FileSample], measured: dict, per_row: Dict[str, float],
+             full_scan: bool) -> dict:
+    """Scale the sample up to the whole dump."""
+    basics, principals = samples['title.basics'], samples['title.principals']
+    names, ratings = samples['name.basics'], samples['title.ratings']
+
+    def scaled(count, sample):
+        return count * sample.size / sample.bytes if sample.bytes else 0.0
+
+    linked = measured['linked_actors']
+    actors_loaded = scaled(measured['actors'], names)
+    if full_scan:
+        low = high = linked.count()
+    elif linked:
+        low = gee_estimate(linked, principals.fraction)
+        high = max(low, shlosser_estimate(linked, principals.fraction))
+    else:
+        low = high = 0.0
+    counts = {
+        'movies': scaled(measured['movies'], basics),
+        'ratings': scaled(measured['ratings'], ratings),
+        'actors_loaded': actors_loaded,
+        'linked_movies': scaled(measured['linked_movies'], principals),
+        'links': scaled(measured['links'], principals),
+        'linked_actors_low': min(low, actors_loaded),
+        'linked_actors': min(high, actors_loaded),
+    }
+    entry = measured['bytes_per_entry']
+    structures = {
+        'movies': counts['movies'] * entry['movies'],
+        'ratings': counts['ratings'] * entry['ratings'],
+        'actors': counts['actors_loaded'] * entry['actors'],
+        'links': counts['links'] * entry['links'],
+    }
+    loaded = sum(structures.values())
+    link_rows = counts['links'] * entry['link_rows']
+
+    # Parent: every structure plus the link rows being inserted. Each parse
+    # worker also holds its own structure while pickling it back (~1.5x).
+    peaks = {}
+    for workers in range(1, PARSE_STAGES + 1):
+        children = 0.0
+        if workers > 1:
+            children = sum(sorted(structures.values(), reverse=True)[:workers]) * 1.5
+        peaks[workers] = BASE_RSS + loaded + link_rows + children
+    partitioned = BASE_RSS + loaded + link_rows + loaded * 1.5
+
+    output = (counts['movies'] * per_row['movie'] + counts['linked_actors'] * per_row['actor']
+              + counts['links'] * per_row['link'])
+
+    total_rows = {name: sample.total_rows for name, sample in samples.items()}
+    rows_per_second = measured['rows_read'] / measured['parse_seconds'] if measured['parse_seconds'] else 0.0
+    parse_seconds = {name: rows / rows_per_second if rows_per_second else 0.0
+                     for name, rows in total_rows.items()}
+    return {
+        'counts': counts,
+        'total_rows': total_rows,
+        'structures_bytes': structures,
+        'peak_rss_bytes': peaks,
+        'peak_rss_partitioned_bytes': partitioned,
+        'output_bytes': output,
+        'gzip_bytes': output * GZIP_RATIO,
+        'build_disk_bytes': output * 2.2,
+        # Sorted runs hold the rows that pass the filters, about as large as their TSV lines
+        'external_sort_bytes': (basics.size * measured['movies'] / max(1, len(basics.lines))
+                                + names.size * measured['actors'] / max(1, len(names.lines))
+                                + principals.size * measured['cast_rows'] / max(1, len(principals.lines))
+                                + ratings.size),
+        'parse_seconds_serial': sum(parse_seconds.values()),
+        'parse_seconds_parallel': max(parse_seconds.values()) if parse_seconds else 0.0,
+    }
+
+
+def recommend(result: dict, available: int, cpus: int) -> dict:
+    """Build flags that fit the forecast into the available memory."""
+    budget = available * MEMORY_HEADROOM
+    fitting = [workers for workers, peak in result['peak_rss_bytes'].items()
+               if peak <= budget and workers <= cpus]
+    if fitting:
+        workers = max(fitting)
+        flags = [f'--workers {workers}']
+        if result['peak_rss_partitioned_bytes'] <= budget and cpus >= 3:
+            flags.append('--partitioned')
+        return {'mode': 'in-memory', 'workers': workers, 'max_memory': None, 'flags': flags}
+    cap = max(16 * mb, int(budget) // (16 * mb) * (16 * mb))
+    return {'mode': 'external', 'workers': cpus, 'max_memory': cap,
+            'flags': [f'--max-memory {cap // mb}M', f'--workers {cpus}']}
+
+
+def available_memory() -> int:
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 8 * 1024 * mb
+
+
+def print_forecast(result: dict, recommendation: dict, available: int, elapsed: float,
+                   sample_fraction: float, reference: Optional[str]):
+    counts = result['counts']
+    print(f"\n  Sampled {sample_fraction * 100:.1f}% of the input in {elapsed:.1f}s "
+          f"(full parse forecast: {result['parse_seconds_serial']:.0f}s serial, "
+          f"{result['parse_seconds_parallel']:.0f}s with parallel parse stages)")
+    print("\n  Rows:")
+    for name, rows in result['total_rows'].items():
+        print(f"    {name + '.tsv':<26} {rows:>14,.0f}")
+    print("\n  Build output:")
+    print(f"    {'movies':<26} {counts['movies']:>14,.0f}")
+    print(f"    {'movies with cast':<26} {counts['linked_movies']:>14,.0f}")
+    if counts['linked_actors_low'] < counts['linked_actors']:
+        print(f"    {'actors (linked)':<26} {counts['linked_actors_low']:>14,.0f} "
+              f"- {counts['linked_actors']:,.0f}")
+    else:
+        print(f"    {'actors (linked)':<26} {counts['linked_actors']:>14,.0f}")
+    print(f"    {'movie-actor links':<26} {counts['links']:>14,.0f}")
+    source = f'bytes per row from {Path(reference).name}' if reference else 'estimated bytes per row'
+    print(f"    {'database':<26} {result['output_bytes'] / mb:>11,.0f} MB  ({source})")
+    print(f"    {'gzip download':<26} {result['gzip_bytes'] / mb:>11,.0f} MB")
+    print(f"    {'disk during build':<26} {result['build_disk_bytes'] / mb:>11,.0f} MB  "
+          f"(+{result['external_sort_bytes'] / mb:,.0f} MB of sort runs with --max-memory)")
+    print("\n  Peak memory of the in-memory build:")
+    for name, size in result['structures_bytes'].items():
+        print(f"    {name + ' dict':<26} {size / mb:>11,.0f} MB")
+    for workers, peak in result['peak_rss_bytes'].items():
+        print(f"    {f'--workers {workers}':<26} {peak / mb:>11,.0f} MB")
+    print(f"    {'--partitioned':<26} {result['peak_rss_partitioned_bytes'] / mb:>11,.0f} MB")
+    print(f"\n  Recommended for {available / mb:,.0f} MB available "
+          f"({MEMORY_HEADROOM:.0%} budget): build_movie_database.py {' '.join(recommendation['flags'])}")
+
+
+def main():
+    args = parse_args()
+    data_dir = Path(args.data_dir)
+    for filename in ('title.basics.tsv', 'title.principals.tsv', 'title.ratings.tsv',
+                     'name.basics.tsv'):
+        if not (data_dir / filename).exists():
+            print(f"ERROR: Missing required file: {filename}")
+            sys.exit(1)
+    if not 0 < args.sample <= 1:
+        print("ERROR: --sample must be in (0, 1]")
+        sys.exit(1)
+    available = parse_size(args.memory_available) if args.memory_available else available_memory()
+
+    print(f"Sampling {data_dir} ({args.sample * 100:g}% in {args.blocks} blocks)...")
+    started = time.perf_counter()
+    full_scan = args.sample >= 1
+    samples = sample_inputs(data_dir, args.sample, 1 if full_scan else args.blocks, args.seed)
+    measured = measure_sample(samples, full_scan)
+    if args.reference:
+        per_row = reference_bytes_per_row(Path(args.reference))
+    else:
+        per_row = estimated_bytes_per_row(measured['field_bytes'])
+    result = forecast(samples, measured, per_row, full_scan)
+    elapsed = time.perf_counter() - started
+    recommendation = recommend(result, available, os.cpu_count() or 1)
+    fraction = sum(s.bytes for s in samples.values()) / sum(s.size for s in samples.values())
+    print_forecast(result, recommendation, available, elapsed, fraction, args.reference)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'sample_fraction': fraction,
+            'elapsed_seconds': elapsed,
+            'bytes_per_row': per_row,
+            'forecast': result,
+            'recommendation': recommendation,
+        }, indent=2), encoding='utf-8')
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Disk-backed sorting and merge joins for memory-bounded builds.
+
+ExternalSorter buffers records until an approximate memory budget is reached,
+then writes the buffer out as a sorted run in a temp file. Iterating the
+sorter merges all runs, so a dataset of any size can be sorted with only one
+buffer plus one read chunk per run in memory. merge_join walks two streams
+sorted on the same key in lockstep, replacing the dict lookups the in-memory
+build uses to join IMDb files.
+"""
+
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Records are pickled in chunks so per-record pickle overhead stays small
+CHUNK_RECORDS = 2_000
+
+
+def key_overhead(key: Any) -> int:
+    """
+    Extra bytes per record while a buffer is sorted: a slot in the buffer and in
+    sort()'s key list, plus the key itself when the key function builds a tuple.
+    """
+    size = 16
+    if isinstance(key, tuple):
+        size += 56 + 8 * len(key) + sum(32 for field in key if isinstance(field, (int, float)))
+    return size
+
+
+def estimate_size(record: tuple) -> int:
+    """Rough in-memory size of a tuple of str/int/float/None fields."""
+    size = 56 + 8 * len(record)
+    for field in record:
+        if isinstance(field, str):
+            size += 49 + len(field)
+        elif field is not None:
+            size += 32
+    return size
+
+
+class ExternalSorter:
+    """
+    Sort an arbitrarily large stream of tuples within a memory budget.
+
+    A sorter that never filled its budget keeps its records in memory while
+    it is read, until close(). When several sorters share one budget, pass
+    keep_in_memory=False and flush() each before filling the next, so only
+    the sorters that are filling hold a buffer.
+    """
+
+    def __init__(self, key: Callable[[tuple], Any], memory_limit: int,
+                 temp_dir: Optional[Path] = None, name: str = 'run',
+                 keep_in_memory: bool = True):
+        self.key = key
+        self.memory_limit = memory_limit
+        self.temp_dir = temp_dir
+        self.name = name
+        self.keep_in_memory = keep_in_memory
+        self.count = 0
+        self.runs: List[str] = []
+        self._buffer: List[tuple] = []
+        self._buffer_bytes = 0
+        self._key_bytes: Optional[int] = None
+        self._finished = False
+
+    def add(self, record: tuple):
+        if self._key_bytes is None:
+            self._key_bytes = key_overhead(self.key(record))
+        self._buffer.append(record)
+        self._buffer_bytes += estimate_size(record) + self._key_bytes
+        self.count += 1
+        if self._buffer_bytes >= self.memory_limit:
+            self._spill()
+
+    def extend(self, records: Iterable[tuple]):
+        for record in records:
+            self.add(record)
+
+    def flush(self):
+        """Write buffered records out as a run now; adding more records is still fine."""
+        if not self._finished:
+            self._spill()
+
+    def _spill(self):
+        """Write the buffer as one sorted run and release it."""
+        if not self._buffer:
+            return
+        self._buffer.sort(key=self.key)
+        fd, path = tempfile.mkstemp(prefix=f'{self.name}-', suffix='.run',
+                                    dir=str(self.temp_dir) if self.temp_dir else None)
+        with os.fdopen(fd, 'wb') as f:
+            for start in range(0, len(self._buffer), CHUNK_RECORDS):
+                pickle.dump(self._buffer[start:start + CHUNK_RECORDS], f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        self.runs.append(path)
+        self._buffer = []
+        self._buffer_bytes = 0
+
+    def _read_run(self, path: str) -> Iterator[tuple]:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Yield all records in key order. May be iterated more than once."""
+        if not self._finished:
+            # Keep a small final buffer in memory when nothing was spilled
+            if self.runs or not self.keep_in_memory:
+                self._spill()
+            else:
+                self._buffer.sort(key=self.key)
+            self._finished = True
+        if not self.runs:
+            return iter(self._buffer)
+        return heapq.merge(*(self._read_run(path) for path in self.runs), key=self.key)
+
+    def close(self):
+        for path in self.runs:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self.runs = []
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def merge_join(left: Iterable[tuple], right: Iterable[tuple],
+               left_key: Callable[[tuple], Any], right_key: Callable[[tuple], Any],
+               keep_unmatched_left: bool = False) -> Iterator[Tuple[Any, List[tuple], List[tuple]]]:
+    """
+    Join two streams that are both sorted by their join key.
+
+    Yields (key, left_group, right_group) for every key present on both
+    sides. With keep_unmatched_left, keys only on the left are yielded too,
+    with an empty right_group (a left outer join).
+    """
+    left_groups = itertools.groupby(left, key=left_key)
+    right_groups = itertools.groupby(right, key=right_key)
+    right_item = next(right_groups, None)
+
+    for lkey, lgroup in left_groups:
+        while right_item is not None and right_item[0] < lkey:
+            right_item = next(right_groups, None)
+        if right_item is not None and right_item[0] == lkey:
+            yield lkey, list(lgroup), list(right_item[1])
+            right_item = next(right_groups, None)
+        elif keep_unmatched_left:
+            yield lkey, list(lgroup), []
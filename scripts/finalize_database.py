@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Write a read-optimized copy of a MovieChain SQLite database.
+
+The build scripts insert rows, FTS entries and indexes in whatever order the
+TSV files arrive, so the working database is fragmented, has no planner
+statistics and carries one FTS segment per flush. This step:
+
+1. Merges each FTS5 index into a single segment ('optimize')
+2. Applies an optional storage profile (see storage_profile.py)
+3. Runs ANALYZE so sqlite_stat1 ships with the database
+4. Writes a compacted copy with VACUUM INTO (the source is left in place,
+   so only the final size is needed on disk rather than twice the source)
+5. Resets the copy's header to rollback-journal mode so it can be opened
+   read-only without -wal/-shm side files
+
+It then reports how query latency and gzip size changed. compress_database
+writes the .gz the app bundles (build_movie_database.py runs it as the
+'compress' stage).
+
+Usage:
+    python3 finalize_database.py SOURCE.sqlite OUTPUT.sqlite [--page-size N]
+                                 [--storage-profile PROFILE.json]
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+from build_stats import BuildReport
+from moviechain_queries import print_latency_comparison, sample_workload, time_queries
+from storage_profile import apply_storage_profile, describe_profile, load_profile, validate_profile
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Write a read-optimized copy of a MovieChain database')
+    parser.add_argument('source', type=str, help='Database produced by the build')
+    parser.add_argument('output', type=str, help='Path for the finalized copy')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='Page size for the finalized copy (default: keep the source page size)')
+    parser.add_argument('--storage-profile', type=str, default=None,
+                        help='Storage profile JSON (e.g. from tune_storage.py) to apply')
+    parser.add_argument('--skip-report', action='store_true',
+                        help='Skip the latency and gzip size comparison')
+    return parser.parse_args()
+
+
+def gzip_size(path: Path, level: int = 9) -> int:
+    """Return the size the file would have as a .gz, without writing it."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    total = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            total += len(compressor.compress(chunk))
+    total += len(compressor.flush())
+    return total
+
+
+def compress_database(path: Path, level: int = 9,
+                      build_report: Optional[BuildReport] = None) -> Path:
+    """
+    Write path + '.gz' for the app bundle and return its path.
+
+    The header carries no name or timestamp, so rebuilding the same database
+    produces the same bytes. The .gz is written beside and renamed into
+    place, so an interrupted run never leaves a truncated download.
+    """
+    build_report = build_report or BuildReport('compress_database')
+    gz_path = path.with_name(path.name + '.gz')
+    temp_path = gz_path.with_name(gz_path.name + '.tmp')
+    print(f"Compressing {path.name} -> {gz_path.name} (gzip -{level})...")
+    with build_report.stage('compress'):
+        with open(path, 'rb') as source, open(temp_path, 'wb') as raw:
+            with gzip.GzipFile(filename='', mode='wb', compresslevel=level, fileobj=raw,
+                               mtime=0) as out:
+                shutil.copyfileobj(source, out, 1024 * 1024)
+        os.replace(temp_path, gz_path)
+    mb = 1024 * 1024
+    print(f"  {path.stat().st_size / mb:.1f} MB -> {gz_path.stat().st_size / mb:.1f} MB")
+    return gz_path
+
+
+def fts_tables(conn: sqlite3.Connection) -> List[str]:
+    """Names of all FTS5 virtual tables in the database."""
+    cursor = conn.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%USING fts5%'
+        ORDER BY name
+    ''')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def finalize_database(source_path: Path, output_path: Path,
+                      page_size: Optional[int] = None, report: bool = True,
+                      build_report: Optional[BuildReport] = None,
+                      storage: Optional[dict] = None) -> dict:
+    """
+    Optimize FTS, ANALYZE and VACUUM INTO a fresh read-only-friendly copy.
+
+    A storage profile changes the source in place before the copy (known_for,
+    column order); its page_size wins over the page_size argument.
+    Returns a summary dict with sizes (and latencies when report is set).
+    """
+    print(f"Finalizing database: {source_path} -> {output_path}")
+    build_report = build_report or BuildReport('finalize_database')
+    summary = {'source_bytes': source_path.stat().st_size}
+
+    workload = None
+    if report:
+        conn = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+        workload = sample_workload(conn)
+        conn.close()
+        print("  Timing queries on the build output...")
+        summary['latency_before'] = time_queries(source_path, workload)
+        summary['source_gzip_bytes'] = gzip_size(source_path)
+
+    conn = sqlite3.connect(str(source_path))
+    try:
+        with build_report.stage('fts_optimize'):
+            for table in fts_tables(conn):
+                print(f"  Merging FTS segments in {table}...")
+                conn.execute(f"INSERT INTO {table}({table}) VALUES('optimize')")
+            conn.commit()
+
+        if storage:
+            storage = validate_profile(storage)
+            print(f"  Applying storage profile ({describe_profile(storage)})...")
+            with build_report.stage('storage_profile'):
+                apply_storage_profile(conn, storage)
+
+        print("  Running ANALYZE...")
+        with build_report.stage('analyze'):
+            conn.execute('ANALYZE')
+            conn.commit()
+
+        if page_size and not (storage and storage['page_size']):
+            conn.execute(f'PRAGMA page_size = {int(page_size)}')
+
+        if output_path.exists():
+            output_path.unlink()
+        print("  Writing compacted copy (VACUUM INTO)...")
+        with build_report.stage('vacuum'):
+            conn.execute('VACUUM INTO ?', (str(output_path),))
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(str(output_path))
+    try:
+        conn.execute('PRAGMA journal_mode = DELETE')
+        check = conn.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            raise RuntimeError(f"quick_check failed on {output_path}: {check}")
+    finally:
+        conn.close()
+
+    summary['output_bytes'] = output_path.stat().st_size
+
+    if report:
+        print("  Timing queries on the finalized copy...")
+        summary['latency_after'] = time_queries(output_path, workload)
+        summary['output_gzip_bytes'] = gzip_size(output_path)
+        print_finalize_report(summary)
+    else:
+        size_mb = summary['output_bytes'] / (1024 * 1024)
+        print(f"  Finalized size: {size_mb:.1f} MB")
+
+    return summary
+
+
+def print_finalize_report(summary: dict):
+    """Print size and latency changes from finalize_database."""
+    mb = 1024 * 1024
+    print("\n  Size:")
+    print(f"    Raw:  {summary['source_bytes'] / mb:.1f} MB -> {summary['output_bytes'] / mb:.1f} MB")
+    print(f"    Gzip: {summary['source_gzip_bytes'] / mb:.1f} MB -> {summary['output_gzip_bytes'] / mb:.1f} MB")
+    print("\n  Query latency (mean / p95):")
+    print_latency_comparison(summary['latency_before'], summary['latency_after'],
+                             before_label='build', after_label='final')
+
+
+def main():
+    args = parse_args()
+    source = Path(args.source)
+    output = Path(args.output)
+    if not source.exists():
+        print(f"ERROR: Database not found: {source}")
+        sys.exit(1)
+    if source.resolve() == output.resolve():
+        print("ERROR: Output must be a different file than the source")
+        sys.exit(1)
+    storage = None
+    if args.storage_profile:
+        try:
+            storage = load_profile(Path(args.storage_profile))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Could not load storage profile: {e}")
+            sys.exit(1)
+    finalize_database(source, output, page_size=args.page_size, report=not args.skip_report,
+                      storage=storage)
+
+
+if __name__ == '__main__':
+    main()
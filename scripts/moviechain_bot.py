@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+A MovieChain opponent that plays against a built database, and a self-play
+simulator for balance testing.
+
+The game alternates movie -> actor -> movie; nothing can be used twice, and
+a player who can't name a valid next link breaks the chain. The bot picks
+the move that leaves the opponent most likely to be stuck.
+
+Players are modelled as knowing a movie or actor with probability
+familiarity / (familiarity + rank), where rank is its popularity rank
+(votes for movies, summed votes of their films for actors). The chance a
+player is stuck at a node is then the product of (1 - p) over its unused
+neighbours. The log of that product over all neighbours is precomputed per
+node, so with a chain of n links it is an O(n) correction rather than an
+O(degree) scan, which keeps high-degree actors as cheap as anyone else.
+
+The graph is held in memory as two CSR arrays (offsets, neighbours) with
+nodes numbered by popularity rank, so every neighbour list is already in
+best-known-first order. Moves come from the first SCAN_LIMIT neighbours the
+player knows, and the lookahead expands the best beam of them: the
+opponent answers with the best-known neighbour they know, then the bot
+replies, down to --depth bot moves.
+
+Usage:
+    python3 moviechain_bot.py DB move ID [ID ...] [--depth N] [--beam N]
+    python3 moviechain_bot.py DB selfplay [--games N] [--depth N] [--opponent-depth N] [--json]
+"""
+
+import argparse
+import json
+import math
+import random
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from moviechain_queries import TOP_BILLED_CAST, percentile
+
+FAMILIARITY = 2000
+SCAN_LIMIT = 256
+START_MOVIES = 1000
+MAX_CHAIN = 100
+# Cap on p so the best-known node still has a finite log(1 - p)
+MAX_KNOWN = 0.999
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Play MovieChain against a built database')
+    parser.add_argument('db', type=str, help='Database to play against')
+    parser.add_argument('--top-billed', action='store_true',
+                        help=f'Only link actors billed in the top {TOP_BILLED_CAST}')
+    parser.add_argument('--familiarity', type=int, default=FAMILIARITY,
+                        help='Popularity rank a typical player knows half the time')
+    parser.add_argument('--depth', type=int, default=2, help='Bot moves to look ahead')
+    parser.add_argument('--beam', type=int, default=6, help='Moves expanded per turn')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    move = commands.add_parser('move', help='Suggest the next link for a chain of IMDb IDs')
+    move.add_argument('chain', type=str, nargs='+')
+
+    selfplay = commands.add_parser('selfplay', help='Play bot against bot and time the moves')
+    selfplay.add_argument('--games', type=int, default=200)
+    selfplay.add_argument('--opponent-depth', type=int, default=0,
+                          help='Lookahead of the second bot (0 = best-known move)')
+    selfplay.add_argument('--seed', type=int, default=0)
+    selfplay.add_argument('--json', action='store_true', help='Print the results as JSON')
+    return parser.parse_args()
+
+
+def known_probability(rank: int, familiarity: int) -> float:
+    return min(MAX_KNOWN, familiarity / (familiarity + rank))
+
+
+def knows(seed: int, node: int, probability: float) -> bool:
+    """Deterministic per-(player, node) coin flip, so knowledge needs no storage."""
+    x = (seed * 0x9E3779B97F4A7C15 + node * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 31)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return (x >> 11) / float(1 << 53) < probability
+
+
+class ChainGraph:
+    """The movie/actor graph in CSR arrays, numbered by popularity rank."""
+
+    def __init__(self, conn: sqlite3.Connection, familiarity: int = FAMILIARITY,
+                 top_billed: bool = False):
+        self.familiarity = familiarity
+        link_filter = f'WHERE ma.billing <= {TOP_BILLED_CAST}' if top_billed else ''
+        self.keys: List[str] = [row[0] for row in conn.execute(
+            'SELECT tconst FROM movies ORDER BY COALESCE(votes, 0) DESC, tconst')]
+        self.movie_count = len(self.keys)
+        self.keys += [row[0] for row in conn.execute(f'''
+            SELECT ma.nconst FROM movie_actors ma JOIN movies m ON m.tconst = ma.tconst
+            {link_filter}
+            GROUP BY ma.nconst ORDER BY SUM(COALESCE(m.votes, 0)) DESC, ma.nconst
+        ''')]
+        self.index = {key: node for node, key in enumerate(self.keys)}
+
+        sources, targets = array('i'), array('i')
+        degree = array('i', bytes(4 * len(self.keys)))
+        for tconst, nconst in conn.execute(f'SELECT ma.tconst, ma.nconst FROM movie_actors ma {link_filter}'):
+            movie, actor = self.index[tconst], self.index[nconst]
+            sources.append(movie)
+            targets.append(actor)
+            degree[movie] += 1
+            degree[actor] += 1
+        self.degree = degree
+
+        self.offsets = array('l', [0]) * (len(self.keys) + 1)
+        for node, count in enumerate(degree):
+            self.offsets[node + 1] = self.offsets[node] + count
+        fill = array('l', self.offsets[:-1])
+        self.neighbours = array('i', bytes(4 * self.offsets[-1]))
+        for movie, actor in zip(sources, targets):
+            self.neighbours[fill[movie]] = actor
+            self.neighbours[fill[actor]] = movie
+            fill[movie] += 1
+            fill[actor] += 1
+        del sources, targets, fill
+        for node in range(len(self.keys)):
+            first, end = self.offsets[node], self.offsets[node + 1]
+            if end - first > 1:
+                self.neighbours[first:end] = array('i', sorted(self.neighbours[first:end]))
+
+        # log(1 - p) per node, and its sum over each node's neighbours
+        self.log_unknown = array('d', (math.log(1 - self.known(node, familiarity))
+                                       for node in range(len(self.keys))))
+        self.log_stuck = array('d', bytes(8 * len(self.keys)))
+        for node in range(len(self.keys)):
+            self.log_stuck[node] = math.fsum(
+                self.log_unknown[n] for n in self.neighbours[self.offsets[node]:self.offsets[node + 1]])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def link_count(self) -> int:
+        return self.offsets[-1] // 2
+
+    def is_movie(self, node: int) -> bool:
+        return node < self.movie_count
+
+    def rank(self, node: int) -> int:
+        return node if node < self.movie_count else node - self.movie_count
+
+    def known(self, node: int, familiarity: int) -> float:
+        return known_probability(self.rank(node), familiarity)
+
+    def adjacent(self, node: int, other: int) -> bool:
+        first, end = self.offsets[node], self.offsets[node + 1]
+        position = bisect_left(self.neighbours, other, first, end)
+        return position < end and self.neighbours[position] == other
+
+    def stuck_probability(self, node: int, used: Set[int]) -> float:
+        """Chance a typical player knows none of node's unused neighbours."""
+        log_stuck = self.log_stuck[node]
+        for other in used:
+            if self.adjacent(node, other):
+                log_stuck -= self.log_unknown[other]
+        return math.exp(min(0.0, log_stuck))
+
+    def moves(self, node: int, used: Set[int], seed: int, familiarity: Optional[int],
+              limit: int) -> List[int]:
+        """
+        Up to limit unused neighbours of node the player knows, best-known first.
+
+        Only the first SCAN_LIMIT neighbours are considered; familiarity None
+        knows all of them.
+        """
+        result = []
+        first = self.offsets[node]
+        end = min(self.offsets[node + 1], first + SCAN_LIMIT)
+        for other in self.neighbours[first:end]:
+            if other in used:
+                continue
+            if familiarity is None or knows(seed, other, self.known(other, familiarity)):
+                result.append(other)
+                if len(result) >= limit:
+                    break
+        return result
+
+
+class MovieChainBot:
+    """Picks the link that leaves the opponent most likely to be stuck."""
+
+    def __init__(self, graph: ChainGraph, depth: int = 2, beam: int = 6,
+                 familiarity: Optional[int] = None):
+        self.graph = graph
+        self.depth = depth
+        self.beam = beam
+        self.familiarity = familiarity
+
+    def choose(self, node: int, used: Set[int], seed: int = 0) -> Tuple[Optional[int], float]:
+        """(move, estimated chance of winning); move is None when the bot is stuck."""
+        moves = self.graph.moves(node, used, seed, self.familiarity, self.beam)
+        if not moves:
+            return None, 0.0
+        if self.depth <= 0:
+            return moves[0], 0.5
+        return max(((move, self._value(move, used, self.depth, seed)) for move in moves),
+                   key=lambda scored: scored[1])
+
+    def _value(self, move: int, used: Set[int], depth: int, seed: int) -> float:
+        """Chance the bot wins after playing move, looking depth bot moves ahead."""
+        graph = self.graph
+        used.add(move)
+        stuck = graph.stuck_probability(move, used)
+        if depth <= 1 or stuck >= 1.0:
+            value = stuck + (1 - stuck) * 0.5
+        else:
+            # The opponent names the best-known neighbour they know
+            expected, weight, none_known = 0.0, 0.0, 1.0
+            for answer in graph.moves(move, used, seed, None, self.beam):
+                known = graph.known(answer, graph.familiarity)
+                chance = none_known * known
+                none_known *= 1 - known
+                used.add(answer)
+                replies = graph.moves(answer, used, seed, self.familiarity, self.beam)
+                best = max((self._value(reply, used, depth - 1, seed) for reply in replies),
+                           default=0.0)
+                used.discard(answer)
+                expected += chance * best
+                weight += chance
+            value = stuck + (1 - stuck) * (expected / weight if weight else 0.5)
+        used.discard(move)
+        return value
+
+
+def play_game(graph: ChainGraph, bots: Tuple[MovieChainBot, MovieChainBot], start: int,
+              seed: int, move_times: Tuple[List[float], List[float]],
+              max_chain: int = MAX_CHAIN) -> Tuple[Optional[int], int]:
+    """
+    Play one game from start, with bots[0] having picked it.
+
+    Each bot knows its own random share of the graph for the game. Returns
+    (winner or None for a draw at max_chain, chain length).
+    """
+    used = {start}
+    node, turn = start, 1
+    while len(used) < max_chain:
+        started = time.perf_counter()
+        move, _ = bots[turn].choose(node, used, seed * 2 + turn)
+        move_times[turn].append((time.perf_counter() - started) * 1000)
+        if move is None:
+            return 1 - turn, len(used)
+        used.add(move)
+        node, turn = move, 1 - turn
+    return None, len(used)
+
+
+def self_play(graph: ChainGraph, bots: Tuple[MovieChainBot, MovieChainBot], games: int,
+              seed: int = 0) -> dict:
+    """Play games from popular starting movies, alternating which bot starts."""
+    rng = random.Random(seed)
+    starts = range(min(START_MOVIES, graph.movie_count))
+    move_times: Tuple[List[float], List[float]] = ([], [])
+    wins, draws, lengths = [0, 0], 0, []
+    started = time.perf_counter()
+    for game in range(games):
+        first = game % 2
+        order = bots if first == 0 else (bots[1], bots[0])
+        times = move_times if first == 0 else (move_times[1], move_times[0])
+        winner, length = play_game(graph, order, rng.choice(starts), seed * games + game, times)
+        lengths.append(length)
+        if winner is None:
+            draws += 1
+        else:
+            wins[winner if first == 0 else 1 - winner] += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'games': games,
+        'seconds': elapsed,
+        'games_per_sec': games / elapsed if elapsed else 0.0,
+        'draws': draws,
+        'mean_chain': sum(lengths) / len(lengths) if lengths else 0.0,
+        'bots': [{
+            'depth': bot.depth,
+            'wins': wins[number],
+            'moves': len(move_times[number]),
+            'p50_ms': percentile(move_times[number], 50),
+            'p95_ms': percentile(move_times[number], 95),
+            'p99_ms': percentile(move_times[number], 99),
+            'max_ms': max(move_times[number], default=0.0),
+        } for number, bot in enumerate(bots)],
+    }
+
+
+def print_self_play(results: dict):
+    print(f"\n  {results['games']} games in {results['seconds']:.2f}s "
+          f"({results['games_per_sec']:.1f} games/s), mean chain {results['mean_chain']:.1f} links, "
+          f"{results['draws']} draws")
+    print(f"  {'bot':<12} {'wins':>6} {'moves':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for bot in results['bots']:
+        print(f"  {'depth ' + str(bot['depth']):<12} {bot['wins']:>6} {bot['moves']:>8,} "
+              f"{bot['p50_ms']:>8.3f} {bot['p95_ms']:>8.3f} {bot['p99_ms']:>8.3f} "
+              f"{bot['max_ms']:>8.3f}")
+
+
+def main():
+    args = parse_args()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    graph = ChainGraph(conn, args.familiarity, args.top_billed)
+    conn.close()
+    load_seconds = time.perf_counter() - started
+    if not (args.command == 'selfplay' and args.json):
+        print(f"Loaded {graph.movie_count:,} movies, {len(graph) - graph.movie_count:,} actors, "
+              f"{graph.link_count:,} links in {load_seconds:.1f}s "
+              f"(max degree {max(graph.degree, default=0):,})")
+
+    if args.command == 'move':
+        missing = [key for key in args.chain if key not in graph.index]
+        if missing:
+            print(f"ERROR: Not in the database: {', '.join(missing)}")
+            sys.exit(1)
+        chain = [graph.index[key] for key in args.chain]
+        for previous, current in zip(chain, chain[1:]):
+            if not graph.adjacent(previous, current):
+                print(f"ERROR: {graph.keys[previous]} and {graph.keys[current]} are not linked")
+                sys.exit(1)
+        bot = MovieChainBot(graph, args.depth, args.beam)
+        started = time.perf_counter()
+        move, value = bot.choose(chain[-1], set(chain))
+        elapsed = (time.perf_counter() - started) * 1000
+        if move is None:
+            print(f"  No unused link from {args.chain[-1]}")
+        else:
+            print(f"  {graph.keys[move]} (win chance {value * 100:.0f}%, "
+                  f"opponent stuck {graph.stuck_probability(move, set(chain) | {move}) * 100:.0f}%, "
+                  f"{elapsed:.2f} ms)")
+    else:
+        bots = (MovieChainBot(graph, args.depth, args.beam, args.familiarity),
+                MovieChainBot(graph, args.opponent_depth, args.beam, args.familiarity))
+        results = self_play(graph, bots, args.games, args.seed)
+        results['load_seconds'] = load_seconds
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_self_play(results)
+
+
+if __name__ == '__main__':
+    main()
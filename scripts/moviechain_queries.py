@@ -0,0 +1,430 @@
+"""
+MovieChain query workload shared by the database build tools.
+
+The SQL in APP_QUERIES mirrors the statements issued by
+MovieChainDatabase.swift, so build scripts can time a database the same way
+the app reads it. A workload is a list of parameter dicts sampled from the
+database itself; sample it once and reuse it when comparing two builds.
+"""
+
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Cast members at or above this billing position count as the "main cast".
+# title.principals lists at most about 10 people per title, so a larger value
+# would select nearly every link. build_movie_database.py creates a partial
+# index WHERE billing <= this value, and SQLite only uses a partial index
+# when the query repeats the same literal.
+TOP_BILLED_CAST = 3
+
+# Cast members per movie and films per actor in movie_hints / actor_hints
+HINT_COUNT = 5
+
+# genre_decade_pools rows with genre_id / decade 0 pool over all genres / decades
+ANY_GENRE = 0
+ANY_DECADE = 0
+
+
+# Named parameters used below:
+#   :movie / :actor              - tconst / nconst of a linked movie and actor
+#   :movie_query / :actor_query  - FTS5 prefix queries (e.g. '"Matr"*')
+APP_QUERIES = {
+    'search_movies': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        JOIN movies_fts fts ON m.rowid = fts.rowid
+        WHERE movies_fts MATCH :movie_query
+        ORDER BY m.votes DESC
+        LIMIT 10
+    ''',
+    'get_movie': '''
+        SELECT tconst, title, year, genres, rating, votes FROM movies WHERE tconst = :movie
+    ''',
+    'starting_movies': '''
+        SELECT tconst, title, year, genres, rating, votes
+        FROM movies
+        ORDER BY votes DESC
+        LIMIT 1000
+    ''',
+    'search_actors': '''
+        SELECT a.nconst, a.name, a.known_for
+        FROM actors a
+        JOIN actors_fts fts ON a.rowid = fts.rowid
+        WHERE actors_fts MATCH :actor_query
+        LIMIT 10
+    ''',
+    'get_actor': '''
+        SELECT nconst, name, known_for FROM actors WHERE nconst = :actor
+    ''',
+    'is_actor_in_movie': '''
+        SELECT 1 FROM movie_actors WHERE tconst = :movie AND nconst = :actor LIMIT 1
+    ''',
+    'actors_in_movie': '''
+        SELECT a.nconst, a.name, a.known_for
+        FROM actors a
+        JOIN movie_actors ma ON a.nconst = ma.nconst
+        WHERE ma.tconst = :movie
+    ''',
+    'movies_with_actor': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        JOIN movie_actors ma ON m.tconst = ma.tconst
+        WHERE ma.nconst = :actor
+        ORDER BY m.votes DESC
+    ''',
+    'search_actors_in_movie': '''
+        SELECT a.nconst, a.name, a.known_for
+        FROM actors a
+        JOIN actors_fts fts ON a.rowid = fts.rowid
+        JOIN movie_actors ma ON a.nconst = ma.nconst
+        WHERE actors_fts MATCH :actor_query AND ma.tconst = :movie
+        LIMIT 10
+    ''',
+    'search_movies_with_actor': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        JOIN movies_fts fts ON m.rowid = fts.rowid
+        JOIN movie_actors ma ON m.tconst = ma.tconst
+        WHERE movies_fts MATCH :movie_query AND ma.nconst = :actor
+        ORDER BY m.votes DESC
+        LIMIT 10
+    ''',
+}
+
+
+# Main-cast variants of the cast listings, served by the movie_actors primary key
+# and the top-billed partial index. Each maps to the APP_QUERIES entry it replaces.
+TOP_BILLED_QUERIES = {
+    'top_cast_in_movie': f'''
+        SELECT a.nconst, a.name, a.known_for
+        FROM movie_actors ma
+        JOIN actors a ON a.nconst = ma.nconst
+        WHERE ma.tconst = :movie AND ma.billing <= {TOP_BILLED_CAST}
+        ORDER BY ma.billing
+    ''',
+    'top_billed_movies_with_actor': f'''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movie_actors ma
+        JOIN movies m ON m.tconst = ma.tconst
+        WHERE ma.nconst = :actor AND ma.billing <= {TOP_BILLED_CAST}
+        ORDER BY m.votes DESC
+    ''',
+}
+
+TOP_BILLED_EQUIVALENTS = {
+    'top_cast_in_movie': 'actors_in_movie',
+    'top_billed_movies_with_actor': 'movies_with_actor',
+}
+
+
+# Genre/decade-filtered queries for themed modes, served by the genres,
+# movie_genres and genre_decade_pools tables. FACET_EQUIVALENTS maps each to
+# the LIKE scan over movies.genres it replaces (see LIKE_FILTER_QUERIES).
+#   :genre  - genre name (e.g. 'Horror')
+#   :decade - first year of a decade (e.g. 1980)
+FACET_QUERIES = {
+    'filtered_starting_movies': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM genre_decade_pools p
+        JOIN movies m ON m.tconst = p.tconst
+        WHERE p.genre_id = (SELECT genre_id FROM genres WHERE name = :genre)
+          AND p.decade = :decade
+        ORDER BY p.rank
+        LIMIT 100
+    ''',
+    'genre_decade_movies': '''
+        SELECT tconst, year, votes
+        FROM movie_genres
+        WHERE genre_id = (SELECT genre_id FROM genres WHERE name = :genre)
+          AND decade = :decade
+        ORDER BY votes DESC
+        LIMIT 500
+    ''',
+    'genre_movies_with_actor': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        JOIN movie_actors ma ON m.tconst = ma.tconst
+        WHERE ma.nconst = :actor
+          AND m.genre_mask & (SELECT bit FROM genres WHERE name = :genre)
+        ORDER BY m.votes DESC
+    ''',
+}
+
+LIKE_FILTER_QUERIES = {
+    'like_starting_movies': '''
+        SELECT tconst, title, year, genres, rating, votes
+        FROM movies
+        WHERE genres LIKE '%' || :genre || '%'
+          AND year >= :decade AND year < :decade + 10 AND votes > 0
+        ORDER BY votes DESC
+        LIMIT 100
+    ''',
+    'like_decade_movies': '''
+        SELECT tconst, year, votes
+        FROM movies
+        WHERE genres LIKE '%' || :genre || '%'
+          AND year >= :decade AND year < :decade + 10
+        ORDER BY votes DESC
+        LIMIT 500
+    ''',
+    'like_movies_with_actor': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        JOIN movie_actors ma ON m.tconst = ma.tconst
+        WHERE ma.nconst = :actor AND m.genres LIKE '%' || :genre || '%'
+        ORDER BY m.votes DESC
+    ''',
+}
+
+FACET_EQUIVALENTS = {
+    'filtered_starting_movies': 'like_starting_movies',
+    'genre_decade_movies': 'like_decade_movies',
+    'genre_movies_with_actor': 'like_movies_with_actor',
+}
+
+
+# Co-star lookups served by the actor_costars table, which only covers actors
+# above the build's popularity threshold; the app falls back to the self-join
+# in SELF_JOIN_QUERIES for anyone else. COSTAR_EQUIVALENTS maps each to the
+# self-join it replaces.
+#   :co_actor - another actor from the same movie as :actor
+COSTAR_QUERIES = {
+    'costars_of_actor': '''
+        SELECT c.co_nconst, a.name, c.shared_films, c.best_tconst
+        FROM actor_costars c
+        JOIN actors a ON a.nconst = c.co_nconst
+        WHERE c.nconst = :actor
+        ORDER BY c.shared_films DESC
+        LIMIT 50
+    ''',
+    'costar_shared_film': '''
+        SELECT shared_films, best_tconst
+        FROM actor_costars
+        WHERE nconst = :actor AND co_nconst = :co_actor
+    ''',
+}
+
+SELF_JOIN_QUERIES = {
+    'self_join_costars': '''
+        SELECT other.nconst, a.name, COUNT(*) AS shared_films
+        FROM movie_actors ma
+        JOIN movie_actors other ON other.tconst = ma.tconst AND other.nconst != ma.nconst
+        JOIN actors a ON a.nconst = other.nconst
+        WHERE ma.nconst = :actor
+        GROUP BY other.nconst
+        ORDER BY shared_films DESC
+        LIMIT 50
+    ''',
+    'self_join_shared_film': '''
+        SELECT COUNT(*), MAX(m.votes)
+        FROM movie_actors ma
+        JOIN movie_actors other ON other.tconst = ma.tconst
+        JOIN movies m ON m.tconst = ma.tconst
+        WHERE ma.nconst = :actor AND other.nconst = :co_actor
+    ''',
+}
+
+COSTAR_EQUIVALENTS = {
+    'costars_of_actor': 'self_join_costars',
+    'costar_shared_film': 'self_join_shared_film',
+}
+
+
+# Hints for a stuck player, read from the precomputed movie_hints and
+# actor_hints lists. HINT_EQUIVALENTS maps each to the live ranking over the
+# full cast or filmography it replaces (see LIVE_HINT_QUERIES).
+HINT_QUERIES = {
+    'movie_hint': '''
+        SELECT a.nconst, a.name
+        FROM movie_hints h
+        JOIN actors a ON a.nconst = h.nconst
+        WHERE h.tconst = :movie
+        ORDER BY h.rank
+    ''',
+    'actor_hint': '''
+        SELECT m.tconst, m.title, m.year
+        FROM actor_hints h
+        JOIN movies m ON m.tconst = h.tconst
+        WHERE h.nconst = :actor
+        ORDER BY h.rank
+    ''',
+}
+
+LIVE_HINT_QUERIES = {
+    'live_movie_hint': f'''
+        SELECT a.nconst, a.name
+        FROM movie_actors ma
+        JOIN actors a ON a.nconst = ma.nconst
+        WHERE ma.tconst = :movie
+        ORDER BY INSTR(',' || COALESCE(a.known_for, '') || ',', ',' || ma.tconst || ',') > 0 DESC,
+                 ma.billing,
+                 (SELECT SUM(COALESCE(m.votes, 0)) FROM movie_actors f
+                  JOIN movies m ON m.tconst = f.tconst WHERE f.nconst = ma.nconst) DESC
+        LIMIT {HINT_COUNT}
+    ''',
+    'live_actor_hint': f'''
+        SELECT m.tconst, m.title, m.year
+        FROM movie_actors ma
+        JOIN movies m ON m.tconst = ma.tconst
+        JOIN actors a ON a.nconst = ma.nconst
+        WHERE ma.nconst = :actor
+        ORDER BY INSTR(',' || COALESCE(a.known_for, '') || ',', ',' || ma.tconst || ',') > 0 DESC,
+                 m.votes DESC, ma.billing
+        LIMIT {HINT_COUNT}
+    ''',
+}
+
+HINT_EQUIVALENTS = {
+    'movie_hint': 'live_movie_hint',
+    'actor_hint': 'live_actor_hint',
+}
+
+
+# Title search over primary titles and, when the build has --aliases,
+# original and regional titles, resolved to movies in one query. Each maps to
+# the primary-title-only APP_QUERIES entry.
+ALIAS_QUERIES = {
+    'search_movies_any_title': '''
+        SELECT m.tconst, m.title, m.year, m.genres, m.rating, m.votes
+        FROM movies m
+        WHERE m.rowid IN (
+            SELECT rowid FROM movies_fts WHERE movies_fts MATCH :movie_query
+            UNION
+            SELECT am.rowid
+            FROM aliases_fts
+            JOIN movie_aliases a ON a.alias_id = aliases_fts.rowid
+            JOIN movies am ON am.tconst = a.tconst
+            WHERE aliases_fts MATCH :movie_query
+        )
+        ORDER BY m.votes DESC
+        LIMIT 10
+    ''',
+}
+
+ALIAS_EQUIVALENTS = {
+    'search_movies_any_title': 'search_movies',
+}
+
+
+def fts_prefix_query(text: str, length: int = 4) -> Optional[str]:
+    """Turn the first word of a title or name into a quoted FTS5 prefix query."""
+    words = text.split()
+    if not words:
+        return None
+    prefix = words[0][:length].replace('"', '""')
+    return f'"{prefix}"*'
+
+
+def typed_fts_query(text: str) -> Optional[str]:
+    """The FTS5 query the app builds from a search box: every word as a prefix."""
+    words = text.split()
+    if not words:
+        return None
+    return ' '.join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def sample_workload(conn: sqlite3.Connection, size: int = 200,
+                    seed: int = 0) -> List[Dict[str, str]]:
+    """
+    Pick movie/actor pairs to drive APP_QUERIES.
+
+    Pairs are drawn from the most-voted movies, since those are the ones
+    players actually chain through. Each entry also carries the movie's first
+    genre and its decade for FACET_QUERIES ('' and 0 when unknown), and
+    another actor from the same movie for COSTAR_QUERIES (the actor
+    themselves when the movie has no one else).
+    """
+    cursor = conn.execute('''
+        SELECT ma.tconst, ma.nconst, m.title, a.name, m.genres, m.year
+        FROM movie_actors ma
+        JOIN movies m ON ma.tconst = m.tconst
+        JOIN actors a ON ma.nconst = a.nconst
+        WHERE m.tconst IN (
+            SELECT tconst FROM movies ORDER BY votes DESC LIMIT ?
+        )
+    ''', (size * 5,))
+    pairs = cursor.fetchall()
+    rng = random.Random(seed)
+    rng.shuffle(pairs)
+    casts = defaultdict(list)
+    for tconst, nconst, *_ in pairs:
+        casts[tconst].append(nconst)
+
+    workload = []
+    for tconst, nconst, title, name, genres, year in pairs:
+        movie_query = fts_prefix_query(title)
+        actor_query = fts_prefix_query(name)
+        if movie_query is None or actor_query is None:
+            continue
+        workload.append({
+            'movie': tconst,
+            'actor': nconst,
+            'movie_query': movie_query,
+            'actor_query': actor_query,
+            'genre': (genres or '').split(',')[0],
+            'decade': year // 10 * 10 if year else 0,
+            'co_actor': next((other for other in casts[tconst] if other != nconst), nconst),
+        })
+        if len(workload) >= size:
+            break
+    return workload
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def time_queries(db_path: Path, workload: List[Dict[str, str]],
+                 queries: Optional[Dict[str, str]] = None,
+                 repeat: int = 1) -> Dict[str, dict]:
+    """
+    Run every query against every workload entry and collect latencies.
+
+    Returns {query_name: {'calls', 'mean_ms', 'p50_ms', 'p95_ms', 'mean_rows'}}.
+    """
+    queries = queries or APP_QUERIES
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    results = {}
+    try:
+        for name, sql in queries.items():
+            samples = []
+            rows = 0
+            for _ in range(repeat):
+                for params in workload:
+                    start = time.perf_counter()
+                    rows += len(conn.execute(sql, params).fetchall())
+                    samples.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                'calls': len(samples),
+                'mean_ms': sum(samples) / len(samples) if samples else 0.0,
+                'p50_ms': percentile(samples, 50),
+                'p95_ms': percentile(samples, 95),
+                'mean_rows': rows / len(samples) if samples else 0.0,
+            }
+    finally:
+        conn.close()
+    return results
+
+
+def print_latency_comparison(before: Dict[str, dict], after: Dict[str, dict],
+                             before_label: str = 'before',
+                             after_label: str = 'after'):
+    """Print mean and p95 latency side by side for two timing runs."""
+    print(f"  {'query':<26} {before_label + ' ms':>12} {after_label + ' ms':>12} "
+          f"{'p95 ' + before_label:>14} {'p95 ' + after_label:>14}")
+    for name in before:
+        if name not in after:
+            continue
+        b, a = before[name], after[name]
+        print(f"  {name:<26} {b['mean_ms']:>12.3f} {a['mean_ms']:>12.3f} "
+              f"{b['p95_ms']:>14.3f} {a['p95_ms']:>14.3f}")
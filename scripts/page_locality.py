@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Measure how many table pages a sample of MovieChain game sessions touches.
+
+A session follows the game: start from one of the most-voted movies, open
+its cast, pick a top-billed actor, open their filmography and move to one of
+their better-known movies, and so on. Every step reads rows the app reads:
+
+    movie step   the movie row and the actor row of every cast member
+    actor step   the actor row, and the movie_actors and movie rows of
+                 every film they appear in
+
+Each (table, rowid) is mapped to the leaf page holding it via dbstat, and
+the page sequence is run through an LRU cache of a few sizes. Only table
+pages are counted: index b-trees are sorted by key, so their layout is the
+same whatever order rows were inserted in.
+
+Sessions are made of IMDb IDs, so --compare replays the same sessions
+against a second build (e.g. --row-order id vs popularity).
+
+Usage:
+    python3 page_locality.py DB [--compare OTHER_DB] [--sessions N] [--length N]
+"""
+
+import argparse
+import bisect
+import random
+import sqlite3
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from moviechain_queries import TOP_BILLED_CAST
+
+CACHE_PAGES = (256, 1024, 4096)
+TABLES = ('movies', 'actors', 'movie_actors')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure page locality of MovieChain sessions')
+    parser.add_argument('db', type=str, help='Database to measure')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='Second database to replay the same sessions against')
+    parser.add_argument('--sessions', type=int, default=200, help='Number of sessions')
+    parser.add_argument('--length', type=int, default=6, help='Movies per session')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+class LeafPageMap:
+    """Map rowids of a rowid table to the leaf pages that hold them."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str):
+        count, max_rowid = conn.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{table}"').fetchone()
+        if count != (max_rowid or 0):
+            raise ValueError(f"{table} rowids are not 1..N; can't map rows to pages")
+        # dbstat paths sort in b-tree order, so leaves come out in rowid order
+        self.first_rowids: List[int] = []
+        self.pages: List[int] = []
+        next_rowid = 1
+        for pageno, ncell in conn.execute(
+                "SELECT pageno, ncell FROM dbstat WHERE name = ? AND pagetype = 'leaf' ORDER BY path",
+                (table,)):
+            self.first_rowids.append(next_rowid)
+            self.pages.append(pageno)
+            next_rowid += ncell
+
+    def page(self, rowid: int) -> int:
+        return self.pages[bisect.bisect_right(self.first_rowids, rowid) - 1]
+
+
+def sample_sessions(conn: sqlite3.Connection, sessions: int = 200, length: int = 6,
+                    seed: int = 0) -> List[List[Tuple[str, str]]]:
+    """Random play-throughs as lists of ('movie', tconst) / ('actor', nconst) steps."""
+    rng = random.Random(seed)
+    starts = [row[0] for row in conn.execute(
+        'SELECT tconst FROM movies WHERE votes IS NOT NULL ORDER BY votes DESC, tconst LIMIT 1000')]
+    result = []
+    for _ in range(sessions):
+        if not starts:
+            break
+        movie = rng.choice(starts)
+        steps = []
+        for _ in range(length):
+            steps.append(('movie', movie))
+            cast = [row[0] for row in conn.execute(
+                f'SELECT nconst FROM movie_actors WHERE tconst = ? AND billing <= {TOP_BILLED_CAST} '
+                'ORDER BY billing', (movie,))]
+            if not cast:
+                break
+            actor = rng.choice(cast)
+            steps.append(('actor', actor))
+            # Players move on to films they've heard of
+            films = [row[0] for row in conn.execute('''
+                SELECT m.tconst FROM movie_actors ma JOIN movies m ON m.tconst = ma.tconst
+                WHERE ma.nconst = ? AND m.tconst != ?
+                ORDER BY m.votes DESC, m.tconst LIMIT 10
+            ''', (actor, movie))]
+            if not films:
+                break
+            movie = rng.choice(films)
+        result.append(steps)
+    return result
+
+
+def session_row_reads(conn: sqlite3.Connection,
+                      sessions: List[List[Tuple[str, str]]]) -> Iterator[Tuple[str, int]]:
+    """Yield (table, rowid) for every row the sessions read, in order."""
+    for steps in sessions:
+        for kind, key in steps:
+            if kind == 'movie':
+                for (rowid,) in conn.execute('SELECT rowid FROM movies WHERE tconst = ?', (key,)):
+                    yield 'movies', rowid
+                for (rowid,) in conn.execute('''
+                    SELECT a.rowid FROM movie_actors ma JOIN actors a ON a.nconst = ma.nconst
+                    WHERE ma.tconst = ?
+                ''', (key,)):
+                    yield 'actors', rowid
+            else:
+                for (rowid,) in conn.execute('SELECT rowid FROM actors WHERE nconst = ?', (key,)):
+                    yield 'actors', rowid
+                for link_rowid, movie_rowid in conn.execute('''
+                    SELECT ma.rowid, m.rowid FROM movie_actors ma JOIN movies m ON m.tconst = ma.tconst
+                    WHERE ma.nconst = ?
+                ''', (key,)):
+                    yield 'movie_actors', link_rowid
+                    yield 'movies', movie_rowid
+
+
+def measure_page_locality(db_path: Path, sessions: List[List[Tuple[str, str]]],
+                          cache_pages: Tuple[int, ...] = CACHE_PAGES) -> dict:
+    """Row reads, distinct pages and LRU hit rates for the sessions against db_path."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        maps = {table: LeafPageMap(conn, table) for table in TABLES}
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        caches: Dict[int, OrderedDict] = {size: OrderedDict() for size in cache_pages}
+        hits = {size: 0 for size in cache_pages}
+        distinct = {table: set() for table in TABLES}
+        reads = 0
+        for table, rowid in session_row_reads(conn, sessions):
+            page = maps[table].page(rowid)
+            reads += 1
+            distinct[table].add(page)
+            for size, cache in caches.items():
+                if page in cache:
+                    hits[size] += 1
+                    cache.move_to_end(page)
+                else:
+                    cache[page] = True
+                    if len(cache) > size:
+                        cache.popitem(last=False)
+    finally:
+        conn.close()
+
+    return {
+        'database': str(db_path),
+        'page_size': page_size,
+        'row_reads': reads,
+        'distinct_pages': {table: len(pages) for table, pages in distinct.items()},
+        'hit_rate': {size: hits[size] / reads if reads else 0.0 for size in cache_pages},
+    }
+
+
+def print_locality(results: List[dict]):
+    print(f"\n  {'database':<32} {'row reads':>10} " + ' '.join(f"{t + ' pages':>18}" for t in TABLES)
+          + ' ' + ' '.join(f"{'hit@' + str(size):>9}" for size in results[0]['hit_rate']))
+    for result in results:
+        name = Path(result['database']).name
+        print(f"  {name:<32} {result['row_reads']:>10,} "
+              + ' '.join(f"{result['distinct_pages'][t]:>18,}" for t in TABLES) + ' '
+              + ' '.join(f"{rate * 100:>8.1f}%" for rate in result['hit_rate'].values()))
+
+
+def main():
+    args = parse_args()
+    paths = [Path(args.db)] + ([Path(args.compare)] if args.compare else [])
+    for path in paths:
+        if not path.exists():
+            print(f"ERROR: Database not found: {path}")
+            sys.exit(1)
+
+    conn = sqlite3.connect(f'file:{paths[0]}?mode=ro', uri=True)
+    sessions = sample_sessions(conn, args.sessions, args.length, args.seed)
+    conn.close()
+    steps = sum(len(s) for s in sessions)
+    print(f"Replaying {len(sessions)} sessions ({steps:,} steps)")
+
+    try:
+        results = [measure_page_locality(path, sessions) for path in paths]
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    print_locality(results)
+
+
+if __name__ == '__main__':
+    main()
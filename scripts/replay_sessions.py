@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Load-test a built MovieChain database by replaying game sessions concurrently.
+
+A session plays a chain the way the app drives the database. For each link
+the player types an actor's name into the cast search: searchActorsInMovie
+runs once per debounced keystroke with a growing prefix, then the pick is
+validated. They then type one of that actor's films into the filmography
+search and validate it, and so on:
+
+    search_actors_in_movie  '"Ke"*', '"Kea"*', ... '"Keanu"* "Re"*'
+    is_actor_in_movie
+    search_movies_with_actor  ...
+    is_actor_in_movie
+
+Sessions are sampled from the database (or loaded with --sessions-file, as
+written by --save-sessions) and split across N workers for every level in
+--concurrency. Each worker has its own read-only connection; with --mode
+shared, threads share one connection behind a lock, like an app that
+serializes its queries on one handle.
+
+For every level the report gives throughput, a latency histogram per
+operation, and contention:
+
+    lock wait   time spent waiting for the shared connection (--mode shared)
+    busy        SQLITE_BUSY retries
+    slowdown    mean latency relative to the first level
+
+Usage:
+    python3 replay_sessions.py DB [--concurrency 1,2,4,8] [--mode thread|process|shared]
+                              [--sessions N] [--sessions-file FILE] [--save-sessions FILE]
+                              [--json RESULTS.json]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from moviechain_queries import APP_QUERIES, TOP_BILLED_CAST, percentile, typed_fts_query
+
+MODES = ('thread', 'process', 'shared')
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)
+
+SESSION_OPS = ('search_actors_in_movie', 'search_movies_with_actor', 'is_actor_in_movie')
+
+BUSY_RETRIES = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Replay concurrent MovieChain sessions')
+    parser.add_argument('db', type=str, help='Database to load-test')
+    parser.add_argument('--concurrency', type=str, default='1,2,4,8',
+                        help='Comma-separated worker counts to run the sessions at')
+    parser.add_argument('--mode', choices=MODES, default='thread',
+                        help='Workers are threads with their own connection, processes, or '
+                             'threads sharing one connection')
+    parser.add_argument('--sessions', type=int, default=200, help='Sessions to sample')
+    parser.add_argument('--links', type=int, default=4, help='Actor/movie links per session')
+    parser.add_argument('--min-prefix', type=int, default=2,
+                        help='Characters typed before the first search')
+    parser.add_argument('--debounce', type=int, default=1,
+                        help='Characters typed between searches')
+    parser.add_argument('--think-ms', type=float, default=0.0,
+                        help='Pause between operations, in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sessions-file', type=str, default=None,
+                        help='Replay sessions from this JSON file instead of sampling')
+    parser.add_argument('--save-sessions', type=str, default=None,
+                        help='Write the sessions to this JSON file')
+    parser.add_argument('--json', type=str, default=None,
+                        help='Also write the results as JSON to this path')
+    return parser.parse_args()
+
+
+def keystroke_prefixes(text: str, min_prefix: int = 2, debounce: int = 1) -> List[str]:
+    """The search box contents each time the debounced search fires while typing text."""
+    lengths = list(range(min(min_prefix, len(text)), len(text) + 1, max(1, debounce)))
+    if not lengths or lengths[-1] != len(text):
+        lengths.append(len(text))
+    return [text[:length] for length in lengths if text[:length].strip()]
+
+
+def sample_sessions(conn: sqlite3.Connection, sessions: int = 200, links: int = 4,
+                    min_prefix: int = 2, debounce: int = 1, seed: int = 0) -> List[List[dict]]:
+    """Random sessions as lists of {'op', 'params'} steps."""
+    rng = random.Random(seed)
+    starts = [row[0] for row in conn.execute(
+        'SELECT tconst FROM movies WHERE votes IS NOT NULL ORDER BY votes DESC, tconst LIMIT 1000')]
+    result = []
+    for _ in range(sessions):
+        if not starts:
+            break
+        movie = rng.choice(starts)
+        steps = []
+        for _ in range(links):
+            cast = conn.execute(
+                f'SELECT a.nconst, a.name FROM movie_actors ma JOIN actors a ON a.nconst = ma.nconst '
+                f'WHERE ma.tconst = ? AND ma.billing <= {TOP_BILLED_CAST} ORDER BY ma.billing',
+                (movie,)).fetchall()
+            if not cast:
+                break
+            actor, name = rng.choice(cast)
+            for prefix in keystroke_prefixes(name, min_prefix, debounce):
+                steps.append({'op': 'search_actors_in_movie',
+                              'params': {'actor_query': typed_fts_query(prefix), 'movie': movie}})
+            steps.append({'op': 'is_actor_in_movie', 'params': {'movie': movie, 'actor': actor}})
+
+            films = conn.execute('''
+                SELECT m.tconst, m.title FROM movie_actors ma JOIN movies m ON m.tconst = ma.tconst
+                WHERE ma.nconst = ? AND m.tconst != ?
+                ORDER BY m.votes DESC, m.tconst LIMIT 10
+            ''', (actor, movie)).fetchall()
+            if not films:
+                break
+            movie, title = rng.choice(films)
+            for prefix in keystroke_prefixes(title, min_prefix, debounce):
+                steps.append({'op': 'search_movies_with_actor',
+                              'params': {'movie_query': typed_fts_query(prefix), 'actor': actor}})
+            steps.append({'op': 'is_actor_in_movie', 'params': {'movie': movie, 'actor': actor}})
+        result.append(steps)
+    return result
+
+
+def _execute(conn: sqlite3.Connection, sql: str, params: dict) -> int:
+    """Run one query, retrying on SQLITE_BUSY; returns the number of retries."""
+    for retry in range(BUSY_RETRIES):
+        try:
+            conn.execute(sql, params).fetchall()
+            return retry
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            time.sleep(0.001)
+    raise sqlite3.OperationalError(f"database still busy after {BUSY_RETRIES} retries")
+
+
+def run_sessions(db_path: str, sessions: List[List[dict]], think_ms: float = 0.0,
+                 shared: Optional[tuple] = None) -> dict:
+    """
+    Worker: replay sessions and return latencies (ms) per operation.
+
+    shared is a (connection, lock) pair to use instead of opening a connection.
+    """
+    conn = shared[0] if shared else sqlite3.connect(f'file:{db_path}?mode=ro', uri=True,
+                                                    check_same_thread=False)
+    lock = shared[1] if shared else None
+    latencies: Dict[str, List[float]] = {op: [] for op in SESSION_OPS}
+    lock_wait = 0.0
+    busy = 0
+    try:
+        for steps in sessions:
+            for step in steps:
+                sql = APP_QUERIES[step['op']]
+                start = time.perf_counter()
+                if lock is not None:
+                    with lock:
+                        acquired = time.perf_counter()
+                        busy += _execute(conn, sql, step['params'])
+                    lock_wait += acquired - start
+                else:
+                    busy += _execute(conn, sql, step['params'])
+                latencies[step['op']].append((time.perf_counter() - start) * 1000)
+                if think_ms:
+                    time.sleep(think_ms / 1000)
+    finally:
+        if not shared:
+            conn.close()
+    return {'latencies': latencies, 'lock_wait_s': lock_wait, 'busy': busy}
+
+
+def histogram(samples: List[float]) -> List[int]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for sample in samples:
+        counts[next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if sample < bound),
+                    len(HISTOGRAM_BOUNDS_MS))] += 1
+    return counts
+
+
+def run_level(db_path: Path, sessions: List[List[dict]], workers: int, mode: str,
+              think_ms: float = 0.0) -> dict:
+    """Replay every session split across workers; returns throughput and per-op stats."""
+    shares = [sessions[i::workers] for i in range(workers)]
+    start = time.perf_counter()
+    if mode == 'process':
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_sessions, [str(db_path)] * workers, shares,
+                                    [think_ms] * workers))
+    else:
+        shared = None
+        if mode == 'shared':
+            conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+            shared = (conn, threading.Lock())
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda share: run_sessions(str(db_path), share, think_ms,
+                                                                   shared), shares))
+        finally:
+            if shared:
+                shared[0].close()
+    wall = time.perf_counter() - start
+
+    ops = {}
+    for op in SESSION_OPS:
+        samples = [ms for result in results for ms in result['latencies'][op]]
+        if not samples:
+            continue
+        ops[op] = {
+            'calls': len(samples),
+            'mean_ms': sum(samples) / len(samples),
+            'p50_ms': percentile(samples, 50),
+            'p95_ms': percentile(samples, 95),
+            'p99_ms': percentile(samples, 99),
+            'max_ms': max(samples),
+            'histogram': histogram(samples),
+        }
+    calls = sum(stats['calls'] for stats in ops.values())
+    return {
+        'workers': workers,
+        'mode': mode,
+        'wall_s': wall,
+        'ops_per_s': calls / wall if wall else 0.0,
+        'sessions_per_s': len(sessions) / wall if wall else 0.0,
+        'mean_ms': sum(stats['mean_ms'] * stats['calls'] for stats in ops.values()) / calls
+                   if calls else 0.0,
+        'lock_wait_s': sum(result['lock_wait_s'] for result in results),
+        'busy': sum(result['busy'] for result in results),
+        'ops': ops,
+    }
+
+
+def print_levels(levels: List[dict]):
+    base = levels[0]
+    print(f"\n  {'workers':>7} {'ops/s':>10} {'sessions/s':>11} {'mean ms':>9} {'slowdown':>9} "
+          f"{'scaling':>8} {'lock wait s':>12} {'busy':>6}")
+    for level in levels:
+        slowdown = level['mean_ms'] / base['mean_ms'] if base['mean_ms'] else 0.0
+        scaling = (level['ops_per_s'] / (base['ops_per_s'] * level['workers'] / base['workers'])
+                   if base['ops_per_s'] else 0.0)
+        print(f"  {level['workers']:>7} {level['ops_per_s']:>10,.0f} {level['sessions_per_s']:>11.1f} "
+              f"{level['mean_ms']:>9.3f} {slowdown:>8.2f}x {scaling * 100:>7.0f}% "
+              f"{level['lock_wait_s']:>12.2f} {level['busy']:>6}")
+
+    labels = [f"<{bound:g}" for bound in HISTOGRAM_BOUNDS_MS] + [f">={HISTOGRAM_BOUNDS_MS[-1]:g}"]
+    print("\n  Latency histograms (ms; share of calls per bucket):")
+    print(f"  {'operation':<26} {'workers':>7} {'p50':>7} {'p99':>7} "
+          + ' '.join(f"{label:>6}" for label in labels))
+    for op in SESSION_OPS:
+        for level in levels:
+            stats = level['ops'].get(op)
+            if stats is None:
+                continue
+            print(f"  {op:<26} {level['workers']:>7} {stats['p50_ms']:>7.3f} {stats['p99_ms']:>7.3f} "
+                  + ' '.join(f"{count / stats['calls'] * 100:>5.1f}%" for count in stats['histogram']))
+
+
+def main():
+    args = parse_args()
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"ERROR: Database not found: {db_path}")
+        sys.exit(1)
+    try:
+        concurrency = [int(level) for level in args.concurrency.split(',')]
+    except ValueError:
+        print(f"ERROR: Bad --concurrency: {args.concurrency}")
+        sys.exit(1)
+
+    if args.sessions_file:
+        sessions = json.loads(Path(args.sessions_file).read_text(encoding='utf-8'))
+    else:
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+        sessions = sample_sessions(conn, args.sessions, args.links, args.min_prefix,
+                                   args.debounce, args.seed)
+        conn.close()
+    if args.save_sessions:
+        Path(args.save_sessions).write_text(json.dumps(sessions), encoding='utf-8')
+        print(f"Wrote {args.save_sessions}")
+    steps = sum(len(s) for s in sessions)
+    print(f"Replaying {len(sessions)} sessions ({steps:,} operations) against {db_path.name}, "
+          f"{args.mode} workers")
+
+    levels = []
+    for workers in concurrency:
+        print(f"  {workers} worker{'s' if workers != 1 else ''}...")
+        levels.append(run_level(db_path, sessions, workers, args.mode, args.think_ms))
+    print_levels(levels)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'database': str(db_path),
+            'histogram_bounds_ms': HISTOGRAM_BOUNDS_MS,
+            'levels': levels,
+        }, indent=2), encoding='utf-8')
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
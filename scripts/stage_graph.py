@@ -0,0 +1,163 @@
+"""
+Run build stages as a dependency graph, with independent stages in parallel.
+
+Each stage is a function plus the names of the stages whose results it
+needs; those results are appended to its arguments. Process stages run in a
+ProcessPoolExecutor as soon as their dependencies finish, each wrapped in a
+BuildReport stage inside the worker. The worker passes its Stage back with
+the result, so measurements land in the parent's report as usual. Local
+stages run in the parent process. Use them for work that records its own
+report stages or that can't be pickled, such as writing the database.
+
+    graph = StageGraph(report, workers=4)
+    graph.add('parse:movies', load_all_movies, data_dir)
+    graph.add('parse:ratings', load_ratings, data_dir)
+    graph.add('filter:links', load_links_for_movies, data_dir, deps=['parse:movies'])
+    graph.add('create', create, deps=['parse:movies', 'parse:ratings', 'filter:links'],
+              local=True)
+    results = graph.run()
+    graph.print_critical_path()
+
+Process stage functions must be importable module-level functions that take
+a `stage` keyword argument, and their arguments and results must pickle.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from build_stats import BuildReport, Stage
+
+
+def _run_in_worker(name: str, func: Callable, args: tuple,
+                   profile_dir: Optional[Path]) -> Tuple[Any, Stage]:
+    """Worker entry point: run one stage under a private BuildReport."""
+    report = BuildReport(name, profile_dir=profile_dir)
+    with report.stage(name) as stage:
+        result = func(*args, stage=stage)
+    return result, report.stages[0]
+
+
+class StageNode:
+    """One stage of the graph and, once run, when it started and finished."""
+
+    def __init__(self, name: str, func: Callable, args: tuple,
+                 deps: Sequence[str], local: bool):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.deps = list(deps)
+        self.local = local
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+class StageGraph:
+    """Schedule stages by dependency; workers=1 runs everything in-process, in order."""
+
+    def __init__(self, report: BuildReport, workers: int = 1):
+        self.report = report
+        self.workers = max(1, workers)
+        self.nodes: Dict[str, StageNode] = {}
+        self.results: Dict[str, Any] = {}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def add(self, name: str, func: Callable, *args, deps: Sequence[str] = (),
+            local: bool = False):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+        self.nodes[name] = StageNode(name, func, args, deps, local)
+
+    def _call_args(self, node: StageNode) -> tuple:
+        return node.args + tuple(self.results[dep] for dep in node.deps)
+
+    def _run_local(self, node: StageNode):
+        node.started = time.perf_counter()
+        if node.local:
+            self.results[node.name] = node.func(*self._call_args(node))
+        else:
+            with self.report.stage(node.name) as stage:
+                self.results[node.name] = node.func(*self._call_args(node), stage=stage)
+        node.finished = time.perf_counter()
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage once its dependencies are done; returns {name: result}."""
+        self._started = time.perf_counter()
+        if self.workers == 1:
+            # Nodes can only depend on earlier nodes, so insertion order is a valid order
+            for node in self.nodes.values():
+                self._run_local(node)
+            self._finished = time.perf_counter()
+            return self.results
+
+        pending = dict(self.nodes)
+        running: Dict[Future, StageNode] = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                ready = [node for node in pending.values()
+                         if all(dep in self.results for dep in node.deps)]
+                for node in ready:
+                    if node.local:
+                        continue
+                    del pending[node.name]
+                    node.started = time.perf_counter()
+                    future = pool.submit(_run_in_worker, node.name, node.func,
+                                         self._call_args(node), self.report.profile_dir)
+                    running[future] = node
+
+                local = next((node for node in ready if node.local), None)
+                if local is not None:
+                    del pending[local.name]
+                    self._run_local(local)
+                    continue
+
+                if not running:
+                    raise RuntimeError(f"Stages can never run: {', '.join(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    node.finished = time.perf_counter()
+                    self.results[node.name], stage = future.result()
+                    self.report.stages.append(stage)
+
+        self._finished = time.perf_counter()
+        return self.results
+
+    def critical_path(self) -> List[StageNode]:
+        """
+        The chain of stages that set the total run time.
+
+        Walks back from the last stage to finish, each time to the dependency
+        that finished last, i.e. the one the stage was actually waiting on.
+        """
+        done = [node for node in self.nodes.values() if node.finished is not None]
+        if not done:
+            return []
+        node = max(done, key=lambda n: n.finished)
+        path = [node]
+        while node.deps:
+            node = max((self.nodes[dep] for dep in node.deps), key=lambda n: n.finished)
+            path.append(node)
+        return path[::-1]
+
+    def print_critical_path(self):
+        path = self.critical_path()
+        if not path:
+            return
+        total = self._finished - self._started
+        serial = sum(node.seconds for node in self.nodes.values())
+        print(f"\n  Stage graph ({self.workers} worker{'s' if self.workers != 1 else ''}): "
+              f"{total:.2f}s wall, {serial:.2f}s of stage time")
+        print("  Critical path:")
+        for node in path:
+            print(f"    {node.name:<28} {node.started - self._started:>8.2f}s "
+                  f"-> {node.finished - self._started:>8.2f}s  ({node.seconds:.2f}s)")
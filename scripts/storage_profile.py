@@ -0,0 +1,142 @@
+"""
+Storage profiles: the on-disk layout settings applied when finalizing a database.
+
+A profile is a small JSON object, as written by tune_storage.py:
+
+    {
+      "page_size": 4096,          # page size of the finalized copy (null keeps the source's)
+      "auto_vacuum": "none",      # none | full | incremental
+      "keep_known_for": true,     # false stores NULL in actors.known_for
+      "column_order": "schema"    # schema | fixed_first
+    }
+
+None of these change what the app can query: dropping known_for keeps the
+column (the app already treats it as optional) and reordering columns keeps
+their names, rowids and indexes.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import List
+
+AUTO_VACUUM_MODES = ('none', 'full', 'incremental')
+COLUMN_ORDERS = ('schema', 'fixed_first')
+
+DEFAULT_PROFILE = {
+    'page_size': None,
+    'auto_vacuum': 'none',
+    'keep_known_for': True,
+    'column_order': 'schema',
+}
+
+# Rowid tables whose columns fixed_first may reorder
+REORDERABLE_TABLES = ('movies', 'actors', 'movie_actors')
+
+
+def validate_profile(profile: dict) -> dict:
+    """Return profile merged over DEFAULT_PROFILE, raising ValueError on bad values."""
+    unknown = set(profile) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown storage profile keys: {', '.join(sorted(unknown))}")
+    merged = dict(DEFAULT_PROFILE, **profile)
+    page_size = merged['page_size']
+    if page_size is not None and (page_size < 512 or page_size > 65536
+                                  or page_size & (page_size - 1)):
+        raise ValueError(f"page_size must be a power of two from 512 to 65536, not {page_size}")
+    if merged['auto_vacuum'] not in AUTO_VACUUM_MODES:
+        raise ValueError(f"auto_vacuum must be one of {', '.join(AUTO_VACUUM_MODES)}")
+    if merged['column_order'] not in COLUMN_ORDERS:
+        raise ValueError(f"column_order must be one of {', '.join(COLUMN_ORDERS)}")
+    return merged
+
+
+def load_profile(path: Path) -> dict:
+    profile = json.loads(path.read_text(encoding='utf-8'))
+    # tune_storage.py writes the chosen settings plus its measurements
+    return validate_profile(profile.get('settings', profile))
+
+
+def describe_profile(profile: dict) -> str:
+    page_size = profile['page_size'] or 'source'
+    known_for = 'known_for' if profile['keep_known_for'] else 'no known_for'
+    return (f"page {page_size}, auto_vacuum {profile['auto_vacuum']}, "
+            f"{known_for}, {profile['column_order']} columns")
+
+
+def fixed_first_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Column names with INTEGER/REAL columns ahead of TEXT/BLOB ones, otherwise in schema order."""
+    columns = [(row[1], (row[2] or '').upper()) for row in conn.execute(f"PRAGMA table_info('{table}')")]
+    fixed = [name for name, kind in columns if 'INT' in kind or 'REAL' in kind]
+    return fixed + [name for name, _ in columns if name not in fixed]
+
+
+def reorder_columns(conn: sqlite3.Connection, table: str, order: List[str]):
+    """
+    Rebuild a rowid table with its columns in a new order.
+
+    Rowids are copied so external-content FTS tables stay valid, and the
+    table's indexes are recreated from their original SQL.
+    """
+    create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()[0]
+    index_sql = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL "
+        "ORDER BY rowid", (table,))]
+
+    # Split the column definitions out of CREATE TABLE, keeping table constraints last
+    body = create_sql[create_sql.index('(') + 1:create_sql.rindex(')')]
+    parts, depth, current = [], 0, ''
+    for char in body:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    parts.append(current.strip())
+    definitions = {}
+    constraints = []
+    for part in parts:
+        part = ' '.join(part.split())
+        name = part.split()[0].strip('"')
+        if name.upper() in ('PRIMARY', 'FOREIGN', 'UNIQUE', 'CHECK', 'CONSTRAINT'):
+            constraints.append(part)
+        else:
+            definitions[name] = part
+
+    columns = ', '.join(f'"{name}"' for name in order)
+    old_table = f'{table}__old'
+    # Legacy mode keeps other tables' REFERENCES pointing at the original name
+    conn.execute('PRAGMA legacy_alter_table = ON')
+    conn.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+    conn.execute('PRAGMA legacy_alter_table = OFF')
+    conn.execute(f'CREATE TABLE {table} ('
+                 + ', '.join([definitions[name] for name in order] + constraints) + ')')
+    conn.execute(f'INSERT INTO "{table}" (rowid, {columns}) '
+                 f'SELECT rowid, {columns} FROM "{old_table}" ORDER BY rowid')
+    conn.execute(f'DROP TABLE "{old_table}"')
+    for sql in index_sql:
+        conn.execute(sql)
+
+
+def apply_storage_profile(conn: sqlite3.Connection, profile: dict):
+    """
+    Apply a profile to a database that is about to be copied with VACUUM INTO.
+
+    Content changes (known_for, column order) are made in place and committed;
+    page_size and auto_vacuum are left pending for the VACUUM INTO to pick up.
+    """
+    profile = validate_profile(profile)
+    if not profile['keep_known_for']:
+        conn.execute('UPDATE actors SET known_for = NULL')
+    if profile['column_order'] == 'fixed_first':
+        for table in REORDERABLE_TABLES:
+            order = fixed_first_columns(conn, table)
+            current = [row[1] for row in conn.execute(f"PRAGMA table_info('{table}')")]
+            if order != current:
+                reorder_columns(conn, table, order)
+    conn.commit()
+    conn.execute(f"PRAGMA auto_vacuum = {profile['auto_vacuum'].upper()}")
+    if profile['page_size']:
+        conn.execute(f"PRAGMA page_size = {int(profile['page_size'])}")
@@ -0,0 +1,81 @@
+"""
+Tests for the cast-link loading in build_movie_database.py.
+
+Run from the scripts directory:
+    python3 -m unittest test_build_movie_database
+"""
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from build_movie_database import build_database_external, load_movie_actor_links, parse_cast_row
+
+HEADERS = {
+    'title.basics.tsv': 'tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear\truntimeMinutes\tgenres',
+    'title.ratings.tsv': 'tconst\taverageRating\tnumVotes',
+    'title.principals.tsv': 'tconst\tordering\tnconst\tcategory\tjob\tcharacters',
+    'name.basics.tsv': 'nconst\tprimaryName\tbirthYear\tdeathYear\tprimaryProfession\tknownForTitles',
+}
+
+# nm0000003 has a malformed ordering on their only row; nm0000004 has no ordering
+# column value at all on one row and a valid one on another
+PRINCIPALS = [
+    'tt0000001\t1\tnm0000001\tactor\t\\N\t\\N',
+    'tt0000001\t2\tnm0000002\tactress\t\\N\t\\N',
+    'tt0000001\tx\tnm0000003\tactor\t\\N\t\\N',
+    'tt0000001\t\tnm0000004\tactor\t\\N\t\\N',
+    'tt0000001\t3\tnm0000004\tactor\t\\N\t\\N',
+    'tt0000001\t4\tnm0000005\tdirector\t\\N\t\\N',
+]
+
+
+def write_data_dir(directory: Path):
+    rows = {
+        'title.basics.tsv': ['tt0000001\tmovie\tA Film\tA Film\t0\t1999\t\\N\t100\tDrama'],
+        'title.ratings.tsv': ['tt0000001\t7.5\t5000'],
+        'title.principals.tsv': PRINCIPALS,
+        'name.basics.tsv': [
+            f'nm000000{n}\tPerson {n}\t\\N\t\\N\tactor\ttt0000001' for n in range(1, 6)
+        ],
+    }
+    for name, header in HEADERS.items():
+        (directory / name).write_text('\n'.join([header] + rows[name]) + '\n', encoding='utf-8')
+
+
+class CastLinkTests(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp.name)
+        write_data_dir(self.data_dir)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_malformed_ordering_sorts_last(self):
+        row = dict(zip(HEADERS['title.principals.tsv'].split('\t'), PRINCIPALS[2].split('\t')))
+        self.assertEqual(parse_cast_row(row), ('tt0000001', 'nm0000003', sys.maxsize))
+
+    def test_in_memory_links_keep_malformed_ordering(self):
+        links = load_movie_actor_links(self.data_dir, {'tt0000001'})
+        self.assertEqual(links['tt0000001'], {
+            'nm0000001': 1, 'nm0000002': 2, 'nm0000004': 3, 'nm0000003': 4,
+        })
+
+    def test_external_build_keeps_malformed_ordering(self):
+        output = self.data_dir / 'out.sqlite'
+        build_database_external(self.data_dir, output, 64 * 1024 * 1024)
+        conn = sqlite3.connect(str(output))
+        try:
+            links = dict(conn.execute('SELECT nconst, billing FROM movie_actors'))
+            actors = {row[0] for row in conn.execute('SELECT nconst FROM actors')}
+        finally:
+            conn.close()
+        self.assertEqual(links, {'nm0000001': 1, 'nm0000002': 2, 'nm0000004': 3, 'nm0000003': 4})
+        self.assertIn('nm0000003', actors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Search storage settings for the smallest MovieChain download that stays fast.
+
+Every trial starts from a copy of the un-finalized build database (keep it
+with `build_movie_database.py --keep-build`). That file is the cached output
+of every stage before finalize, so no TSV is parsed again. The copy is
+finalized with one storage profile from the grid (page size x auto_vacuum x
+column order, optionally x dropping known_for). Each result is measured for
+raw size, gzip -9 size and mean latency of the app query set, replaying one
+workload for every trial.
+
+A baseline trial with the default profile (the build's own settings) runs
+first. Trials no other trial beats on all three measures form the Pareto
+front. The chosen profile is the front's smallest gzip size among trials
+within --max-slowdown of the baseline's latency. It is written as a profile
+that `build_movie_database.py --storage-profile` and
+`finalize_database.py --storage-profile` accept.
+
+Usage:
+    python3 tune_storage.py BUILD.sqlite [--output storage_profile.json]
+                            [--page-sizes 1024,4096,16384,65536] [--auto-vacuum none,incremental]
+                            [--allow-drop-known-for] [--max-slowdown 1.1] [--json RESULTS.json]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from build_stats import BuildReport
+from finalize_database import finalize_database, gzip_size
+from moviechain_queries import sample_workload, time_queries
+from storage_profile import (AUTO_VACUUM_MODES, COLUMN_ORDERS, DEFAULT_PROFILE,
+                             describe_profile, validate_profile)
+
+OBJECTIVES = ('gzip_bytes', 'raw_bytes', 'mean_ms')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Search storage settings for a MovieChain database')
+    parser.add_argument('source', type=str, help='Un-finalized build database (--keep-build)')
+    parser.add_argument('--output', type=str, default='storage_profile.json',
+                        help='Where to write the chosen profile')
+    parser.add_argument('--page-sizes', type=str, default='1024,4096,16384,65536',
+                        help='Comma-separated page sizes to try')
+    parser.add_argument('--auto-vacuum', type=str, default='none,incremental',
+                        help=f"Comma-separated auto_vacuum modes ({', '.join(AUTO_VACUUM_MODES)})")
+    parser.add_argument('--allow-drop-known-for', action='store_true',
+                        help="Also try storing NULL in actors.known_for (the app then shows no "
+                             "'known for' hint)")
+    parser.add_argument('--max-slowdown', type=float, default=1.1,
+                        help='Latency allowed relative to the baseline trial when choosing')
+    parser.add_argument('--samples', type=int, default=100,
+                        help='Movie/actor pairs in the latency workload')
+    parser.add_argument('--repeat', type=int, default=2,
+                        help='Times each query is run per workload entry')
+    parser.add_argument('--json', type=str, default=None,
+                        help='Also write every trial as JSON to this path')
+    return parser.parse_args()
+
+
+def profile_grid(page_sizes: List[int], auto_vacuum: List[str],
+                 allow_drop_known_for: bool) -> List[dict]:
+    known_for = (True, False) if allow_drop_known_for else (True,)
+    return [validate_profile({'page_size': page_size, 'auto_vacuum': mode,
+                              'keep_known_for': keep, 'column_order': order})
+            for page_size, mode, keep, order in itertools.product(
+                page_sizes, auto_vacuum, known_for, COLUMN_ORDERS)]
+
+
+def run_trial(source: Path, work_dir: Path, profile: dict, workload: List[Dict[str, str]],
+              repeat: int) -> dict:
+    """Finalize a copy of source with profile and measure the result."""
+    copy = work_dir / 'trial.build.sqlite'
+    output = work_dir / 'trial.sqlite'
+    shutil.copyfile(source, copy)
+    try:
+        report = BuildReport('tune_storage')
+        with contextlib.redirect_stdout(io.StringIO()):
+            finalize_database(copy, output, report=False, build_report=report, storage=profile)
+        latency = time_queries(output, workload, repeat=repeat)
+        return {
+            'settings': profile,
+            'raw_bytes': output.stat().st_size,
+            'gzip_bytes': gzip_size(output),
+            'mean_ms': sum(q['mean_ms'] for q in latency.values()) / len(latency),
+            'p95_ms': max(q['p95_ms'] for q in latency.values()),
+            'finalize_seconds': sum(stage.wall_seconds for stage in report.stages),
+        }
+    finally:
+        for path in (copy, output):
+            if path.exists():
+                path.unlink()
+
+
+def pareto_front(trials: List[dict]) -> List[dict]:
+    """Trials that no other trial matches or beats on every objective."""
+    def dominates(a, b):
+        return (all(a[key] <= b[key] for key in OBJECTIVES)
+                and any(a[key] < b[key] for key in OBJECTIVES))
+    return [t for t in trials if not any(dominates(other, t) for other in trials)]
+
+
+def choose_profile(front: List[dict], baseline: dict, max_slowdown: float) -> dict:
+    """Smallest download on the front among trials within max_slowdown of the baseline."""
+    eligible = [t for t in front if t['mean_ms'] <= baseline['mean_ms'] * max_slowdown]
+    return min(eligible or [baseline], key=lambda t: (t['gzip_bytes'], t['raw_bytes'], t['mean_ms']))
+
+
+def print_trials(trials: List[dict], front: List[dict], chosen: dict):
+    mb = 1024 * 1024
+    print(f"\n  {'':2}{'settings':<72} {'raw MB':>8} {'gzip MB':>8} {'mean ms':>9} {'p95 ms':>9}")
+    for trial in sorted(trials, key=lambda t: t['gzip_bytes']):
+        mark = '>' if trial is chosen else ('*' if any(trial is t for t in front) else ' ')
+        print(f"  {mark} {describe_profile(trial['settings']):<72} "
+              f"{trial['raw_bytes'] / mb:>8.2f} {trial['gzip_bytes'] / mb:>8.2f} "
+              f"{trial['mean_ms']:>9.3f} {trial['p95_ms']:>9.3f}")
+    print("\n  * Pareto front (gzip size, raw size, latency)   > chosen")
+
+
+def main():
+    args = parse_args()
+    source = Path(args.source)
+    if not source.exists():
+        print(f"ERROR: Database not found: {source}")
+        sys.exit(1)
+    try:
+        page_sizes = [int(size) for size in args.page_sizes.split(',')]
+        modes = [mode.strip() for mode in args.auto_vacuum.split(',')]
+        grid = profile_grid(page_sizes, modes, args.allow_drop_known_for)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f'file:{source}?mode=ro', uri=True)
+    workload = sample_workload(conn, size=args.samples)
+    conn.close()
+
+    grid.insert(0, validate_profile(DEFAULT_PROFILE))
+    print(f"Tuning storage for {source.name}: {len(grid)} trials, "
+          f"{len(workload)} workload pairs x {args.repeat}")
+    work_dir = Path(tempfile.mkdtemp(prefix='moviechain-tune-', dir=str(source.parent)))
+    trials = []
+    try:
+        for number, profile in enumerate(grid, 1):
+            label = 'baseline' if number == 1 else describe_profile(profile)
+            print(f"  [{number}/{len(grid)}] {label}")
+            trials.append(run_trial(source, work_dir, profile, workload, args.repeat))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = trials[0]
+    front = pareto_front(trials)
+    chosen = choose_profile(front, baseline, args.max_slowdown)
+    print_trials(trials, front, chosen)
+
+    output = Path(args.output)
+    output.write_text(json.dumps({
+        'settings': chosen['settings'],
+        'measurements': {key: chosen[key] for key in ('raw_bytes', 'gzip_bytes', 'mean_ms', 'p95_ms')},
+        'source': str(source),
+    }, indent=2), encoding='utf-8')
+    mb = 1024 * 1024
+    print(f"\nChosen profile: {describe_profile(chosen['settings'])}")
+    print(f"  gzip {baseline['gzip_bytes'] / mb:.2f} MB -> {chosen['gzip_bytes'] / mb:.2f} MB, "
+          f"mean latency {baseline['mean_ms']:.3f} ms -> {chosen['mean_ms']:.3f} ms")
+    print(f"Wrote {output}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(trials, indent=2), encoding='utf-8')
+        print(f"Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
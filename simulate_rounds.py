@@ -0,0 +1,156 @@
+"""Batch-simulate country letter game rounds through GameSession.
+
+Simulated players know each country with probability --skills and type a
+guess with a one-letter typo with probability --typo-rate. The "no-hints"
+strategy guesses what it knows and stops. "hints" then asks for hints and
+names the hinted country once it recognizes it, which gets more likely the
+more letters are revealed.
+
+The table shows, for each hint penalty, whether hints raise or lower the
+average score at each skill level. Throughput is reported as rounds/sec and
+steps/sec.
+
+Usage:
+    python3 simulate_rounds.py [--rounds N] [--penalties 0,5,10] [--skills 0.3,0.6,0.9] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from country_letter_game import LETTER_CHOICES, GameSession
+
+STRATEGIES = ("no-hints", "hints")
+MAX_HINTS = 12
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def simulate_round(
+    letter: str,
+    skill: float,
+    strategy: str,
+    penalty: int,
+    rng: random.Random,
+    typo_rate: float = 0.1,
+) -> tuple[GameSession, int]:
+    """Play one round; returns the finished session and the number of steps taken."""
+    session = GameSession(letter, choice=rng.choice, hint_penalty=penalty)
+    steps = 0
+    known = [country for country in session.targets if rng.random() < skill]
+    rng.shuffle(known)
+    for country in known:
+        guess = _typo(country, rng) if rng.random() < typo_rate else country
+        steps += 1
+        if session.step(guess).kind == "unknown":
+            steps += 1
+            session.step(country)
+
+    if strategy == "hints":
+        hints = 0
+        while not session.finished and hints < MAX_HINTS:
+            event = session.step("hint")
+            steps += 1
+            hints += 1
+            if event.kind != "hint":
+                continue
+            shown = 1 - event.revealed.count("_") / len(event.country)
+            if rng.random() < skill + (1 - skill) * shown:
+                session.step(event.country)
+                steps += 1
+
+    if not session.finished:
+        session.step("done")
+        steps += 1
+    return session, steps
+
+
+def simulate(
+    rounds: int,
+    penalties: list[int],
+    skills: list[float],
+    typo_rate: float = 0.1,
+    seed: int = 0,
+) -> dict:
+    rng = random.Random(seed)
+    cells = []
+    total_steps = 0
+    started = time.perf_counter()
+    for penalty in penalties:
+        for skill in skills:
+            for strategy in STRATEGIES:
+                score = found = hints = 0.0
+                for _ in range(rounds):
+                    session, steps = simulate_round(
+                        rng.choice(LETTER_CHOICES), skill, strategy, penalty, rng, typo_rate
+                    )
+                    total_steps += steps
+                    score += session.score
+                    found += len(session.guessed) / len(session.targets)
+                    hints += session.hint_count
+                cells.append(
+                    {
+                        "penalty": penalty,
+                        "skill": skill,
+                        "strategy": strategy,
+                        "mean_score": score / rounds,
+                        "mean_found_pct": found / rounds * 100,
+                        "mean_hints": hints / rounds,
+                    }
+                )
+    elapsed = time.perf_counter() - started
+    total_rounds = rounds * len(cells)
+    return {
+        "rounds": total_rounds,
+        "seconds": elapsed,
+        "rounds_per_sec": total_rounds / elapsed if elapsed else 0.0,
+        "steps_per_sec": total_steps / elapsed if elapsed else 0.0,
+        "cells": cells,
+    }
+
+
+def _print_results(results: dict) -> None:
+    print(f"{'penalty':>7} {'skill':>6} {'strategy':<9} {'score':>7} {'found':>7} {'hints':>6}")
+    for cell in results["cells"]:
+        print(
+            f"{cell['penalty']:>7} {cell['skill']:>6.2f} {cell['strategy']:<9} "
+            f"{cell['mean_score']:>6.1f}% {cell['mean_found_pct']:>6.1f}% {cell['mean_hints']:>6.1f}"
+        )
+    print(
+        f"\n{results['rounds']:,} rounds in {results['seconds']:.2f}s: "
+        f"{results['rounds_per_sec']:,.0f} rounds/sec, {results['steps_per_sec']:,.0f} steps/sec"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate country letter game rounds.")
+    parser.add_argument("--rounds", type=int, default=2000, help="Rounds per table cell.")
+    parser.add_argument("--penalties", default="0,5,10", help="Comma-separated hint penalties.")
+    parser.add_argument("--skills", default="0.3,0.6,0.9", help="Comma-separated skill levels.")
+    parser.add_argument("--typo-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.rounds < 1:
+        parser.error("--rounds must be >= 1.")
+    try:
+        penalties = [int(value) for value in args.penalties.split(",")]
+        skills = [float(value) for value in args.skills.split(",")]
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    results = simulate(args.rounds, penalties, skills, args.typo_rate, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())